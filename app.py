@@ -3,13 +3,32 @@ import sys
 import socket
 import re
 import json
-import requests
+import base64
+import argparse
+import uuid
+import itertools
+import random
+import multiprocessing
+from io import BytesIO
+from datetime import datetime
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_file
 from werkzeug.utils import secure_filename
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from models import db, Question, Exam, ExamItem, LLMConfig
+from werkzeug.exceptions import RequestEntityTooLarge
+from sqlalchemy.orm import load_only
+from sqlalchemy import table, column, literal_column
+from models import db, configure_sqlite, SQLITE_PRAGMA_PROFILES, Question, QuestionTag, QuestionFacet, Exam, ExamItem, ExamVariant, LLMConfig, ImportJob, parse_tags, format_tags, strip_html, QUESTIONS_FTS_TABLE
+from migrations import run_migrations, schema_is_current
+from llm import extract_questions_chunked, get_cache_summary, clear_cache, get_call_stats, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP, DEFAULT_MAX_CONCURRENCY
+from importer import BulkImporter, DUPLICATE_MODES
+from dedup import duplicate_clusters
+from jobs import JobQueue, fail_interrupted_jobs, remove_upload
+from docx_stream import WordParagraph, iter_paragraphs
+from question_parser import QuestionParser, MARKER_KINDS, parse_marker_list
+from assembly import parse_spec, assemble
+from variants import MAX_VARIANTS, generate_variants, load_swap_candidates, variant_rows, encode_order, decode_order, encode_substitutions, decode_substitutions
+from http_cache import ResponseCache, invalidate_on_commit
+from events import ExamEventBroker, iter_event_stream, publish_item_changes
+from exporter import ExportCache, RenderPool, EXPORT_PARTS, render_exam, render_variants, stream_zip, load_template, cache_tag, export_etag, export_filename, remove_legacy_exports
 
 # PyInstaller Trick: resource_path() Funktion
 def resource_path(relative_path):
@@ -35,28 +54,88 @@ else:
 
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(
+# Datenordner für Datenbank, Uploads und Export-Cache - neben app.py bzw. der .exe
+INSTANCE_DIR = os.environ.get('HORTIEXAM_INSTANCE_DIR') or os.path.join(
     os.path.dirname(os.path.abspath(__file__)) if not getattr(sys, 'frozen', False) else os.path.dirname(sys.executable),
-    'instance',
-    'hortiexam.db'
+    'instance'
 )
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(INSTANCE_DIR, 'hortiexam.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)) if not getattr(sys, 'frozen', False) else os.path.dirname(sys.executable),
-    'instance',
-    'uploads'
-)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# SQLite-Tuning für viele gleichzeitige Nutzer im LAN (Profil: 'wal' oder 'safe')
+app.config['SQLITE_PRAGMAS'] = SQLITE_PRAGMA_PROFILES[os.environ.get('HORTIEXAM_SQLITE_PROFILE', 'wal')]
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.environ.get('HORTIEXAM_DB_POOL_SIZE', 10)),
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_recycle': 3600,
+    'connect_args': {
+        'timeout': 30,  # Sekunden, sqlite3-Gegenstück zu busy_timeout
+        'check_same_thread': False,
+    },
+}
+app.config['UPLOAD_FOLDER'] = os.path.join(INSTANCE_DIR, 'uploads')
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('HORTIEXAM_MAX_UPLOAD_MB', 64)) * 1024 * 1024  # Max. Dateigröße
+app.config['WORD_PARSER'] = os.environ.get('HORTIEXAM_WORD_PARSER', 'stream')  # 'stream' (speicherschonend) oder 'docx' (python-docx)
+app.config['LLM_CACHE_MAX_AGE_DAYS'] = int(os.environ.get('HORTIEXAM_LLM_CACHE_DAYS', 90))
+app.config['LLM_CACHE_MAX_BYTES'] = int(os.environ.get('HORTIEXAM_LLM_CACHE_MB', 50)) * 1024 * 1024
+app.config['IMPORT_BATCH_SIZE'] = int(os.environ.get('HORTIEXAM_IMPORT_BATCH_SIZE', 500))  # Fragen pro INSERT-Batch/Commit
+app.config['IMPORT_WORKERS'] = int(os.environ.get('HORTIEXAM_IMPORT_WORKERS', 2))  # Parallele Hintergrund-Importe
+app.config['EXPORT_CACHE_FOLDER'] = os.path.join(os.path.dirname(app.config['UPLOAD_FOLDER']), 'export_cache')
+app.config['EXPORT_CACHE_MAX_BYTES'] = int(os.environ.get('HORTIEXAM_EXPORT_CACHE_MB', 200)) * 1024 * 1024
+app.config['EXPORT_TEMPLATE'] = os.environ.get('HORTIEXAM_EXPORT_TEMPLATE')  # Eigene .docx-Vorlage (optional)
+app.config['EXPORT_PROCESSES'] = int(os.environ.get('HORTIEXAM_EXPORT_PROCESSES', os.cpu_count() or 1))  # Prozesse für Sammel-Exporte
+app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get('HORTIEXAM_RESPONSE_CACHE_MB', 32)) * 1024 * 1024  # JSON-Antworten im Speicher
+app.config['EVENT_STREAMS'] = int(os.environ.get('HORTIEXAM_EVENT_STREAMS', 32))  # Gleichzeitige Live-Verbindungen (eigene waitress-Threads)
 
 # Erstelle Upload-Ordner falls nicht vorhanden
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(os.path.dirname(app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '')), exist_ok=True)
 
 db.init_app(app)
+job_queue = JobQueue(app)
+export_cache = ExportCache(app.config['EXPORT_CACHE_FOLDER'], app.config['EXPORT_CACHE_MAX_BYTES'])
+render_pool = RenderPool(app.config['EXPORT_PROCESSES'])
+response_cache = ResponseCache(app.config['RESPONSE_CACHE_MAX_BYTES'])
+
+
+def cache_resources(obj):
+    """Cache-Ressourcen, die ein geändertes Objekt betrifft (siehe http_cache)"""
+    if isinstance(obj, Question):
+        return ('questions',)
+    if isinstance(obj, ExamItem):
+        return (('exam', obj.exam_id), 'usage')  # usage: Verwendungszähler in /questions/facets
+    return ()
+
+
+invalidate_on_commit(response_cache, cache_resources)
+exam_events = ExamEventBroker(app.config['EVENT_STREAMS'])
+_export_template = None
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+def get_export_template():
+    """Export-Vorlage einmal laden und als Bytes behalten"""
+    global _export_template
+    if _export_template is None:
+        _export_template = load_template(app.config['EXPORT_TEMPLATE'])
+    return _export_template
 
-# Erstelle Datenbank beim Start
 with app.app_context():
-    db.create_all()
+    configure_sqlite(db.engine, app.config['SQLITE_PRAGMAS'])
+
+# Erstelle Datenbank beim Start und bringe bestehende Datenbanken auf den aktuellen Stand.
+# Nicht in Worker-Prozessen des Export-Pools: die laden dieses Modul unter Windows
+# erneut und dürfen laufende Import-Jobs nicht als abgebrochen markieren.
+if multiprocessing.current_process().name == 'MainProcess':
+    with app.app_context():
+        # create_all() prüft jede Tabelle einzeln - bei aktuellem Schema (PRAGMA user_version) unnötig
+        if not schema_is_current(db.engine):
+            db.create_all()
+            run_migrations(db.engine)
+        fail_interrupted_jobs()
+        # Exporte zu geänderten/gelöschten Prüfungen und Altlasten im Upload-Ordner entfernen
+        export_cache.evict_stale(dict(db.session.query(Exam.id, Exam.revision).all()), cache_tag(get_export_template()))
+        remove_legacy_exports(app.config['UPLOAD_FOLDER'])
 
 
 def get_local_ip():
@@ -78,37 +157,296 @@ def index():
     return render_template('index.html', exams=exams)
 
 
+# Felder, die /questions ausliefern kann (Reihenfolge = Standard-Ausgabe)
+QUESTION_FIELDS = ('id', 'content', 'answer', 'category', 'tags', 'difficulty', 'active')
+QUESTIONS_PAGE_SIZE = 50
+QUESTIONS_MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(date_created, question_id):
+    """Keyset-Cursor (date_created, id) als URL-sicherer String"""
+    raw = f"{date_created.isoformat() if date_created else ''}|{question_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Gegenstück zu encode_cursor() - liefert (date_created, id)"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    date_part, id_part = raw.split('|', 1)
+    return (datetime.fromisoformat(date_part) if date_part else None), int(id_part)
+
+
+def encode_offset_cursor(offset):
+    """Cursor für die Volltextsuche (sortiert nach Relevanz, daher Offset statt Keyset)"""
+    return base64.urlsafe_b64encode(f"@{offset}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_offset_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii')
+    if not raw.startswith('@'):
+        raise ValueError('Kein Such-Cursor')
+    return max(0, int(raw[1:]))
+
+
+questions_fts = table(QUESTIONS_FTS_TABLE, column('rowid'), column('content'), column('answer'))
+_SEARCH_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_fts_query(search):
+    """Freitext in eine sichere FTS5-MATCH-Abfrage übersetzen (alle Wörter, Präfixsuche)"""
+    terms = _SEARCH_TERM_RE.findall(search)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def parse_fields(fields_param):
+    """fields=id,content,... in eine gültige Feldliste übersetzen"""
+    if not fields_param:
+        return list(QUESTION_FIELDS)
+    fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in QUESTION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unbekannte Felder: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def serialize_question(q, fields):
+    """Frage als Dict, nur mit den angeforderten Feldern"""
+    data = {}
+    for field in fields:
+        if field == 'tags':
+            data['tags'] = q.tag_list
+        elif field in ('content', 'answer', 'category'):
+            data[field] = getattr(q, field) or ''
+        else:
+            data[field] = getattr(q, field)
+    return data
+
+
+def filter_by_tags(query, tags, mode='any'):
+    """
+    Tag-Filter über die Indizes auf question_tags (exakte Tags, keine Teilstrings).
+    Liefert (query, (Datum, ID)) - die Spalten, nach denen die Seite sortiert wird.
+    """
+    if mode == 'all' or len(tags) == 1:
+        # Erster Tag per JOIN über (tag, date_created, question_id): Der Index liefert
+        # die Treffer schon sortiert, LIMIT bricht ab. Weitere Tags als EXISTS auf
+        # den Primärschlüssel (question_id, tag).
+        query = query.join(QuestionTag, db.and_(QuestionTag.question_id == Question.id, QuestionTag.tag == tags[0]))
+        for tag in tags[1:]:
+            query = query.filter(db.exists().where(
+                QuestionTag.question_id == Question.id,
+                QuestionTag.tag == tag
+            ).correlate(Question))
+        return query, (QuestionTag.date_created, QuestionTag.question_id)
+    # Mehrere Tags (any): Vereinigung mehrerer Index-Bereiche, sortiert wird danach
+    query = query.filter(Question.id.in_(
+        db.select(QuestionTag.question_id).where(QuestionTag.tag.in_(tags))
+    ))
+    return query, (Question.date_created, Question.id)
+
+
 @app.route('/questions')
+@response_cache.cached('questions')
 def questions():
-    """API: Liste aller Fragen (filterbar)"""
+    """API: Fragen seitenweise (Keyset-Pagination über date_created, id)
+
+    Parameter: q (Volltextsuche), category, tag (mehrfach oder kommagetrennt),
+    tag_mode (any/all), difficulty, active_only, limit, cursor, fields.
+    Mit q wird nach Relevanz sortiert und jede Frage enthält ein 'snippet'.
+    Header: X-Total-Count (Treffer gesamt, nur auf der ersten Seite ohne cursor),
+    X-Next-Cursor (fehlt auf der letzten Seite).
+    """
     try:
+        search = build_fts_query(request.args.get('q', ''))
         category = request.args.get('category', '')
-        tag = request.args.get('tag', '')
+        tags = parse_tags(','.join(request.args.getlist('tag')))
+        tag_mode = request.args.get('tag_mode', 'any')
         difficulty = request.args.get('difficulty', type=int)
         active_only = request.args.get('active_only', 'true') == 'true'
+        limit = request.args.get('limit', QUESTIONS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, QUESTIONS_MAX_PAGE_SIZE))
+        cursor = request.args.get('cursor', '')
+        
+        try:
+            fields = parse_fields(request.args.get('fields', ''))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         query = Question.query
+        sort_date, sort_id = Question.date_created, Question.id
         
         if active_only:
             query = query.filter(Question.active == True)
         if category:
             query = query.filter(Question.category == category)
-        if tag:
-            query = query.filter(Question.tags.contains(tag))
+        if tags:
+            query, (sort_date, sort_id) = filter_by_tags(query, tags, tag_mode)
         if difficulty:
             query = query.filter(Question.difficulty == difficulty)
         
-        questions = query.order_by(Question.date_created.desc()).all()
-        
-        return jsonify([{
-            'id': q.id,
-            'content': q.content or '',
-            'answer': q.answer or '',
-            'category': q.category or '',
-            'tags': [t.strip() for t in q.tags.split(',')] if q.tags and q.tags.strip() else [],
-            'difficulty': q.difficulty,
-            'active': q.active
-        } for q in questions])
+        if search:
+            query = query.join(questions_fts, questions_fts.c.rowid == Question.id) \
+                .filter(literal_column(QUESTIONS_FTS_TABLE).op('MATCH')(search))
+        
+        # Zählen nur für die erste Seite - Folgeseiten kosten so nur O(limit)
+        total = None if cursor else query.order_by(None).count()
+        
+        if search:
+            return search_questions_page(query, fields, limit, cursor, total)
+        
+        if cursor:
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor)
+            except (ValueError, UnicodeDecodeError):
+                return jsonify({'error': 'Ungültiger Cursor'}), 400
+            if cursor_date is None:
+                # NULL-Daten stehen bei DESC in SQLite am Ende
+                query = query.filter(sort_date.is_(None), sort_id < cursor_id)
+            else:
+                query = query.filter(db.or_(
+                    sort_date < cursor_date,
+                    db.and_(sort_date == cursor_date, sort_id < cursor_id),
+                    sort_date.is_(None)
+                ))
+        
+        # Nur benötigte Spalten laden - date_created wird für den Cursor gebraucht
+        columns = [getattr(Question, f) for f in fields if f != 'id'] + [Question.date_created]
+        query = query.options(load_only(*columns))
+        
+        # Eine Zeile mehr holen, um zu wissen, ob es eine nächste Seite gibt
+        rows = query.order_by(sort_date.desc(), sort_id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        response = jsonify([serialize_question(q, fields) for q in rows])
+        if total is not None:
+            response.headers['X-Total-Count'] = str(total)
+        if has_more:
+            last = rows[-1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last.date_created, last.id)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def search_questions_page(query, fields, limit, cursor, total):
+    """Eine Seite Suchtreffer, nach bm25-Relevanz sortiert, mit Snippet"""
+    try:
+        offset = decode_offset_cursor(cursor) if cursor else 0
+    except (ValueError, UnicodeDecodeError):
+        return jsonify({'error': 'Ungültiger Cursor'}), 400
+    
+    fts = literal_column(QUESTIONS_FTS_TABLE)
+    # Treffer in der Frage zählen doppelt so viel wie Treffer in der Lösung
+    rank = db.func.bm25(fts, 2.0, 1.0)
+    snippet = db.func.snippet(fts, -1, '<mark>', '</mark>', '…', 16)
+    
+    columns = [getattr(Question, f) for f in fields if f != 'id']
+    rows = query.options(load_only(*columns)) \
+        .add_columns(snippet) \
+        .order_by(rank, Question.id.desc()) \
+        .offset(offset).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    results = []
+    for q, snippet_text in rows:
+        data = serialize_question(q, fields)
+        data['snippet'] = snippet_text or ''
+        results.append(data)
+    
+    response = jsonify(results)
+    if total is not None:
+        response.headers['X-Total-Count'] = str(total)
+    if has_more:
+        response.headers['X-Next-Cursor'] = encode_offset_cursor(offset + limit)
+    return response
+
+
+@app.route('/questions/tags')
+@response_cache.cached('questions')
+def question_tags():
+    """API: Alle Tags mit Anzahl der Fragen (Facetten)"""
+    try:
+        active_only = request.args.get('active_only', 'true') == 'true'
+        
+        # Aus den Zählern in question_facets statt GROUP BY über question_tags
+        count = db.func.sum(QuestionFacet.questions)
+        query = db.session.query(QuestionFacet.tag, count).filter(QuestionFacet.tag != '')
+        if active_only:
+            query = query.filter(QuestionFacet.active == True)
+        rows = query.group_by(QuestionFacet.tag).having(count > 0).order_by(QuestionFacet.tag).all()
+        
+        return jsonify([{'tag': tag, 'count': count} for tag, count in rows])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/questions/facets')
+@response_cache.cached('questions', 'usage')
+def question_facets():
+    """API: Anzahl Fragen je Kategorie, Schwierigkeit, aktiv und Tag plus Verwendung in Prüfungen
+
+    Parameter: category, difficulty, tag (ein Tag), active_only (Standard true).
+    Jede Facette zählt mit allen Filtern außer ihrem eigenen - "active" zählt
+    daher immer aktive und inaktive Fragen. Gelesen wird nur die Zählertabelle
+    question_facets, der Aufwand hängt nicht von der Größe des Pools ab.
+    """
+    try:
+        category = request.args.get('category', '')
+        difficulty = request.args.get('difficulty', type=int)
+        tags = parse_tags(request.args.get('tag', ''))
+        if len(tags) > 1:
+            return jsonify({'error': 'Nur ein Tag als Filter möglich'}), 400
+        tag = tags[0] if tags else ''
+        active_only = request.args.get('active_only', 'true') == 'true'
+        
+        def matches(row, skip):
+            return ((skip == 'category' or not category or row.category == category)
+                    and (skip == 'difficulty' or not difficulty or row.difficulty == difficulty)
+                    and (skip == 'active' or not active_only or row.active))
+        
+        # Mit Tag-Filter liefern die Zeilen dieses Tags die Aufschlüsselung, sonst die Gesamtzeilen
+        rows = QuestionFacet.query.filter(QuestionFacet.tag == tag).all()
+        facets = {'category': {}, 'difficulty': {}, 'active': {'true': 0, 'false': 0}}
+        total = uses = used = 0
+        for row in rows:
+            if matches(row, 'category'):
+                facets['category'][row.category] = facets['category'].get(row.category, 0) + row.questions
+            if matches(row, 'difficulty'):
+                key = str(row.difficulty)
+                facets['difficulty'][key] = facets['difficulty'].get(key, 0) + row.questions
+            if matches(row, 'active'):
+                key = 'true' if row.active else 'false'
+                facets['active'][key] += row.questions
+            if matches(row, None):
+                total += row.questions
+                uses += row.uses
+                used += row.used
+        
+        # Tags zählen ohne den eigenen Filter (Kombinationen mehrerer Tags sind nicht vorberechnet)
+        count = db.func.sum(QuestionFacet.questions)
+        query = db.session.query(QuestionFacet.tag, count).filter(QuestionFacet.tag != '')
+        if category:
+            query = query.filter(QuestionFacet.category == category)
+        if difficulty:
+            query = query.filter(QuestionFacet.difficulty == difficulty)
+        if active_only:
+            query = query.filter(QuestionFacet.active == True)
+        facets['tags'] = {
+            tag_name: tag_count
+            for tag_name, tag_count in query.group_by(QuestionFacet.tag).having(count > 0).order_by(QuestionFacet.tag)
+        }
+        
+        return jsonify({
+            'total': total,
+            **facets,
+            'usage': {'exam_items': uses, 'questions_used': used, 'questions_unused': total - used},
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -121,24 +459,40 @@ def exam_view(exam_id):
 
 
 @app.route('/exam/<int:exam_id>/items')
+@response_cache.cached(lambda exam_id: ('exam', exam_id))
 def exam_items(exam_id):
     """API: Items einer Prüfung"""
     try:
-        exam = Exam.query.get_or_404(exam_id)
+        if db.session.get(Exam, exam_id) is None:
+            return jsonify({'error': 'Prüfung nicht gefunden'}), 404
         items = ExamItem.query.filter_by(exam_id=exam_id).order_by(ExamItem.position).all()
         
-        return jsonify([{
-            'id': item.id,
-            'content': item.snapshot_content or '',
-            'answer': item.snapshot_answer or '',
-            'points': item.points,
-            'position': item.position,
-            'original_question_id': item.original_question_id
-        } for item in items])
+        return jsonify([serialize_exam_item(item) for item in items])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/exam/<int:exam_id>/events')
+def exam_events_stream(exam_id):
+    """
+    Server-Sent Events: Änderungen an den Items einer Prüfung als "patch",
+    "reset" = Items komplett neu laden. Wiederaufnahme über Last-Event-ID.
+    """
+    if db.session.get(Exam, exam_id) is None:
+        return jsonify({'error': 'Prüfung nicht gefunden'}), 404
+    subscription = exam_events.subscribe(exam_id, request.headers.get('Last-Event-ID'))
+    if subscription is None:
+        response = jsonify({'error': 'Zu viele Live-Verbindungen'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    
+    response = app.response_class(iter_event_stream(subscription), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'  # Reverse-Proxy (nginx) nicht puffern lassen
+    return response
+
+
 @app.route('/exam/new', methods=['POST'])
 def exam_new():
     """Neue Prüfung erstellen"""
@@ -200,6 +554,71 @@ def exam_add_question(exam_id):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/exam/<int:exam_id>/assemble', methods=['POST'])
+def exam_assemble(exam_id):
+    """
+    Prüfung automatisch aus dem Pool zusammenstellen (siehe assembly.py).
+    JSON: Vorgaben wie count, total_points, points, difficulty, categories, tags,
+    exclude_recent, seed - dazu replace (vorhandene Items ersetzen), dry_run (nur
+    Vorschlag) und allow_partial (auch speichern, wenn nicht alle Vorgaben erfüllbar sind).
+    """
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type muss application/json sein'}), 400
+        
+        exam = Exam.query.get_or_404(exam_id)
+        try:
+            spec = parse_spec(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        replace = bool(request.json.get('replace'))
+        
+        existing = ExamItem.query.filter_by(exam_id=exam_id).options(
+            load_only(ExamItem.id, ExamItem.original_question_id, ExamItem.position)).all()
+        exclude_ids = set() if replace else {item.original_question_id for item in existing if item.original_question_id}
+        result = assemble(spec, exam_id, exclude_ids)
+        response = {
+            'question_ids': result.question_ids,
+            'report': result.report,
+            'unmet': result.unmet,
+            'saved': False
+        }
+        if request.json.get('dry_run') or not result.question_ids:
+            return jsonify(response), 200 if result.question_ids else 409
+        if result.unmet and not request.json.get('allow_partial'):
+            return jsonify(response), 409
+        
+        # Snapshots aller gewählten Fragen in einer Transaktion anlegen
+        questions = {
+            question.id: question for question in
+            Question.query.filter(Question.id.in_(result.question_ids))
+            .options(load_only(Question.id, Question.content, Question.answer))
+        }
+        if replace:
+            for item in existing:
+                db.session.delete(item)
+            position = 0
+        else:
+            position = max((item.position or 0 for item in existing), default=-1) + 1
+        db.session.add_all([
+            ExamItem(
+                exam_id=exam.id,
+                original_question_id=question_id,
+                snapshot_content=questions[question_id].content or '',  # SNAPSHOT!
+                snapshot_answer=questions[question_id].answer or '',    # SNAPSHOT!
+                points=result.points[question_id],
+                position=position + offset
+            )
+            for offset, question_id in enumerate(result.question_ids)
+        ])
+        db.session.commit()
+        response['saved'] = True
+        return jsonify(response)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/exam/<int:exam_id>/remove_item/<int:item_id>', methods=['DELETE'])
 def exam_remove_item(exam_id, item_id):
     """Item aus Prüfung entfernen"""
@@ -224,10 +643,7 @@ def exam_reorder(exam_id):
         if not isinstance(item_ids, list):
             return jsonify({'error': 'item_ids muss eine Liste sein'}), 400
         
-        for position, item_id in enumerate(item_ids):
-            item = ExamItem.query.filter_by(id=item_id, exam_id=exam_id).first()
-            if item:
-                item.position = position
+        apply_item_operations(exam_id, order=item_ids)
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -235,12 +651,140 @@ def exam_reorder(exam_id):
         return jsonify({'error': str(e)}), 500
 
 
+def serialize_exam_item(item):
+    return {
+        'id': item.id,
+        'content': item.snapshot_content or '',
+        'answer': item.snapshot_answer or '',
+        'points': item.points,
+        'position': item.position,
+        'original_question_id': item.original_question_id
+    }
+
+
+publish_item_changes(exam_events, serialize_exam_item)
+
+
+def parse_item_additions(entries):
+    """[12, {"question_id": 13, "points": 2}] -> [(12, 1), (13, 2)] - ValueError bei ungültigen Einträgen"""
+    additions = []
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            additions.append((int(entry['question_id']), max(1, int(entry.get('points') or 1))))
+        else:
+            additions.append((int(entry), 1))
+    return additions
+
+
+def apply_item_operations(exam_id, add=(), remove=(), order=None):
+    """
+    Items einer Prüfung in einem Rutsch ändern: Fragen als Snapshot hinzufügen,
+    Items entfernen, neu sortieren. Eine Abfrage für alle Items, eine für die
+    neuen Fragen; geschrieben wird beim Commit in einem Flush (gebündelte
+    INSERT/UPDATE/DELETE, Exam.revision steigt einmal). Committet nicht.
+    
+    add: [(question_id, points)], remove: [item_id], order: [item_id] - nicht
+    genannte Items behalten ihre Reihenfolge dahinter, neue Items kommen ans Ende.
+    """
+    items = ExamItem.query.filter_by(exam_id=exam_id).options(
+        load_only(ExamItem.id, ExamItem.exam_id, ExamItem.original_question_id, ExamItem.position)
+    ).order_by(ExamItem.position, ExamItem.id).all()
+    
+    remove_ids = {int(item_id) for item_id in remove or ()}
+    removed = [item for item in items if item.id in remove_ids]
+    for item in removed:
+        db.session.delete(item)
+    kept = [item for item in items if item.id not in remove_ids]
+    
+    # Neue Fragen: eine Abfrage, Fragen schon in der Prüfung (oder doppelt in der Anfrage) überspringen
+    present = {item.original_question_id for item in kept if item.original_question_id}
+    requested = [question_id for question_id, _ in add]
+    questions = {
+        question.id: question for question in
+        Question.query.filter(Question.id.in_(requested)).options(
+            load_only(Question.id, Question.content, Question.answer))
+    } if requested else {}
+    added, skipped, missing = [], [], []
+    for question_id, points in add:
+        if question_id not in questions:
+            missing.append(question_id)
+        elif question_id in present:
+            skipped.append(question_id)
+        else:
+            present.add(question_id)
+            question = questions[question_id]
+            added.append(ExamItem(
+                exam_id=exam_id,
+                original_question_id=question_id,
+                snapshot_content=question.content or '',  # SNAPSHOT!
+                snapshot_answer=question.answer or '',    # SNAPSHOT!
+                points=points
+            ))
+    db.session.add_all(added)
+    
+    # Positionen neu vergeben - nur geänderte Werte werden geschrieben
+    by_id = {item.id: item for item in kept}
+    ordered = []
+    for item_id in order or ():
+        item = by_id.pop(int(item_id), None)
+        if item is not None:
+            ordered.append(item)
+    ordered.extend(item for item in kept if item.id in by_id)
+    for position, item in enumerate(ordered + added):
+        if item.position != position:
+            item.position = position
+    
+    return {'added': added, 'removed': len(removed), 'skipped': skipped, 'missing': missing}
+
+
+@app.route('/exam/<int:exam_id>/items/batch', methods=['POST'])
+def exam_items_batch(exam_id):
+    """
+    Mehrere Änderungen an den Items einer Prüfung in einer Transaktion.
+    JSON: {"add": [12, {"question_id": 13, "points": 2}], "remove": [5], "order": [7, 3, 9]}
+    Antwort enthält die aktuelle Item-Liste - kein zweiter Request nötig.
+    """
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type muss application/json sein'}), 400
+        
+        exam = db.session.get(Exam, exam_id)
+        if exam is None:
+            return jsonify({'error': 'Prüfung nicht gefunden'}), 404
+        try:
+            add = parse_item_additions(request.json.get('add'))
+            remove = [int(item_id) for item_id in request.json.get('remove') or []]
+            order = request.json.get('order')
+            order = [int(item_id) for item_id in order] if order is not None else None
+        except (TypeError, ValueError, KeyError):
+            return jsonify({'error': 'add, remove und order müssen Listen von IDs sein'}), 400
+        
+        result = apply_item_operations(exam_id, add, remove, order)
+        db.session.commit()
+        
+        items = ExamItem.query.filter_by(exam_id=exam_id).order_by(ExamItem.position).all()
+        return jsonify({
+            'success': True,
+            'added': [{'question_id': item.original_question_id, 'item_id': item.id} for item in result['added']],
+            'removed': result['removed'],
+            'skipped': result['skipped'],
+            'missing': result['missing'],
+            'revision': exam.revision,
+            'items': [serialize_exam_item(item) for item in items]
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/import', methods=['GET', 'POST'])
 def import_questions():
-    """Word-Dokument hochladen und Fragen importieren"""
+    """Word-Dokument hochladen - der Import läuft als Hintergrund-Job"""
     if request.method == 'GET':
         llm_configs = LLMConfig.query.filter_by(active=True).all()
-        return render_template('import.html', llm_configs=llm_configs)
+        jobs = ImportJob.query.order_by(ImportJob.date_created.desc()).limit(10).all()
+        return render_template('import.html', llm_configs=llm_configs, jobs=jobs,
+                               highlight_job=request.args.get('job', type=int))
     
     if 'file' not in request.files:
         flash('Keine Datei ausgewählt', 'error')
@@ -251,282 +795,246 @@ def import_questions():
         flash('Keine Datei ausgewählt', 'error')
         return redirect(url_for('import_questions'))
     
-    if file and file.filename.endswith('.docx'):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    if not file.filename.endswith('.docx'):
+        flash('Bitte eine Word-Datei (.docx) auswählen', 'error')
+        return redirect(url_for('import_questions'))
+    
+    # Eindeutiger Dateiname - mehrere Importe können gleichzeitig laufen
+    filename = secure_filename(file.filename)
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], f'{uuid.uuid4().hex}_{filename}')
+    
+    try:
+        file.save(filepath)
         
-        try:
-            file.save(filepath)
-            
-            # Prüfe ob Datei wirklich gespeichert wurde
-            if not os.path.exists(filepath):
-                flash('Fehler beim Speichern der Datei', 'error')
-                return redirect(url_for('import_questions'))
-            
-            use_llm = request.form.get('use_llm') == 'on'
-            llm_config_id = request.form.get('llm_config_id', type=int)
-            
-            if use_llm and llm_config_id:
-                # LLM-basierter Import
-                count = import_from_word_with_llm(filepath, llm_config_id)
-            else:
-                # Klassischer Import
-                count = import_from_word(filepath)
-            
-            if count > 0:
-                flash(f'{count} Fragen erfolgreich importiert!', 'success')
-            else:
-                flash('Keine Fragen gefunden. Bitte überprüfe das Format der Word-Datei.', 'error')
-        except Exception as e:
-            flash(f'Fehler beim Import: {str(e)}', 'error')
-        finally:
-            # Datei löschen
-            try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            except:
-                pass
+        # Prüfe ob Datei wirklich gespeichert wurde
+        if not os.path.exists(filepath):
+            flash('Fehler beim Speichern der Datei', 'error')
+            return redirect(url_for('import_questions'))
+        
+        use_llm = request.form.get('use_llm') == 'on'
+        llm_config_id = request.form.get('llm_config_id', type=int)
+        duplicate_mode = request.form.get('duplicate_mode', 'skip')
+        markers = {
+            kind: parse_marker_list(request.form.get(f'{kind}_markers'))
+            for kind in MARKER_KINDS
+            if parse_marker_list(request.form.get(f'{kind}_markers'))
+        }
+        
+        job = ImportJob(
+            filename=file.filename,
+            filepath=filepath,
+            method='llm' if use_llm and llm_config_id else 'classic',
+            llm_config_id=llm_config_id if use_llm else None,
+            category=request.form.get('category', 'Allgemein').strip() or 'Allgemein',
+            duplicate_mode=duplicate_mode if duplicate_mode in DUPLICATE_MODES else 'skip',
+            markers=json.dumps(markers) if markers else None,
+            status='queued'
+        )
+        db.session.add(job)
+        db.session.commit()
+        
+        job_queue.submit(job.id, run_import_job)
+    except Exception as e:
+        db.session.rollback()
+        remove_upload(filepath)
+        flash(f'Fehler beim Import: {str(e)}', 'error')
+        return redirect(url_for('import_questions'))
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(serialize_import_job(job)), 202
     
+    flash(f'Import von "{job.filename}" gestartet.', 'success')
+    return redirect(url_for('import_questions', job=job.id))
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """Upload über MAX_CONTENT_LENGTH"""
+    message = f"Die Datei ist zu groß (maximal {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB)"
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': message}), 413
+    flash(message, 'error')
     return redirect(url_for('import_questions'))
 
 
-def import_from_word(filepath):
-    """Word-Dokument einlesen und Fragen extrahieren"""
+def serialize_import_job(job):
+    return {
+        'id': job.id,
+        'filename': job.filename,
+        'method': job.method,
+        'category': job.category or '',
+        'status': job.status,
+        'finished': job.finished,
+        'chunks_total': job.chunks_total or 0,
+        'chunks_done': job.chunks_done or 0,
+        'questions_found': job.questions_found or 0,
+        'questions_imported': job.questions_imported or 0,
+        'questions_skipped': job.questions_skipped or 0,
+        'duplicate_mode': job.duplicate_mode or 'skip',
+        'questions_duplicate': job.questions_duplicate or 0,
+        'error': job.error or '',
+        'date_created': job.date_created.isoformat() if job.date_created else None,
+        'date_finished': job.date_finished.isoformat() if job.date_finished else None
+    }
+
+
+@app.route('/import/jobs/<int:job_id>')
+def import_job_status(job_id):
+    """API: Status eines Import-Jobs (wird von der Import-Seite gepollt)"""
     try:
-        doc = Document(filepath)
-        count = 0
-        current_question = None
-        current_answer = None
-        current_category = request.form.get('category', 'Allgemein') or 'Allgemein'
-        
-        for paragraph in doc.paragraphs:
-            text = paragraph.text.strip()
-            
-            # Ignoriere leere Zeilen
-            if not text:
-                continue
-            
-            # Frage erkennen (verschiedene Formate)
-            if text.lower().startswith('frage:') or text.startswith('FRAGE:'):
-                # Vorherige Frage speichern
-                if current_question and current_answer:
-                    question = Question(
-                        content=current_question.strip(),
-                        answer=current_answer.strip(),
-                        category=current_category,
-                        active=True
-                    )
-                    db.session.add(question)
-                    count += 1
-                
-                # Neue Frage beginnen
-                current_question = text.replace('Frage:', '').replace('FRAGE:', '').replace('frage:', '').strip()
-                current_answer = None
-            
-            # Lösung erkennen (verschiedene Formate)
-            elif text.lower().startswith('lösung:') or text.startswith('LÖSUNG:') or text.lower().startswith('loesung:'):
-                if current_question:
-                    current_answer = text.replace('Lösung:', '').replace('LÖSUNG:', '').replace('lösung:', '').replace('Loesung:', '').strip()
-                else:
-                    # Lösung ohne vorherige Frage - überspringen
-                    continue
-            
-            # Weiterer Text zur Frage oder Lösung
-            elif current_question and not current_answer:
-                # Weiterer Text zur Frage
-                if current_question:
-                    current_question += '<br>' + text
-            elif current_answer:
-                # Weiterer Text zur Lösung
-                current_answer += '<br>' + text
-        
-        # Letzte Frage speichern
-        if current_question and current_answer:
-            question = Question(
-                content=current_question.strip(),
-                answer=current_answer.strip(),
-                category=current_category,
-                active=True
-            )
-            db.session.add(question)
-            count += 1
-        
-        db.session.commit()
-        return count
+        job = ImportJob.query.get_or_404(job_id)
+        return jsonify(serialize_import_job(job))
     except Exception as e:
-        db.session.rollback()
-        raise Exception(f"Fehler beim Import: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
 
-def extract_text_from_word(filepath):
-    """Extrahiert den gesamten Text aus einem Word-Dokument"""
-    doc = Document(filepath)
-    text_parts = []
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():
-            text_parts.append(paragraph.text.strip())
-    return '\n\n'.join(text_parts)
+def run_import_job(job, progress):
+    """Handler für die Jobqueue: führt den passenden Import aus"""
+    if job.method == 'llm':
+        return import_from_word_with_llm(job.filepath, job.llm_config_id, job.category, progress,
+                                         job.duplicate_mode or 'skip')
+    return import_from_word(job.filepath, job.category, progress, job.duplicate_mode or 'skip',
+                            json.loads(job.markers) if job.markers else None)
+
+
+def report_import_progress(progress):
+    """on_batch-Callback für BulkImporter (nach jedem Commit): Zähler in den Import-Job schreiben"""
+    def on_batch(importer):
+        # Core-INSERTs laufen an den Session-Events vorbei - Fragen-Cache hier verwerfen
+        response_cache.invalidate('questions')
+        if progress:
+            progress(questions_imported=importer.inserted, questions_skipped=importer.skipped,
+                     questions_duplicate=importer.duplicates)
+    return on_batch
 
 
-def call_llm_api(llm_config, text_content, category="Allgemein"):
-    """Ruft die konfigurierte LLM-API auf und extrahiert Fragen"""
+def import_from_word(filepath, category='Allgemein', progress=None, duplicate_mode='skip', markers=None):
+    """Word-Dokument einlesen und Fragen extrahieren (markers: eigene Marker-Wörter, siehe question_parser)"""
     try:
-        headers = {
-            'Content-Type': 'application/json'
-        }
+        importer = BulkImporter(on_batch=report_import_progress(progress), duplicate_mode=duplicate_mode)
+        parser = QuestionParser(markers)
         
-        # API-Key hinzufügen falls vorhanden
-        if llm_config.api_key:
-            if llm_config.provider == 'openai':
-                headers['Authorization'] = f'Bearer {llm_config.api_key}'
-            elif llm_config.provider == 'anthropic':
-                headers['x-api-key'] = llm_config.api_key
-                headers['anthropic-version'] = '2023-06-01'
-            else:
-                headers['Authorization'] = f'Bearer {llm_config.api_key}'
-        
-        # Zusätzliche Headers aus JSON parsen
-        if llm_config.headers:
-            try:
-                extra_headers = json.loads(llm_config.headers)
-                headers.update(extra_headers)
-            except:
-                pass
-        
-        # Prompt erstellen
-        if llm_config.prompt_template:
-            prompt = llm_config.prompt_template.replace('{text}', text_content).replace('{category}', category)
-        else:
-            prompt = f"""Analysiere folgenden Text und extrahiere alle Prüfungsfragen mit ihren Lösungen.
-
-Text:
-{text_content}
-
-Bitte gib die Fragen und Lösungen im folgenden JSON-Format zurück:
-{{
-  "questions": [
-    {{
-      "content": "Die Frage hier",
-      "answer": "Die Lösung hier",
-      "category": "{category}",
-      "tags": "Tag1, Tag2",
-      "difficulty": 3
-    }}
-  ]
-}}
-
-Nur JSON zurückgeben, keine zusätzlichen Erklärungen."""
-
-        # Request-Body je nach Provider
-        if llm_config.provider == 'openai':
-            body = {
-                "model": llm_config.model or "gpt-4",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.3
-            }
-        elif llm_config.provider == 'anthropic':
-            body = {
-                "model": llm_config.model or "claude-3-opus-20240229",
-                "max_tokens": 4000,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ]
-            }
-        else:
-            # Custom API - erwartet Standard-Format
-            body = {
-                "model": llm_config.model,
-                "prompt": prompt,
-                "temperature": 0.3,
-                "max_tokens": 4000
-            }
-        
-        # API-Call
-        response = requests.post(
-            llm_config.api_url,
-            headers=headers,
-            json=body,
-            timeout=60
-        )
-        response.raise_for_status()
-        
-        # Response parsen
-        data = response.json()
-        
-        # Response je nach Provider extrahieren
-        if llm_config.provider == 'openai':
-            content = data['choices'][0]['message']['content']
-        elif llm_config.provider == 'anthropic':
-            content = data['content'][0]['text']
-        else:
-            # Custom API - versuche verschiedene Formate
-            content = data.get('response') or data.get('text') or data.get('content') or str(data)
-        
-        # JSON aus Response extrahieren (falls es in Markdown-Code-Blöcken ist)
-        content = content.strip()
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        # JSON parsen mit besserer Fehlerbehandlung
-        try:
-            result = json.loads(content)
-        except json.JSONDecodeError as e:
-            # Versuche, JSON-Objekt zu finden falls es in Text eingebettet ist
-            import re
-            json_match = re.search(r'\{[^{}]*"questions"[^{}]*\[.*?\]', content, re.DOTALL)
-            if json_match:
-                try:
-                    result = json.loads(json_match.group(0))
-                except:
-                    raise Exception(f"LLM-API Fehler: Konnte JSON nicht parsen. Response: {content[:200]}")
-            else:
-                raise Exception(f"LLM-API Fehler: Konnte JSON nicht parsen. Response: {content[:200]}")
-        
-        questions = result.get('questions', [])
-        if not isinstance(questions, list):
-            raise Exception("LLM-API Fehler: 'questions' ist keine Liste")
-        
-        return questions
+        # Absätze mit Listenmarke ("1. Frage: ...") - der Parser erkennt Marker auch dahinter
+        lines = (paragraph.full_text for paragraph in iter_word_paragraphs(filepath))
+        for question in parser.parse(lines, category):
+            importer.add(question.content, question.answer, question.category, question.tags, question.difficulty)
         
+        count = importer.close()
+        if progress:
+            found = count + importer.skipped + (importer.duplicates if importer.duplicate_mode == 'skip' else 0)
+            progress(chunks_total=1, chunks_done=1, questions_found=found, questions_imported=count,
+                     questions_skipped=importer.skipped, questions_duplicate=importer.duplicates)
+        return count
     except Exception as e:
-        raise Exception(f"LLM-API Fehler: {str(e)}")
+        db.session.rollback()
+        raise Exception(f"Fehler beim Import: {str(e)}")
+
+
+def is_heading_paragraph(paragraph):
+    """Überschrift-Formatvorlage (englische und deutsche Word-Namen)?"""
+    style_name = (paragraph.style.name if paragraph.style is not None else '') or ''
+    return style_name.startswith(('Heading', 'Überschrift', 'Title', 'Titel'))
+
 
+def iter_word_paragraphs(filepath):
+    """
+    Absätze eines Word-Dokuments als WordParagraph-Generator. Der Stream-Parser
+    (Standard) liest auch Tabellen und Listennummern und braucht unabhängig von
+    der Dateigröße wenig Speicher; 'docx' nutzt python-docx wie bisher.
+    """
+    if app.config['WORD_PARSER'] == 'docx':
+        from docx import Document  # erst hier laden - python-docx kostet beim Start der .exe spürbar Zeit
+        for paragraph in Document(filepath).paragraphs:
+            yield WordParagraph(paragraph.text, is_heading_paragraph(paragraph), '', False)
+    else:
+        yield from iter_paragraphs(filepath)
 
-def import_from_word_with_llm(filepath, llm_config_id):
+
+def extract_paragraphs_from_word(filepath):
+    """Alle nicht-leeren Absätze als Generator von (text, is_heading)"""
+    for paragraph in iter_word_paragraphs(filepath):
+        text = paragraph.full_text.strip()
+        if text:
+            yield text, paragraph.is_heading
+
+
+def extract_text_from_word(filepath):
+    """Extrahiert den gesamten Text aus einem Word-Dokument"""
+    return '\n\n'.join(text for text, _ in extract_paragraphs_from_word(filepath))
+
+
+def import_from_word_with_llm(filepath, llm_config_id, category='Allgemein', progress=None, duplicate_mode='skip'):
     """Word-Dokument mit LLM analysieren und Fragen extrahieren"""
-    llm_config = LLMConfig.query.get_or_404(llm_config_id)
-    
-    # Text aus Word extrahieren
-    text_content = extract_text_from_word(filepath)
+    llm_config = db.session.get(LLMConfig, llm_config_id)
+    if llm_config is None:
+        raise Exception("LLM-Konfiguration nicht gefunden")
     
-    if not text_content.strip():
+    # Text aus Word extrahieren (Generator - das Dokument wird nicht komplett geladen)
+    paragraphs = extract_paragraphs_from_word(filepath)
+    first = next(paragraphs, None)
+    if first is None:
         raise Exception("Das Word-Dokument enthält keinen Text")
+    paragraphs = itertools.chain([first], paragraphs)
     
-    # LLM aufrufen
-    category = request.form.get('category', 'Allgemein')
-    questions_data = call_llm_api(llm_config, text_content, category)
-    
-    # Fragen in Datenbank speichern
-    count = 0
-    for q_data in questions_data:
-        question = Question(
-            content=q_data.get('content', '').strip(),
-            answer=q_data.get('answer', '').strip(),
-            category=q_data.get('category', category),
-            tags=q_data.get('tags', ''),
-            difficulty=q_data.get('difficulty', 3),
-            active=True
-        )
-        if question.content and question.answer:
-            db.session.add(question)
-            count += 1
+    # Fragen gruppenweise speichern, sobald sie eintreffen - ein abgebrochener
+    # Abschnitt kostet so nicht die bereits gelieferten Fragen
+    importer = BulkImporter(on_batch=report_import_progress(progress), duplicate_mode=duplicate_mode)
+    
+    def save_batch(batch):
+        for q_data in batch:
+            importer.add(
+                q_data.get('content'),
+                q_data.get('answer'),
+                q_data.get('category') or category,
+                q_data.get('tags', ''),
+                q_data.get('difficulty', 3)
+            )
+        importer.flush()
+    
+    # LLM abschnittsweise und parallel aufrufen
+    try:
+        extract_questions_chunked(llm_config, paragraphs, category, progress, on_questions=save_batch)
+    finally:
+        importer.close()
+    return importer.inserted
+
+
+@app.route('/duplicates')
+def duplicates_report():
+    """Bericht: Gruppen gleicher oder fast gleicher Fragen im gesamten Pool"""
+    try:
+        clusters = duplicate_clusters(db.session.connection(), limit=request.args.get('limit', 200, type=int))
+        ids = [question_id for cluster in clusters for question_id in cluster]
+        questions = {}
+        usage = {}
+        if ids:
+            questions = {q.id: q for q in Question.query.options(load_only(
+                Question.id, Question.content, Question.category, Question.active,
+                Question.date_created, Question.duplicate_of_id
+            )).filter(Question.id.in_(ids))}
+            usage = dict(db.session.query(ExamItem.original_question_id, db.func.count(ExamItem.id))
+                         .filter(ExamItem.original_question_id.in_(ids))
+                         .group_by(ExamItem.original_question_id).all())
+        
+        groups = [[{
+            'id': question_id,
+            'content': strip_html(questions[question_id].content)[:300],
+            'category': questions[question_id].category or '',
+            'active': questions[question_id].active,
+            'date_created': questions[question_id].date_created.isoformat() if questions[question_id].date_created else None,
+            'duplicate_of_id': questions[question_id].duplicate_of_id,
+            'exam_count': usage.get(question_id, 0)
+        } for question_id in cluster if question_id in questions] for cluster in clusters]
+        groups = [group for group in groups if len(group) > 1]
+    except Exception as e:
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({'error': str(e)}), 500
+        flash(f'Fehler beim Erstellen des Berichts: {str(e)}', 'error')
+        groups = []
     
-    db.session.commit()
-    return count
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(groups)
+    return render_template('duplicates.html', groups=groups)
 
 
 @app.route('/settings', methods=['GET', 'POST'])
@@ -535,10 +1043,11 @@ def settings():
     if request.method == 'GET':
         try:
             configs = LLMConfig.query.order_by(LLMConfig.date_created.desc()).all()
-            return render_template('settings.html', configs=configs)
+            return render_template('settings.html', configs=configs, cache=get_cache_summary(),
+                                   call_stats=get_call_stats())
         except Exception as e:
             flash(f'Fehler beim Laden der Konfigurationen: {str(e)}', 'error')
-            return render_template('settings.html', configs=[])
+            return render_template('settings.html', configs=[], cache=None, call_stats={})
     
     # POST: Neue Konfiguration speichern
     try:
@@ -560,6 +1069,12 @@ def settings():
                 provider=request.form.get('provider', 'custom'),
                 headers=request.form.get('headers', '').strip(),
                 prompt_template=request.form.get('prompt_template', '').strip(),
+                chunk_size=request.form.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int),
+                chunk_overlap=request.form.get('chunk_overlap', DEFAULT_CHUNK_OVERLAP, type=int),
+                max_concurrency=request.form.get('max_concurrency', DEFAULT_MAX_CONCURRENCY, type=int),
+                requests_per_minute=request.form.get('requests_per_minute', type=int) or None,
+                tokens_per_minute=request.form.get('tokens_per_minute', type=int) or None,
+                stream=request.form.get('stream') == 'on',
                 active=request.form.get('active') == 'on'
             )
             db.session.add(config)
@@ -587,6 +1102,12 @@ def settings():
             config.provider = request.form.get('provider', 'custom')
             config.headers = request.form.get('headers', '').strip()
             config.prompt_template = request.form.get('prompt_template', '').strip()
+            config.chunk_size = request.form.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+            config.chunk_overlap = request.form.get('chunk_overlap', DEFAULT_CHUNK_OVERLAP, type=int)
+            config.max_concurrency = request.form.get('max_concurrency', DEFAULT_MAX_CONCURRENCY, type=int)
+            config.requests_per_minute = request.form.get('requests_per_minute', type=int) or None
+            config.tokens_per_minute = request.form.get('tokens_per_minute', type=int) or None
+            config.stream = request.form.get('stream') == 'on'
             config.active = request.form.get('active') == 'on'
             db.session.commit()
             flash('LLM-Konfiguration erfolgreich aktualisiert!', 'success')
@@ -602,6 +1123,10 @@ def settings():
             db.session.commit()
             flash('LLM-Konfiguration gelöscht!', 'success')
         
+        elif action == 'clear_cache':
+            removed = clear_cache()
+            flash(f'LLM-Cache geleert ({removed} Einträge)', 'success')
+        
         return redirect(url_for('settings'))
     except Exception as e:
         db.session.rollback()
@@ -623,6 +1148,12 @@ def get_api_config(config_id):
             'provider': config.provider or 'custom',
             'headers': config.headers or '',
             'prompt_template': config.prompt_template or '',
+            'chunk_size': config.chunk_size or DEFAULT_CHUNK_SIZE,
+            'chunk_overlap': config.chunk_overlap if config.chunk_overlap is not None else DEFAULT_CHUNK_OVERLAP,
+            'max_concurrency': config.max_concurrency or DEFAULT_MAX_CONCURRENCY,
+            'requests_per_minute': config.requests_per_minute,
+            'tokens_per_minute': config.tokens_per_minute,
+            'stream': config.stream is not False,
             'active': config.active
         })
     except Exception as e:
@@ -633,77 +1164,293 @@ def get_api_config(config_id):
 def export_exam(exam_id):
     """Prüfung als Word-Dokument exportieren"""
     exam = Exam.query.get_or_404(exam_id)
-    items = ExamItem.query.filter_by(exam_id=exam_id).order_by(ExamItem.position).all()
-    
-    if not items:
-        flash('Die Prüfung enthält keine Fragen. Bitte fügen Sie zuerst Fragen hinzu.', 'error')
-        return redirect(url_for('exam_view', exam_id=exam_id))
-    
-    # Word-Dokument erstellen
-    doc = Document()
-    
-    # Kopfzeile
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = exam.title
-    header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Titel
-    title = doc.add_heading(exam.title, 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Datum
-    date_para = doc.add_paragraph(f'Erstellt am: {exam.date_created.strftime("%d.%m.%Y")}')
-    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    doc.add_paragraph()  # Leerzeile
-    
-    # Fragen
-    for idx, item in enumerate(items, 1):
-        # Frage
-        q_heading = doc.add_heading(f'Frage {idx} ({item.points} Punkte)', level=1)
-        q_para = doc.add_paragraph()
-        # HTML entfernen (einfache Version)
-        content = item.snapshot_content
-        content = content.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-        content = re.sub(r'<[^>]+>', '', content)  # Entferne alle HTML-Tags
-        q_para.add_run(content)
-        
-        doc.add_paragraph()  # Leerzeile
-    
-    # Lösungen (neue Seite)
-    doc.add_page_break()
-    solutions_heading = doc.add_heading('Lösungen', 0)
-    solutions_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    doc.add_paragraph()
-    
-    for idx, item in enumerate(items, 1):
-        sol_heading = doc.add_heading(f'Lösung {idx}', level=1)
-        sol_para = doc.add_paragraph()
-        answer = item.snapshot_answer
-        answer = answer.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-        answer = re.sub(r'<[^>]+>', '', answer)  # Entferne alle HTML-Tags
-        sol_para.add_run(answer)
-        doc.add_paragraph()
-    
-    # Speichern
-    safe_title = re.sub(r'[^\w\s-]', '', exam.title).strip().replace(' ', '_')
-    filename = f'exam_{exam_id}_{safe_title}.docx'
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    doc.save(filepath)
-    
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    
+    # ETag aus Revision und Vorlage - ein unveränderter Export wird gar nicht erst geladen
+    tag = cache_tag(get_export_template())
+    etag = export_etag(exam.id, exam.revision, tag)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    data = export_cache.read(exam.id, exam.revision, tag)
+    if data is None:
+        items = ExamItem.query.filter_by(exam_id=exam_id).order_by(ExamItem.position).all()
+        
+        if not items:
+            flash('Die Prüfung enthält keine Fragen. Bitte fügen Sie zuerst Fragen hinzu.', 'error')
+            return redirect(url_for('exam_view', exam_id=exam_id))
+        
+        rows = [(item.points, item.snapshot_content or '', item.snapshot_answer or '') for item in items]
+        data = export_cache.get_or_render(
+            exam.id, exam.revision, tag,
+            lambda: render_exam(exam.title, exam.date_created, rows, get_export_template())
+        )
+    
+    # Direkt aus dem Speicher senden - keine Datei im Upload-Ordner
+    response = send_file(BytesIO(data), mimetype=DOCX_MIMETYPE, as_attachment=True,
+                         download_name=export_filename(exam.id, exam.title), etag=False, max_age=0)
+    response.content_length = len(data)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # Browser fragt mit If-None-Match nach
+    return response
+
+
+@app.route('/export/batch', methods=['GET', 'POST'])
+def export_batch():
+    """
+    Mehrere Prüfungen als ZIP exportieren: exam_id (mehrfach) bzw. JSON {"exam_ids": [...]}.
+    Mit separate=1 je ein Dokument für Fragen und eines für Lösungen.
+    Die Dokumente werden parallel erzeugt und gehen raus, sobald sie fertig sind.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        raw_ids = payload.get('exam_ids') if payload else request.values.getlist('exam_id')
+        separate = bool(payload.get('separate')) if payload else request.values.get('separate', '') in ('1', 'true', 'on')
+        try:
+            exam_ids = list(dict.fromkeys(int(exam_id) for exam_id in raw_ids or []))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Ungültige Prüfungs-ID'}), 400
+        if not exam_ids:
+            return jsonify({'error': 'Keine Prüfungen ausgewählt'}), 400
+
+        exams = {exam.id: exam for exam in Exam.query.filter(Exam.id.in_(exam_ids)).all()}
+        missing = [exam_id for exam_id in exam_ids if exam_id not in exams]
+        if missing:
+            return jsonify({'error': f'Prüfungen nicht gefunden: {", ".join(map(str, missing))}'}), 404
+
+        # Alle Items in einer Abfrage - nach dem Start des Streams wird die Datenbank nicht mehr gebraucht
+        items = {}
+        for item in ExamItem.query.filter(ExamItem.exam_id.in_(exam_ids)).order_by(ExamItem.exam_id, ExamItem.position):
+            items.setdefault(item.exam_id, []).append(
+                (item.points, item.snapshot_content or '', item.snapshot_answer or ''))
+        exam_ids = [exam_id for exam_id in exam_ids if exam_id in items]  # Leere Prüfungen überspringen
+        if not exam_ids:
+            return jsonify({'error': 'Die ausgewählten Prüfungen enthalten keine Fragen'}), 400
+
+        template = get_export_template()
+        tag = cache_tag(template)
+        parts = ('questions', 'solutions') if separate else ('full',)
+        cached = []
+        tasks = []
+        for exam_id in exam_ids:
+            exam = exams[exam_id]
+            for part in parts:
+                key = (exam.id, exam.revision, part, export_filename(exam.id, exam.title, part))
+                data = export_cache.read(exam.id, exam.revision, tag, part)
+                if data is not None:
+                    cached.append((key[3], data))
+                else:
+                    tasks.append((key, (exam.title, exam.date_created, items[exam_id], template, part)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def files():
+        yield from cached
+        for (exam_id, revision, part, filename), data, error in render_pool.render_unordered(tasks):
+            if error is not None:
+                app.logger.error(f"Export von Prüfung {exam_id} fehlgeschlagen: {error}")
+                yield f'FEHLER_{filename[:-5]}.txt', f'Export fehlgeschlagen: {error}'.encode('utf-8')
+                continue
+            export_cache.put(exam_id, revision, tag, data, part)
+            yield filename, data
+
+    response = app.response_class(stream_zip(files()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=pruefungen_{datetime.now():%Y%m%d_%H%M}.zip'
+    response.cache_control.no_store = True
+    return response
+
+
+def serialize_variant(variant, exam):
+    substitutions = decode_substitutions(variant.substitutions)
+    return {
+        'id': variant.id,
+        'label': variant.label,
+        'seed': variant.seed,
+        'item_order': decode_order(variant.item_order),
+        'substitutions': {str(item_id): question_id for item_id, question_id in substitutions.items()},
+        'swapped': len(substitutions),
+        'stale': variant.exam_revision != exam.revision,
+        'date_created': variant.date_created.isoformat() if variant.date_created else None
+    }
+
+
+@app.route('/exam/<int:exam_id>/variants', methods=['GET', 'POST'])
+def exam_variants(exam_id):
+    """
+    Varianten (Gruppen A, B, ...) einer Prüfung anzeigen bzw. neu erzeugen.
+    POST: {"count": 4, "seed": 1234, "swap_ratio": 0.25} - ersetzt vorhandene Varianten.
+    """
+    try:
+        exam = Exam.query.get_or_404(exam_id)
+        if request.method == 'GET':
+            return jsonify([serialize_variant(variant, exam) for variant in exam.variants])
+        
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type muss application/json sein'}), 400
+        try:
+            count = int(request.json.get('count', 3))
+            seed = request.json.get('seed')
+            seed = int(seed) if seed not in (None, '') else random.randrange(1, 1000000)
+            swap_ratio = float(request.json.get('swap_ratio') or 0)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'count, seed und swap_ratio müssen Zahlen sein'}), 400
+        if not 1 <= count <= MAX_VARIANTS:
+            return jsonify({'error': f'Anzahl muss zwischen 1 und {MAX_VARIANTS} liegen'}), 400
+        if not 0 <= swap_ratio <= 1:
+            return jsonify({'error': 'swap_ratio muss zwischen 0 und 1 liegen'}), 400
+        
+        items = [(item.id, item.original_question_id) for item in
+                 ExamItem.query.filter_by(exam_id=exam_id).order_by(ExamItem.position)
+                 .options(load_only(ExamItem.id, ExamItem.original_question_id))]
+        if not items:
+            return jsonify({'error': 'Die Prüfung enthält keine Fragen'}), 400
+        buckets, candidates = load_swap_candidates(question_id for _, question_id in items) if swap_ratio else ({}, {})
+        
+        ExamVariant.query.filter_by(exam_id=exam_id).delete(synchronize_session=False)
+        for label, order, substitutions in generate_variants(items, count, seed, swap_ratio, buckets, candidates):
+            db.session.add(ExamVariant(
+                exam_id=exam_id,
+                label=label,
+                seed=seed,
+                exam_revision=exam.revision,
+                item_order=encode_order(order),
+                substitutions=encode_substitutions(substitutions)
+            ))
+        db.session.commit()
+        return jsonify([serialize_variant(variant, exam) for variant in exam.variants])
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/exam/<int:exam_id>/variants', methods=['DELETE'])
+def exam_variants_delete(exam_id):
+    """Alle Varianten einer Prüfung löschen"""
+    try:
+        ExamVariant.query.filter_by(exam_id=exam_id).delete(synchronize_session=False)
+        db.session.commit()
+        return jsonify({'success': True})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/exam/<int:exam_id>/variants/export')
+def export_variants(exam_id):
+    """
+    Alle Varianten als ZIP. Jede Frage wird dabei nur einmal gerendert und in
+    die Varianten kopiert; bei mehreren Prozessen teilen sich diese die Varianten.
+    """
+    try:
+        exam = Exam.query.get_or_404(exam_id)
+        variants = list(exam.variants)
+        if not variants:
+            return jsonify({'error': 'Keine Varianten vorhanden'}), 400
+        if any(variant.exam_revision != exam.revision for variant in variants):
+            return jsonify({'error': 'Die Prüfung wurde nach dem Erzeugen der Varianten geändert - bitte neu erzeugen'}), 409
+        
+        items = {item.id: item for item in ExamItem.query.filter_by(exam_id=exam_id)}
+        replacement_ids = {question_id for variant in variants
+                           for question_id in decode_substitutions(variant.substitutions).values()}
+        questions = {
+            question_id: (content, answer)
+            for question_id, content, answer in db.session.query(Question.id, Question.content, Question.answer)
+            .filter(Question.id.in_(replacement_ids))
+        } if replacement_ids else {}
+        rows = [(variant.label, variant_rows(variant, items, questions)) for variant in variants]
+        
+        template = get_export_template()
+        parts = ('questions', 'solutions') if request.args.get('separate', '') in ('1', 'true', 'on') else ('full',)
+        chunk_count = max(1, min(render_pool.max_workers, len(rows)))
+        tasks = [
+            ((part, index), (exam.title, exam.date_created, rows[index::chunk_count], template, part))
+            for part in parts for index in range(chunk_count)
+        ]
+        title = exam.title
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def files():
+        for (part, _), documents, error in render_pool.render_unordered(tasks, render=render_variants):
+            if error is not None:
+                app.logger.error(f"Export der Varianten von Prüfung {exam_id} fehlgeschlagen: {error}")
+                yield f'FEHLER_{part}.txt', f'Export fehlgeschlagen: {error}'.encode('utf-8')
+                continue
+            for label, data in documents:
+                yield export_filename(exam_id, f'{title} Gruppe {label}', part), data
+    
+    response = app.response_class(stream_zip(files()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=exam_{exam_id}_varianten.zip'
+    response.cache_control.no_store = True
+    return response
+
+
+def parse_args(argv=None):
+    """Kommandozeile: Entwicklungsserver oder Produktivbetrieb (waitress)"""
+    # Die .exe läuft standardmäßig im Produktivmodus
+    default_mode = os.environ.get('HORTIEXAM_MODE', 'production' if getattr(sys, 'frozen', False) else 'dev')
+    
+    parser = argparse.ArgumentParser(description='HortiExam - Fragenbank für Gartenbau-Prüfungen')
+    parser.add_argument('--mode', choices=['dev', 'production'], default=default_mode,
+                        help='dev = Werkzeug mit Debug/Auto-Reload, production = waitress (Umgebung: HORTIEXAM_MODE)')
+    parser.add_argument('--serve', dest='mode', action='store_const', const='production',
+                        help='Kurzform für --mode production')
+    parser.add_argument('--host', default=os.environ.get('HORTIEXAM_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('HORTIEXAM_PORT', 5000)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('HORTIEXAM_THREADS', 16)),
+                        help='Worker-Threads im Produktivmodus')
+    parser.add_argument('--connection-limit', type=int, default=int(os.environ.get('HORTIEXAM_CONNECTION_LIMIT', 200)),
+                        help='Maximale gleichzeitige Verbindungen im Produktivmodus')
+    parser.add_argument('--backlog', type=int, default=int(os.environ.get('HORTIEXAM_BACKLOG', 1024)),
+                        help='Länge der TCP-Warteschlange im Produktivmodus')
+    return parser.parse_args(argv)
+
+
+def serve_production(args):
+    """App unter waitress (multi-threaded, reines Python) ausliefern"""
+    try:
+        from waitress import serve
+    except ImportError:
+        print("waitress ist nicht installiert (pip install waitress) - starte Entwicklungsserver ohne Debug.")
+        app.run(host=args.host, port=args.port, debug=False, use_reloader=False, threaded=True)
+        return
+    
+    serve(
+        app,
+        host=args.host,
+        port=args.port,
+        threads=args.threads + app.config['EVENT_STREAMS'],  # Live-Verbindungen belegen je einen Thread
+        connection_limit=args.connection_limit,
+        backlog=args.backlog,
+        channel_timeout=120,
+        channel_request_lookahead=1,  # Socket weiterlesen - getrennte Live-Verbindungen fallen beim nächsten Heartbeat auf
+        ident='HortiExam'
+    )
 
 
 if __name__ == '__main__':
+    # Kindprozesse des Export-Pools in der .exe springen hier direkt in den Worker
+    # und starten keinen zweiten Server (ohne PyInstaller wirkungslos)
+    multiprocessing.freeze_support()
+    args = parse_args()
     local_ip = get_local_ip()
-    port = 5000
+    port = args.port
     print(f"\n{'='*60}")
     print(f"HortiExam - Fragenbank für Gartenbau-Prüfungen")
     print(f"{'='*60}")
     print(f"Läuft auf:")
     print(f"  Lokal:    http://127.0.0.1:{port}")
     print(f"  LAN:      http://{local_ip}:{port}")
+    if args.mode == 'production':
+        print(f"Modus:      Produktiv (waitress, {args.threads} Threads, max. {args.connection_limit} Verbindungen)")
+    else:
+        print(f"Modus:      Entwicklung (Debug + Auto-Reload)")
     print(f"{'='*60}\n")
     
-    # Auto-Reload aktiviert für automatische Neustarts bei Dateiänderungen
-    app.run(host='0.0.0.0', port=port, debug=True, use_reloader=True)
+    if args.mode == 'production':
+        serve_production(args)
+    else:
+        # Auto-Reload aktiviert für automatische Neustarts bei Dateiänderungen
+        app.run(host=args.host, port=port, debug=True, use_reloader=True)
@@ -0,0 +1,405 @@
+"""
+Automatische Zusammenstellung einer Prüfung aus dem Fragen-Pool.
+
+Vorgaben (alle optional): Anzahl Fragen oder Gesamtpunkte, Verteilung der
+Schwierigkeit, Mindestanzahl pro Kategorie und pro Tag, "nicht in den
+letzten N Prüfungen verwendet".
+
+Statt über einzelne Fragen wird über Buckets gesucht: Fragen mit gleicher
+Kategorie, Schwierigkeit und gleichen (geforderten) Tags sind für die
+Vorgaben austauschbar. Das sind auch bei 50.000 Fragen nur einige hundert
+Buckets. Ihre Größen kommen aus den mitgeführten Zählern in question_facets,
+abzüglich weniger, per Index gelesener Fragen (Duplikate, ausgeschlossene,
+mit geforderten Tags) - der Pool wird dabei nicht durchsucht. Zuerst wird
+gierig Platz für Platz der Bucket gewählt, der die Abweichung von den
+Vorgaben am stärksten senkt, danach verbessert eine lokale Suche das Ergebnis
+durch Tauschzüge (Bucket raus, anderer rein), bis nichts mehr besser wird.
+Erst dann werden die IDs der gewählten Buckets gelesen und zufällig gezogen.
+"""
+import random
+import time
+from collections import Counter, namedtuple
+
+from sqlalchemy import text
+
+from models import db, Question, QuestionTag, QuestionFacet, Exam, ExamItem
+
+
+MAX_QUESTIONS = 200
+SEARCH_BUDGET_SECONDS = 0.5  # Obergrenze für die lokale Suche
+
+AssemblySpec = namedtuple('AssemblySpec', 'count total_points points difficulty categories tags exclude_recent seed')
+AssemblyResult = namedtuple('AssemblyResult', 'question_ids points report unmet')
+
+
+def _weights(value, name, keys=None):
+    """{Schlüssel: Zahl >= 0} prüfen - Schlüssel optional aus keys"""
+    if not value:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f'{name} muss ein Objekt sein, z.B. {{"GaLaBau": 3}}')
+    result = {}
+    for key, number in value.items():
+        try:
+            number = float(number)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name}: "{number}" ist keine Zahl')
+        if number < 0:
+            raise ValueError(f'{name}: Werte dürfen nicht negativ sein')
+        if keys is not None:
+            try:
+                key = int(key)
+            except (TypeError, ValueError):
+                key = None
+            if key not in keys:
+                raise ValueError(f'{name}: ungültiger Schlüssel')
+        if number:
+            result[key] = number
+    return result
+
+
+def parse_spec(data):
+    """
+    Vorgaben aus dem JSON der Anfrage:
+    count, total_points, points (Zahl oder {Schwierigkeit: Punkte}),
+    difficulty ({Schwierigkeit: Gewicht}), categories ({Kategorie: Anzahl}),
+    tags ({Tag: Anzahl}), exclude_recent (Anzahl Prüfungen), seed.
+    Wirft ValueError bei ungültigen Angaben.
+    """
+    levels = set(range(1, 6))
+    points = data.get('points') or 1
+    if isinstance(points, dict):
+        points = {level: int(value) for level, value in _weights(points, 'points', levels).items()}
+        points = {level: points.get(level, 1) for level in levels}
+    else:
+        try:
+            points = {level: max(1, int(points)) for level in levels}
+        except (TypeError, ValueError):
+            raise ValueError('points muss eine Zahl oder ein Objekt {Schwierigkeit: Punkte} sein')
+
+    difficulty = _weights(data.get('difficulty'), 'difficulty', levels)
+    categories = {str(key): int(value) for key, value in _weights(data.get('categories'), 'categories').items()}
+    tags = {str(key).strip().lower(): int(value) for key, value in _weights(data.get('tags'), 'tags').items()}
+
+    try:
+        count = int(data['count']) if data.get('count') else None
+        total_points = int(data['total_points']) if data.get('total_points') else None
+        exclude_recent = int(data.get('exclude_recent') or 0)
+        seed = int(data['seed']) if data.get('seed') not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError('count, total_points, exclude_recent und seed müssen ganze Zahlen sein')
+
+    if count is None:
+        if total_points is None:
+            raise ValueError('Bitte Anzahl Fragen (count) oder Gesamtpunkte (total_points) angeben')
+        # Erwartete Punkte pro Frage aus der gewünschten Schwierigkeitsverteilung
+        if difficulty:
+            average = sum(points[level] * weight for level, weight in difficulty.items()) / sum(difficulty.values())
+        else:
+            average = sum(points.values()) / len(points)
+        count = max(1, round(total_points / average))
+    if not 1 <= count <= MAX_QUESTIONS:
+        raise ValueError(f'Anzahl Fragen muss zwischen 1 und {MAX_QUESTIONS} liegen')
+    if sum(categories.values()) > count or any(value > count for value in tags.values()):
+        raise ValueError('Die Mindestanzahlen pro Kategorie/Tag übersteigen die Anzahl Fragen')
+
+    return AssemblySpec(count, total_points, points, difficulty, categories, tags, max(0, exclude_recent), seed)
+
+
+def difficulty_targets(count, weights):
+    """Gewichte auf ganze Anzahlen verteilen (größter Rest)"""
+    if not weights:
+        return {}
+    total = sum(weights.values())
+    exact = {level: count * weight / total for level, weight in weights.items()}
+    targets = {level: int(value) for level, value in exact.items()}
+    for level in sorted(exact, key=lambda level: exact[level] - targets[level], reverse=True)[:count - sum(targets.values())]:
+        targets[level] += 1
+    return {level: targets.get(level, 0) for level in range(1, 6)}
+
+
+def recently_used_question_ids(exam_id, limit):
+    """Fragen aus den letzten `limit` Prüfungen (ohne die aktuelle)"""
+    if not limit:
+        return set()
+    recent = (
+        db.session.query(Exam.id)
+        .filter(Exam.id != exam_id)
+        .order_by(Exam.date_created.desc(), Exam.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return {
+        question_id for (question_id,) in
+        db.session.query(ExamItem.original_question_id)
+        .filter(ExamItem.exam_id.in_(db.session.query(recent.c.id)), ExamItem.original_question_id.isnot(None))
+        .distinct()
+    }
+
+
+def difficulty_level(difficulty):
+    """Schwierigkeit als Stufe 1-5 (ohne Angabe = 3)"""
+    return min(5, max(1, difficulty or 3))
+
+
+def _equals(column, value):
+    """column = value bzw. IS NULL - beides per Index"""
+    return column.is_(None) if value is None else column == value
+
+
+class BucketPool:
+    """
+    Pool als Buckets {(Kategorie, Schwierigkeit, geforderte Tags): Anzahl} für
+    aktive, nicht als Duplikat markierte und nicht ausgeschlossene Fragen.
+    Ohne Kategorie (NULL) zählt wie ''. draw() liest die IDs eines Buckets erst,
+    wenn er gewählt wurde (Index ix_questions_active_category_difficulty).
+    """
+
+    def __init__(self, spec, exclude_ids):
+        self.exclude_ids = set(exclude_ids)
+        self.counts = Counter()
+        self.difficulties = {}  # (Kategorie, Stufe): gespeicherte Werte, 0 = ohne Angabe
+        for category, difficulty, questions in (
+            db.session.query(QuestionFacet.category, QuestionFacet.difficulty, QuestionFacet.questions)
+            .filter(QuestionFacet.tag == '', QuestionFacet.active == True)
+        ):
+            key = (category, difficulty_level(difficulty))
+            self.counts[key + ((),)] += questions
+            self.difficulties.setdefault(key, set()).add(difficulty)
+
+        # Markierte Duplikate zählen in question_facets mit. Index fest vorgegeben - sonst
+        # liest SQLite den (abdeckenden) Bucket-Index über alle Fragen
+        for category, difficulty in db.session.execute(text(
+            "SELECT category, difficulty FROM questions INDEXED BY ix_questions_duplicate_of "
+            "WHERE duplicate_of_id IS NOT NULL AND active = 1"
+        )):
+            self.counts[(category or '', difficulty_level(difficulty), ())] -= 1
+
+        # Fragen mit geforderten Tags bekommen eigene Buckets, die IDs sind damit schon bekannt
+        self.tagged_ids = set()
+        self.tagged = {}
+        tagged = {}
+        if spec.tags:
+            for question_id, category, difficulty, tag in (
+                db.session.query(Question.id, Question.category, Question.difficulty, QuestionTag.tag)
+                .join(QuestionTag, QuestionTag.question_id == Question.id)
+                .filter(QuestionTag.tag.in_(list(spec.tags)), Question.active == True,
+                        Question.duplicate_of_id.is_(None))
+            ):
+                entry = tagged.setdefault(question_id, [category or '', difficulty_level(difficulty), set()])
+                entry[2].add(tag.lower())
+        for question_id, (category, level, tags) in tagged.items():
+            self.tagged_ids.add(question_id)
+            self.counts[(category, level, ())] -= 1
+            if question_id not in self.exclude_ids:
+                key = (category, level, tuple(sorted(tags)))
+                self.tagged.setdefault(key, []).append(question_id)
+                self.counts[key] += 1
+
+        excluded = self.exclude_ids - self.tagged_ids
+        if excluded:
+            for category, difficulty in (
+                db.session.query(Question.category, Question.difficulty)
+                .filter(Question.id.in_(excluded), Question.active == True, Question.duplicate_of_id.is_(None))
+            ):
+                self.counts[(category or '', difficulty_level(difficulty), ())] -= 1
+
+        self.counts = Counter({key: amount for key, amount in self.counts.items() if amount > 0})
+
+    def size(self):
+        return sum(self.counts.values())
+
+    def draw(self, key, amount, rng):
+        """amount zufällige Fragen-IDs aus dem Bucket key"""
+        if key in self.tagged:
+            ids = sorted(self.tagged[key])
+        else:
+            category, level, _ = key
+            ids = []
+            for category_value in ([None, ''] if category == '' else [category]):
+                for difficulty in sorted(self.difficulties.get((category, level), ())):
+                    for difficulty_value in ([None, 0] if difficulty == 0 else [difficulty]):
+                        ids.extend(question_id for (question_id,) in (
+                            db.session.query(Question.id)
+                            .filter(Question.active == True, _equals(Question.category, category_value),
+                                    _equals(Question.difficulty, difficulty_value), Question.duplicate_of_id.is_(None))
+                        ) if question_id not in self.exclude_ids and question_id not in self.tagged_ids)
+            ids.sort()
+        return rng.sample(ids, min(amount, len(ids)))
+
+
+# Gesamtpunkte wiegen schwerer als die Schwierigkeitsverteilung - die ist wegen
+# Rundung ohnehin nur ungefähr (±1 pro Stufe gilt als erfüllt)
+POINTS_WEIGHT = 3
+
+
+class _State:
+    """
+    Zähler der aktuellen Auswahl. Die Abweichung von den Vorgaben (0 = alles
+    erfüllt) wird für Kandidaten nur als Differenz berechnet - O(1) statt
+    alle Vorgaben neu zu zählen.
+    """
+
+    def __init__(self, spec, targets):
+        self.spec = spec
+        self.targets = targets
+        self.difficulty = Counter()
+        self.categories = Counter()
+        self.tags = Counter()
+        self.points = 0
+        self.points_target = None  # Gesamtpunkte zählen erst in der lokalen Suche
+
+    def _apply(self, key, sign):
+        category, difficulty, tags = key
+        self.difficulty[difficulty] += sign
+        self.categories[category] += sign
+        for tag in tags:
+            self.tags[tag] += sign
+        self.points += sign * self.spec.points[difficulty]
+
+    def add(self, key):
+        self._apply(key, 1)
+
+    def remove(self, key):
+        self._apply(key, -1)
+
+    def score(self):
+        spec = self.spec
+        score = sum(abs(self.difficulty[level] - target) for level, target in self.targets.items())
+        score += sum(max(0, quota - self.categories[category]) for category, quota in spec.categories.items())
+        score += sum(max(0, quota - self.tags[tag]) for tag, quota in spec.tags.items())
+        if self.points_target is not None:
+            score += POINTS_WEIGHT * abs(self.points - self.points_target)
+        return score
+
+    def delta(self, key, sign=1):
+        """Änderung von score(), wenn key hinzukäme (sign=1) bzw. entfiele (sign=-1)"""
+        spec = self.spec
+        category, difficulty, tags = key
+        delta = 0
+        if self.targets:
+            count, target = self.difficulty[difficulty], self.targets[difficulty]
+            delta += abs(count + sign - target) - abs(count - target)
+        quota = spec.categories.get(category)
+        if quota is not None:
+            count = self.categories[category]
+            delta += max(0, quota - count - sign) - max(0, quota - count)
+        for tag in tags:
+            quota = spec.tags[tag]
+            count = self.tags[tag]
+            delta += max(0, quota - count - sign) - max(0, quota - count)
+        if self.points_target is not None:
+            points = self.points + sign * spec.points[difficulty]
+            delta += POINTS_WEIGHT * (abs(points - self.points_target) - abs(self.points - self.points_target))
+        return delta
+
+
+def solve(counts, spec, rng=None):
+    """
+    Auswahl nach Bucket-Schlüsseln. counts: {Bucket-Schlüssel: verfügbare Fragen}.
+    Liefert (Counter {Bucket-Schlüssel: Anzahl}, _State mit den Zählern der Auswahl).
+    """
+    rng = rng or random.Random(spec.seed)
+    targets = difficulty_targets(spec.count, spec.difficulty)
+    state = _State(spec, targets)
+    remaining = {key: amount for key, amount in counts.items() if amount > 0}
+    selected = Counter()
+
+    def move(key, sign):
+        state._apply(key, sign)
+        selected[key] += sign
+        remaining[key] = remaining.get(key, 0) - sign
+        if not selected[key]:
+            del selected[key]
+        if not remaining[key]:
+            del remaining[key]
+
+    # 1. Gierig: Platz für Platz den besten Bucket, bei Gleichstand zufällig nach Größe gewichtet.
+    # Ohne Gesamtpunkte - Platz für Platz bewertet kämen sonst zuerst nur die schwersten Fragen
+    for _ in range(spec.count):
+        if not remaining:
+            break
+        best_delta, best = None, []
+        for key in remaining:
+            delta = state.delta(key)
+            if best_delta is None or delta < best_delta:
+                best_delta, best = delta, [key]
+            elif delta == best_delta:
+                best.append(key)
+        move(rng.choices(best, weights=[remaining[key] for key in best])[0], 1)
+
+    # 2. Lokale Suche: einen gewählten Bucket gegen einen freien tauschen, solange es besser wird
+    state.points_target = spec.total_points
+    deadline = time.monotonic() + SEARCH_BUDGET_SECONDS
+    improved = True
+    while improved and state.score() and time.monotonic() < deadline:
+        improved = False
+        out_keys = list(selected)
+        rng.shuffle(out_keys)
+        for out_key in out_keys:
+            if out_key not in selected:
+                continue
+            removed = state.delta(out_key, -1)
+            state.remove(out_key)
+            best_delta, best_key = 0, None
+            for in_key in remaining:
+                if in_key != out_key:
+                    delta = removed + state.delta(in_key)
+                    if delta < best_delta:
+                        best_delta, best_key = delta, in_key
+            state.add(out_key)
+            if best_key is not None:
+                move(out_key, -1)
+                move(best_key, 1)
+                improved = True
+                if not state.score() or time.monotonic() >= deadline:
+                    break
+
+    return selected, state
+
+
+def unmet_constraints(spec, state, found):
+    """Lesbare Liste der nicht erfüllten Vorgaben"""
+    unmet = []
+    if found < spec.count:
+        unmet.append(f'Nur {found} von {spec.count} Fragen verfügbar')
+    for level, target in state.targets.items():
+        if abs(state.difficulty[level] - target) > 1:
+            unmet.append(f'Schwierigkeit {level}: {state.difficulty[level]} statt {target}')
+    for category, quota in spec.categories.items():
+        if state.categories[category] < quota:
+            unmet.append(f'Kategorie "{category}": {state.categories[category]} statt mindestens {quota}')
+    for tag, quota in spec.tags.items():
+        if state.tags[tag] < quota:
+            unmet.append(f'Tag "{tag}": {state.tags[tag]} statt mindestens {quota}')
+    if spec.total_points is not None and state.points != spec.total_points:
+        unmet.append(f'Gesamtpunkte: {state.points} statt {spec.total_points}')
+    return unmet
+
+
+def assemble(spec, exam_id, exclude_ids=()):
+    """Fragen für eine Prüfung auswählen - schreibt nichts in die Datenbank"""
+    excluded = set(exclude_ids) | recently_used_question_ids(exam_id, spec.exclude_recent)
+    pool = BucketPool(spec, excluded)
+    rng = random.Random(spec.seed)
+    selected, state = solve(pool.counts, spec, rng)
+    # Erst jetzt die IDs der gewählten Buckets lesen und zufällig ziehen
+    picks = []
+    for key, amount in sorted(selected.items()):
+        question_ids = pool.draw(key, amount, rng)
+        picks.extend((question_id, key) for question_id in question_ids)
+        for _ in range(amount - len(question_ids)):
+            state.remove(key)  # Zähler und Bestand weichen ab - nur Gezogenes zählt
+    picks.sort(key=lambda pick: (pick[1][1], pick[1][0], pick[0]))  # Leichte Fragen zuerst, dann nach Kategorie
+    question_ids = [question_id for question_id, _ in picks]
+    report = {
+        'questions': len(question_ids),
+        'total_points': state.points,
+        'difficulty': {str(level): state.difficulty[level] for level in range(1, 6) if state.difficulty[level]},
+        'categories': {category: amount for category, amount in state.categories.items() if amount},
+        'tags': {tag: state.tags[tag] for tag in spec.tags},
+        'pool_size': pool.size(),
+        'excluded': len(excluded),
+    }
+    points = {question_id: spec.points[key[1]] for question_id, key in picks}
+    return AssemblyResult(question_ids, points, report, unmet_constraints(spec, state, len(question_ids)))
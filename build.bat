@@ -12,21 +12,33 @@ if %ERRORLEVEL% NEQ 0 (
     pip install pyinstaller
 )
 
+REM Build-Profil: Standard eine einzelne .exe, mit "build.bat onedir" ein Ordner.
+REM --onefile entpackt sich bei jedem Start in einen Temp-Ordner, --onedir
+REM startet ohne diesen Schritt deutlich schneller.
+set PROFILE=--onefile
+set TARGET=dist\HortiExam.exe
+if /I "%1"=="onedir" (
+    set PROFILE=--onedir
+    set TARGET=dist\HortiExam\HortiExam.exe ^(den ganzen Ordner weitergeben^)
+)
+
 REM Erstelle Build
-echo Erstelle .exe mit PyInstaller...
+echo Erstelle .exe mit PyInstaller (%PROFILE%)...
 pyinstaller --name="HortiExam" ^
-    --onefile ^
+    %PROFILE% ^
     --add-data "templates;templates" ^
     --add-data "static;static" ^
     --hidden-import=flask ^
     --hidden-import=sqlalchemy ^
     --hidden-import=docx ^
+    --collect-data docx ^
     --hidden-import=werkzeug ^
+    --hidden-import=waitress ^
     --console ^
     app.py
 
 echo.
 echo Build abgeschlossen!
-echo Die .exe-Datei befindet sich in: dist\HortiExam.exe
+echo Die .exe-Datei befindet sich in: %TARGET%
 echo.
 pause
@@ -11,21 +11,34 @@ if ! command -v pyinstaller &> /dev/null; then
     pip install pyinstaller
 fi
 
+# Build-Profil: Standard eine einzelne .exe, mit --onedir ein Ordner.
+# --onefile entpackt sich bei jedem Start in einen Temp-Ordner, --onedir
+# startet ohne diesen Schritt deutlich schneller.
+if [ "$1" = "--onedir" ]; then
+    PROFILE="--onedir"
+    TARGET="dist/HortiExam/HortiExam.exe (den ganzen Ordner weitergeben)"
+else
+    PROFILE="--onefile"
+    TARGET="dist/HortiExam.exe"
+fi
+
 # Erstelle Build
-echo "Erstelle .exe mit PyInstaller..."
+echo "Erstelle .exe mit PyInstaller ($PROFILE)..."
 pyinstaller --name="HortiExam" \
-    --onefile \
+    $PROFILE \
     --add-data "templates;templates" \
     --add-data "static;static" \
     --hidden-import=flask \
     --hidden-import=sqlalchemy \
     --hidden-import=docx \
+    --collect-data docx \
     --hidden-import=werkzeug \
+    --hidden-import=waitress \
     --console \
     app.py
 
 echo ""
 echo "Build abgeschlossen!"
-echo "Die .exe-Datei befindet sich in: dist/HortiExam.exe"
+echo "Die .exe-Datei befindet sich in: $TARGET"
 echo ""
 echo "Hinweis: Für Windows-Builds sollte dieser Befehl auf einem Windows-System ausgeführt werden."
@@ -0,0 +1,260 @@
+"""
+Erkennung doppelter und fast gleicher Fragen.
+
+Jede Frage bekommt einen Fingerabdruck aus ihrem normalisierten Text:
+- content_hash: SHA-1 über den normalisierten Text (exakte Duplikate)
+- minhash: MinHash-Signatur über Wort-Trigramme (Ähnlichkeit nach Jaccard)
+- LSH-Buckets: die Signatur in Bänder zerlegt; fast gleiche Fragen landen mit
+  hoher Wahrscheinlichkeit in mindestens einem gemeinsamen Bucket
+
+Kandidaten werden über den Index auf question_lsh gefunden statt jede Frage
+mit dem ganzen Pool zu vergleichen, und dann über die Signatur bestätigt.
+"""
+import re
+import struct
+import hashlib
+from collections import defaultdict, namedtuple
+
+from sqlalchemy import func
+
+
+NUM_PERM = 64  # Länge der MinHash-Signatur
+BANDS = 16  # LSH-Bänder à 4 Werte -> Kandidat ab ca. 50 % Ähnlichkeit
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8  # Ab hier gilt eine Frage als Duplikat
+SHINGLE_SIZE = 3
+
+_SALTS = [f'hortiexam-mh{i}'.encode('ascii') for i in range(NUM_PERM // 16)]  # blake2b liefert 16 Werte pro Salt
+_SIGNATURE_FORMAT = f'<{NUM_PERM}I'
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+Fingerprint = namedtuple('Fingerprint', 'content_hash minhash buckets')
+
+
+def normalize_text(plain_text):
+    """Kleinbuchstaben, nur Wörter - Satzzeichen und Leerraum spielen keine Rolle"""
+    return ' '.join(_WORD_RE.findall(plain_text.lower()))
+
+
+def shingles(normalized):
+    words = normalized.split()
+    if len(words) < SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(normalized):
+    """MinHash über die Shingles - NUM_PERM Hashfunktionen aus gesalzenem blake2b"""
+    signature = [0xFFFFFFFF] * NUM_PERM
+    for shingle in shingles(normalized):
+        data = shingle.encode('utf-8')
+        values = []
+        for salt in _SALTS:
+            values.extend(struct.unpack('<16I', hashlib.blake2b(data, digest_size=64, salt=salt).digest()))
+        signature = list(map(min, signature, values))
+    return signature
+
+
+def pack_signature(signature):
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data):
+    return list(struct.unpack(_SIGNATURE_FORMAT, data)) if data else None
+
+
+def lsh_buckets(signature):
+    """Ein Bucket pro Band: 64-Bit-Hash aus Bandnummer und den Werten des Bands"""
+    buckets = []
+    for band in range(BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<I{ROWS}I', band, *values), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def similarity(signature_a, signature_b):
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen (0..1)"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def fingerprint(plain_text):
+    """Fingerabdruck einer Frage (Text ohne HTML) oder None, wenn nichts übrig bleibt"""
+    normalized = normalize_text(plain_text or '')
+    if not normalized:
+        return None
+    signature = minhash_signature(normalized)
+    return Fingerprint(
+        hashlib.sha1(normalized.encode('utf-8')).hexdigest(),
+        signature,
+        lsh_buckets(signature)
+    )
+
+
+class DuplicateIndex:
+    """Fingerabdrücke im Speicher - für Duplikate innerhalb eines einzelnen Imports"""
+
+    def __init__(self):
+        self._by_hash = {}
+        self._by_bucket = defaultdict(list)
+
+    def add(self, fp, ref):
+        self._by_hash.setdefault(fp.content_hash, ref)
+        for bucket in fp.buckets:
+            self._by_bucket[bucket].append((ref, fp.minhash))
+
+    def find(self, fp):
+        """(ref, Ähnlichkeit) des besten Treffers oder None"""
+        if fp.content_hash in self._by_hash:
+            return self._by_hash[fp.content_hash], 1.0
+        best = None
+        for bucket in fp.buckets:
+            for ref, signature in self._by_bucket.get(bucket, ()):
+                score = similarity(fp.minhash, signature)
+                if score >= SIMILARITY_THRESHOLD and (best is None or score > best[1]):
+                    best = (ref, score)
+        return best
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def find_existing_duplicates(connection, fingerprints):
+    """
+    Für jede Position in fingerprints die ID einer vorhandenen gleichen oder fast
+    gleichen Frage suchen. Liefert {index: (question_id, Ähnlichkeit)}.
+    """
+    from models import Question, QuestionLSH
+
+    questions = Question.__table__
+    lsh = QuestionLSH.__table__
+    matches = {}
+
+    hashes = {fp.content_hash for fp in fingerprints if fp}
+    by_hash = {}
+    for part in _chunks(hashes):
+        for question_id, content_hash in connection.execute(
+            questions.select().with_only_columns(questions.c.id, questions.c.content_hash)
+            .where(questions.c.content_hash.in_(part))
+        ):
+            by_hash.setdefault(content_hash, question_id)
+
+    buckets = {bucket for fp in fingerprints if fp for bucket in fp.buckets}
+    by_bucket = defaultdict(set)
+    for part in _chunks(buckets):
+        for bucket, question_id in connection.execute(
+            lsh.select().with_only_columns(lsh.c.bucket, lsh.c.question_id).where(lsh.c.bucket.in_(part))
+        ):
+            by_bucket[bucket].add(question_id)
+
+    candidate_ids = set().union(*by_bucket.values()) if by_bucket else set()
+    signatures = {}
+    for part in _chunks(candidate_ids):
+        for question_id, data in connection.execute(
+            questions.select().with_only_columns(questions.c.id, questions.c.minhash)
+            .where(questions.c.id.in_(part))
+        ):
+            signatures[question_id] = unpack_signature(data)
+
+    for index, fp in enumerate(fingerprints):
+        if not fp:
+            continue
+        if fp.content_hash in by_hash:
+            matches[index] = (by_hash[fp.content_hash], 1.0)
+            continue
+        best = None
+        for question_id in set().union(*(by_bucket.get(bucket, set()) for bucket in fp.buckets)):
+            signature = signatures.get(question_id)
+            if not signature:
+                continue
+            score = similarity(fp.minhash, signature)
+            if score >= SIMILARITY_THRESHOLD and (best is None or score > best[1]):
+                best = (question_id, score)
+        if best:
+            matches[index] = best
+    return matches
+
+
+def duplicate_clusters(connection, limit=200):
+    """
+    Gruppen gleicher/fast gleicher Fragen im gesamten Pool.
+    Liefert eine Liste von Listen mit Frage-IDs, größte Gruppen zuerst.
+    """
+    from models import Question, QuestionLSH
+
+    questions = Question.__table__
+    lsh = QuestionLSH.__table__
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Exakte Duplikate
+    for (ids,) in connection.execute(
+        questions.select().with_only_columns(func.group_concat(questions.c.id))
+        .where(questions.c.content_hash.isnot(None))
+        .group_by(questions.c.content_hash).having(func.count() > 1)
+    ):
+        id_list = [int(i) for i in ids.split(',')]
+        for other in id_list[1:]:
+            union(id_list[0], other)
+
+    # Kandidatenpaare aus gemeinsamen LSH-Buckets, über die Signatur bestätigen
+    candidate_groups = [
+        [int(i) for i in ids.split(',')]
+        for (ids,) in connection.execute(
+            lsh.select().with_only_columns(func.group_concat(lsh.c.question_id))
+            .group_by(lsh.c.bucket).having(func.count() > 1)
+        )
+    ]
+    signatures = {}
+    for part in _chunks({i for group in candidate_groups for i in group}):
+        for question_id, data in connection.execute(
+            questions.select().with_only_columns(questions.c.id, questions.c.minhash)
+            .where(questions.c.id.in_(part))
+        ):
+            signatures[question_id] = unpack_signature(data)
+
+    # Pro Bucket wird jede Frage nur mit einem Vertreter je Gruppe verglichen,
+    # in der sie noch nicht ist - ein Bucket mit k fast gleichen Fragen kostet
+    # so etwa k statt k²/2 Vergleiche. Wer zu keiner Gruppe passt, wird selbst
+    # Vertreter; spätere Fragen, die zu mehreren Vertretern passen, verbinden
+    # deren Gruppen. Jedes Paar wird höchstens einmal verglichen.
+    checked = set()
+    for group in candidate_groups:
+        representatives = []
+        for a in group:
+            if not signatures.get(a):
+                continue
+            matched = False
+            for b in representatives:
+                if find(a) == find(b):
+                    matched = True
+                    continue
+                pair = (a, b) if a < b else (b, a)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if similarity(signatures[a], signatures[b]) >= SIMILARITY_THRESHOLD:
+                    union(a, b)
+                    matched = True
+            if not matched:
+                representatives.append(a)
+
+    clusters = defaultdict(list)
+    for question_id in list(parent):
+        clusters[find(question_id)].append(question_id)
+    result = [sorted(ids) for ids in clusters.values() if len(ids) > 1]
+    result.sort(key=lambda ids: (-len(ids), ids[0]))
+    return result[:limit]
@@ -0,0 +1,279 @@
+"""
+Speicherschonender Word-Parser für große .docx-Dateien.
+
+python-docx lädt das komplette Dokument als DOM in den Speicher. Hier wird
+word/document.xml direkt aus dem Zip gestreamt (iterparse) und jeder Absatz
+als WordParagraph geliefert, sobald er vollständig gelesen ist - bereits
+verarbeitete Elemente werden sofort wieder aus dem Baum entfernt. Der
+Speicherbedarf hängt so nicht von der Größe des Dokuments ab.
+
+Anders als Document().paragraphs werden auch Absätze in Tabellen (Zelle für
+Zelle, Zeile für Zeile) und die Nummerierung von Listen ("1.", "a)", "•")
+erfasst.
+"""
+import zipfile
+from collections import namedtuple
+from xml.etree import ElementTree
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+_P = _W + 'p'
+_R = _W + 'r'
+_T = _W + 't'
+_TAB = _W + 'tab'
+_BR = _W + 'br'
+_CR = _W + 'cr'
+_TBL = _W + 'tbl'
+_PSTYLE = _W + 'pStyle'
+_NUMPR = _W + 'numPr'
+_ILVL = _W + 'ilvl'
+_NUMID = _W + 'numId'
+_VAL = _W + 'val'
+
+# Inhalt dieser Elemente wird ignoriert: Ersatzdarstellung (doppelter Text von
+# Textfeldern), alte Absatz-/Zeichenformate aus der Änderungsverfolgung
+_SKIP_TAGS = {_MC + 'Fallback', _W + 'pPrChange', _W + 'rPrChange'}
+
+_HEADING_PREFIXES = ('heading', 'überschrift', 'title', 'titel')
+
+
+class WordParagraph(namedtuple('WordParagraph', 'text is_heading label in_table')):
+    """Ein Absatz: Text, Überschrift?, Listenmarke ("1.", "•" oder ""), steht in einer Tabelle?"""
+    __slots__ = ()
+
+    @property
+    def full_text(self):
+        """Text mit vorangestellter Listenmarke"""
+        return f'{self.label} {self.text}' if self.label else self.text
+
+
+def _to_roman(number):
+    result = ''
+    for value, numeral in ((1000, 'm'), (900, 'cm'), (500, 'd'), (400, 'cd'), (100, 'c'), (90, 'xc'),
+                           (50, 'l'), (40, 'xl'), (10, 'x'), (9, 'ix'), (5, 'v'), (4, 'iv'), (1, 'i')):
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+def _to_letters(number):
+    # Word zählt a..z, aa..zz, aaa..
+    letter = chr(ord('a') + (number - 1) % 26)
+    return letter * ((number - 1) // 26 + 1)
+
+
+def _format_number(number, fmt):
+    if fmt == 'lowerLetter':
+        return _to_letters(number)
+    if fmt == 'upperLetter':
+        return _to_letters(number).upper()
+    if fmt == 'lowerRoman':
+        return _to_roman(number)
+    if fmt == 'upperRoman':
+        return _to_roman(number).upper()
+    if fmt == 'decimalZero':
+        return f'{number:02d}'
+    return str(number)
+
+
+def _read_part(archive, name):
+    """Kleine XML-Teile (Formatvorlagen, Nummerierung) komplett lesen - None, wenn nicht vorhanden"""
+    try:
+        with archive.open(name) as stream:
+            return ElementTree.parse(stream).getroot()
+    except KeyError:
+        return None
+
+
+def _num_pr(element):
+    """(numId, ilvl) aus einem pPr-Element oder (None, None)"""
+    num_pr = element.find(f'{_W}pPr/{_NUMPR}') if element is not None else None
+    if num_pr is None:
+        return None, None
+    num_id = num_pr.find(_NUMID)
+    ilvl = num_pr.find(_ILVL)
+    return (
+        num_id.get(_VAL) if num_id is not None else None,
+        int(ilvl.get(_VAL, 0)) if ilvl is not None else None
+    )
+
+
+class _Styles:
+    """Absatzformatvorlagen: Name (für Überschriften) und Listen-Nummerierung aus der Vorlage"""
+
+    def __init__(self, root):
+        self.names = {}
+        self.numbering = {}
+        based_on = {}
+        for style in (root.iter(f'{_W}style') if root is not None else ()):
+            style_id = style.get(f'{_W}styleId')
+            name = style.find(f'{_W}name')
+            self.names[style_id] = name.get(_VAL, '') if name is not None else ''
+            parent = style.find(f'{_W}basedOn')
+            if parent is not None:
+                based_on[style_id] = parent.get(_VAL)
+            num_id, ilvl = _num_pr(style)
+            if num_id is not None:
+                self.numbering[style_id] = (num_id, ilvl or 0)
+        # Nummerierung von Basisvorlagen erben
+        for style_id in self.names:
+            parent, depth = based_on.get(style_id), 0
+            while style_id not in self.numbering and parent and depth < 10:
+                if parent in self.numbering:
+                    self.numbering[style_id] = self.numbering[parent]
+                parent, depth = based_on.get(parent), depth + 1
+
+    def is_heading(self, style_id):
+        return self.names.get(style_id, '').lower().startswith(_HEADING_PREFIXES)
+
+
+class _Numbering:
+    """Listendefinitionen aus numbering.xml und die laufenden Zähler pro Liste"""
+
+    def __init__(self, root):
+        self.abstract = {}  # abstractNumId -> {ilvl: (numFmt, lvlText, start)}
+        self.nums = {}  # numId -> (abstractNumId, {ilvl: startOverride})
+        self.counters = {}  # numId -> {ilvl: aktueller Wert}
+        if root is None:
+            return
+        for abstract in root.iter(f'{_W}abstractNum'):
+            levels = {}
+            for lvl in abstract.iter(f'{_W}lvl'):
+                fmt = lvl.find(f'{_W}numFmt')
+                lvl_text = lvl.find(f'{_W}lvlText')
+                start = lvl.find(f'{_W}start')
+                levels[int(lvl.get(_ILVL, 0))] = (
+                    fmt.get(_VAL, 'decimal') if fmt is not None else 'decimal',
+                    lvl_text.get(_VAL, '') if lvl_text is not None else '',
+                    int(start.get(_VAL, 1)) if start is not None else 1
+                )
+            self.abstract[abstract.get(f'{_W}abstractNumId')] = levels
+        for num in root.iter(f'{_W}num'):
+            abstract_id = num.find(f'{_W}abstractNumId')
+            overrides = {}
+            for override in num.iter(f'{_W}lvlOverride'):
+                start = override.find(f'{_W}startOverride')
+                if start is not None:
+                    overrides[int(override.get(_ILVL, 0))] = int(start.get(_VAL, 1))
+            self.nums[num.get(_NUMID)] = (abstract_id.get(_VAL) if abstract_id is not None else None, overrides)
+
+    def _level(self, num_id, ilvl):
+        abstract_id, overrides = self.nums[num_id]
+        fmt, lvl_text, start = self.abstract.get(abstract_id, {}).get(ilvl, ('decimal', f'%{ilvl + 1}.', 1))
+        return fmt, lvl_text, overrides.get(ilvl, start)
+
+    def next_label(self, num_id, ilvl):
+        """Zähler der Liste weiterzählen und die Marke für diesen Absatz liefern"""
+        if not num_id or num_id == '0' or num_id not in self.nums:
+            return ''
+        fmt, lvl_text, start = self._level(num_id, ilvl)
+        counts = self.counters.setdefault(num_id, {})
+        counts[ilvl] = counts.get(ilvl, start - 1) + 1
+        for deeper in [level for level in counts if level > ilvl]:
+            del counts[deeper]  # Unterpunkte beginnen nach einem neuen Oberpunkt von vorn
+
+        if fmt == 'bullet':
+            return '•'
+        if fmt == 'none':
+            return ''
+        label = lvl_text
+        for level in range(ilvl, -1, -1):
+            placeholder = f'%{level + 1}'
+            if placeholder in label:
+                level_fmt, _, level_start = self._level(num_id, level)
+                label = label.replace(placeholder, _format_number(counts.get(level, level_start), level_fmt))
+        return label
+
+
+class _ParagraphState:
+    __slots__ = ('parts', 'style', 'num_id', 'ilvl')
+
+    def __init__(self):
+        self.parts = []
+        self.style = None
+        self.num_id = None
+        self.ilvl = None
+
+
+def _parse_document(stream, styles, numbering):
+    open_elements = []
+    paragraphs = []  # offene Absätze - Textfelder können Absätze in Absätzen enthalten
+    skip = 0
+    runs = 0
+    tables = 0
+
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            open_elements.append(element)
+            if tag in _SKIP_TAGS:
+                skip += 1
+            elif skip:
+                continue
+            elif tag == _P:
+                paragraphs.append(_ParagraphState())
+            elif tag == _R:
+                runs += 1
+            elif tag == _TBL:
+                tables += 1
+            continue
+
+        open_elements.pop()
+        if tag in _SKIP_TAGS:
+            skip -= 1
+        elif not skip and paragraphs:
+            current = paragraphs[-1]
+            if tag == _T:
+                current.parts.append(element.text or '')
+            elif tag == _TAB and runs:  # w:tab in w:pPr/w:tabs ist ein Tabstopp, kein Zeichen
+                current.parts.append('\t')
+            elif tag in (_BR, _CR) and runs:
+                current.parts.append('\n')
+            elif tag == _PSTYLE:
+                current.style = element.get(_VAL)
+            elif tag == _NUMID:
+                current.num_id = element.get(_VAL)
+            elif tag == _ILVL:
+                current.ilvl = int(element.get(_VAL, 0))
+            elif tag == _R:
+                runs -= 1
+            elif tag == _TBL:
+                tables -= 1
+            elif tag == _P:
+                paragraphs.pop()
+                num_id, ilvl = current.num_id, current.ilvl
+                if num_id is None and current.style in styles.numbering:
+                    num_id, style_ilvl = styles.numbering[current.style]
+                    ilvl = style_ilvl if ilvl is None else ilvl
+                yield WordParagraph(
+                    ''.join(current.parts),
+                    styles.is_heading(current.style),
+                    numbering.next_label(num_id, ilvl or 0),
+                    tables > 0
+                )
+        elif not skip and tag == _TBL:
+            tables -= 1
+
+        # Fertig gelesene Elemente sofort freigeben - der Baum bleibt so klein
+        if open_elements:
+            open_elements[-1].remove(element)
+
+
+def iter_paragraphs(filepath):
+    """Alle Absätze eines Word-Dokuments (inkl. Tabellen) in Dokumentreihenfolge als Generator"""
+    try:
+        archive = zipfile.ZipFile(filepath)
+    except zipfile.BadZipFile:
+        raise ValueError("Die Datei ist kein gültiges Word-Dokument (.docx)")
+    with archive:
+        styles = _Styles(_read_part(archive, 'word/styles.xml'))
+        numbering = _Numbering(_read_part(archive, 'word/numbering.xml'))
+        try:
+            stream = archive.open('word/document.xml')
+        except KeyError:
+            raise ValueError("Die Datei ist kein gültiges Word-Dokument (.docx)")
+        with stream:
+            yield from _parse_document(stream, styles, numbering)
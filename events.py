@@ -0,0 +1,196 @@
+"""
+Live-Änderungen an Prüfungen per Server-Sent Events (/exam/<id>/events).
+
+Nach jedem Commit, der ExamItems ändert, wird pro Prüfung ein "patch"
+veröffentlicht: {"added": [Item, ...], "removed": [ID, ...],
+"positions": {ID: Position}, "points": {ID: Punkte}} - nur die vorhandenen
+Schlüssel. Patches beschreiben den neuen Zustand, mehrfaches Anwenden schadet
+nicht (auch nicht beim Client, der die Änderung selbst gemacht hat).
+
+Der Broker hält pro Prüfung einen Ringpuffer der letzten Events und eine
+Condition. Veröffentlichen kostet unabhängig von der Zahl der Abonnenten
+gleich viel: Event anhängen, wartende Streams wecken. Jeder Stream liest ab
+seiner letzten Event-ID aus dem Puffer; wer zu weit zurückliegt (oder nach
+einem Neustart mit alter Last-Event-ID kommt), bekommt "reset" und lädt die
+Items neu.
+"""
+import json
+import threading
+import uuid
+from collections import deque
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import ExamItem
+
+
+HEARTBEAT_SECONDS = 15  # Kommentarzeile gegen Proxy-/waitress-Timeouts, erkennt getrennte Clients
+RETRY_MILLISECONDS = 3000  # Wartezeit des Browsers vor dem Wiederverbinden
+
+
+class _Channel:
+    __slots__ = ('condition', 'events', 'floor', 'subscribers')
+
+    def __init__(self, lock, history, floor):
+        self.condition = threading.Condition(lock)
+        self.events = deque(maxlen=history)  # (id, event, JSON)
+        self.floor = floor  # Events bis einschließlich dieser ID sind nicht (mehr) im Puffer
+        self.subscribers = 0
+
+
+class ExamEventBroker:
+    """In-Prozess Pub/Sub mit einem Kanal pro Prüfung - Kanäle ohne Abonnenten werden verworfen"""
+
+    def __init__(self, max_streams=32, history=200):
+        self.max_streams = max_streams
+        self.history = history
+        self._boot = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._last_id = 0
+        self._streams = 0
+
+    def publish(self, channel, event_name, data):
+        payload = json.dumps(data)
+        with self._lock:
+            self._last_id += 1  # IDs global, damit ein neuer Kanal nie alte IDs wiederholt
+            target = self._channels.get(channel)
+            if target is None:
+                return
+            if len(target.events) == target.events.maxlen:
+                target.floor = target.events[0][0]
+            target.events.append((self._last_id, event_name, payload))
+            target.condition.notify_all()
+
+    def subscribe(self, channel, last_event_id=None):
+        """Neuer Stream ab last_event_id (Header Last-Event-ID) - None, wenn max_streams erreicht ist"""
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return None
+            target = self._channels.get(channel)
+            if target is None:
+                target = self._channels[channel] = _Channel(self._lock, self.history, self._last_id)
+            target.subscribers += 1
+            self._streams += 1
+            cursor = self._parse_event_id(last_event_id)
+            return _Subscription(self, channel, target, cursor)
+
+    def _parse_event_id(self, value):
+        boot, _, number = (value or '').partition('-')
+        if boot != self._boot or not number.isdigit():
+            return None
+        return int(number)
+
+    def event_id(self, number):
+        return f'{self._boot}-{number}'
+
+    def _unsubscribe(self, channel, target):
+        with self._lock:
+            target.subscribers -= 1
+            self._streams -= 1
+            if target.subscribers == 0 and self._channels.get(channel) is target:
+                del self._channels[channel]
+
+    def stats(self):
+        with self._lock:
+            return {'streams': self._streams, 'channels': len(self._channels)}
+
+
+class _Subscription:
+    def __init__(self, broker, channel, target, cursor):
+        self._broker = broker
+        self._channel = channel
+        self._target = target
+        self._cursor = cursor
+        self._closed = False
+
+    def wait(self, timeout=HEARTBEAT_SECONDS):
+        """
+        Neue Events als [(id, event, JSON)] - leer nach Ablauf von timeout.
+        Ist der Stand nicht lückenlos lieferbar, kommt stattdessen ein "reset".
+        """
+        target = self._target
+        with target.condition:
+            if self._cursor is not None and self._cursor >= target.floor and not self._pending():
+                target.condition.wait(timeout)
+            if self._cursor is None or self._cursor < target.floor:
+                self._cursor = self._broker._last_id
+                return [(self._broker.event_id(self._cursor), 'reset', '{}')]
+            events = self._pending()
+            if events:
+                self._cursor = events[-1][0]
+            return [(self._broker.event_id(number), name, payload) for number, name, payload in events]
+
+    def _pending(self):
+        return [entry for entry in self._target.events if entry[0] > self._cursor]
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._broker._unsubscribe(self._channel, self._target)
+
+
+def format_event(event_id, event_name, payload):
+    return f'id: {event_id}\nevent: {event_name}\ndata: {payload}\n\n'
+
+
+def iter_event_stream(subscription):
+    """Generator für die SSE-Antwort - meldet den Stream ab, wenn der Client trennt"""
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            events = subscription.wait()
+            if not events:
+                yield ': ping\n\n'
+            for entry in events:
+                yield format_event(*entry)
+    finally:
+        subscription.close()
+
+
+def publish_item_changes(broker, serialize_item):
+    """
+    ExamItem-Änderungen nach dem Commit als Patch pro Prüfung veröffentlichen
+    (gesammelt über alle Flushes der Transaktion, verworfen beim Rollback).
+    """
+    def patch_for(patches, exam_id):
+        return patches.setdefault(exam_id, {'added': {}, 'removed': set(), 'positions': {}, 'points': {}})
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect(session, flush_context):
+        patches = session.info.setdefault('exam_patches', {})
+        for obj in session.new:
+            if isinstance(obj, ExamItem):
+                patch = patch_for(patches, obj.exam_id)
+                patch['added'][obj.id] = serialize_item(obj)
+                patch['removed'].discard(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, ExamItem):
+                patch = patch_for(patches, obj.exam_id)
+                patch['removed'].add(obj.id)
+                patch['added'].pop(obj.id, None)
+        for obj in session.dirty:
+            if isinstance(obj, ExamItem):
+                state = inspect(obj)
+                if state.attrs.position.history.has_changes():
+                    patch_for(patches, obj.exam_id)['positions'][obj.id] = obj.position
+                if state.attrs.points.history.has_changes():
+                    patch_for(patches, obj.exam_id)['points'][obj.id] = obj.points
+
+    @event.listens_for(Session, 'after_commit')
+    def _publish(session):
+        for exam_id, patch in session.info.pop('exam_patches', {}).items():
+            data = {
+                'added': list(patch['added'].values()),
+                'removed': sorted(patch['removed']),
+                'positions': patch['positions'],
+                'points': patch['points'],
+            }
+            data = {key: value for key, value in data.items() if value}
+            if data:
+                broker.publish(exam_id, 'patch', data)
+
+    @event.listens_for(Session, 'after_soft_rollback')
+    def _discard(session, previous_transaction):
+        session.info.pop('exam_patches', None)
@@ -0,0 +1,105 @@
+"""
+Sammel-Export: Wandzeit gegen Anzahl der Prozesse im RenderPool.
+
+Erzeugt synthetische Prüfungen (HTML mit Absätzen, Listen und Tabellen) und
+rendert sie wie POST /export/batch über RenderPool.render_unordered() zu
+.docx und in ein ZIP (stream_zip). Die Datenbank wird nicht gebraucht.
+Gemessen wird ab dem zweiten Durchlauf - der erste startet die Prozesse
+(spawn) und wird als Anlaufzeit getrennt ausgegeben.
+
+    python export_benchmark.py
+    python export_benchmark.py --exams 40 --items 60 --processes 1 2 4 8
+    python export_benchmark.py --separate
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+from exporter import RenderPool, load_template, stream_zip
+from import_benchmark import TOPICS
+
+
+def generate_exams(count, items_per_exam, seed=1):
+    """Liste von (title, date_created, items) wie im Sammel-Export"""
+    rng = random.Random(seed)
+    exams = []
+    for number in range(1, count + 1):
+        items = []
+        for position in range(items_per_exam):
+            topic = rng.choice(TOPICS)
+            content = (f'<p>Beschreiben Sie für <b>{topic}</b> die Arbeitsschritte {position + 1}.</p>'
+                       f'<ul>' + ''.join(f'<li>{rng.choice(TOPICS)} {rng.randrange(1000)}</li>' for _ in range(3)) + '</ul>')
+            answer = (f'<p>Zuerst <i>{topic}</i> prüfen, dann:</p>'
+                      f'<table><tr><th>Schritt</th><th>Maßnahme</th></tr>'
+                      + ''.join(f'<tr><td>{step}</td><td>{rng.choice(TOPICS)}</td></tr>' for step in range(1, 5))
+                      + '</table>')
+            items.append((rng.randint(1, 10), content, answer))
+        exams.append((f'Prüfung {number}', datetime(2026, 6, 1), items))
+    return exams
+
+
+def run_export(pool, exams, template, parts):
+    """Ein Sammel-Export bis zum letzten ZIP-Byte, liefert (Sekunden, ZIP-Bytes, Fehler)"""
+    tasks = [((index, part), (title, date_created, items, template, part))
+             for index, (title, date_created, items) in enumerate(exams) for part in parts]
+    errors = []
+
+    def files():
+        for (index, part), data, error in pool.render_unordered(tasks):
+            if error is not None:
+                errors.append(error)
+                continue
+            yield f'pruefung_{index}_{part}.docx', data
+
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in stream_zip(files()))
+    return time.perf_counter() - started, size, errors
+
+
+def parse_args(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Sammel-Export: Wandzeit gegen Anzahl der Prozesse')
+    parser.add_argument('--exams', type=int, default=24, help='Prüfungen pro Export (Standard 24)')
+    parser.add_argument('--items', type=int, default=40, help='Fragen pro Prüfung (Standard 40)')
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores}), help=f'Prozesse im Pool (Standard 1 2 4 {cores})')
+    parser.add_argument('--runs', type=int, default=3, help='Messungen pro Prozessanzahl, gewertet wird der Median')
+    parser.add_argument('--separate', action='store_true', help='Fragen und Lösungen als getrennte Dokumente')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    exams = generate_exams(args.exams, args.items)
+    template = load_template()
+    parts = ('questions', 'solutions') if args.separate else ('full',)
+
+    results = []
+    for processes in args.processes:
+        pool = RenderPool(processes)
+        try:
+            warmup, size, errors = run_export(pool, exams, template, parts)
+            timings = []
+            for _ in range(args.runs):
+                elapsed, size, run_errors = run_export(pool, exams, template, parts)
+                timings.append(elapsed)
+                errors += run_errors
+        finally:
+            pool.shutdown()
+        if errors:
+            print(f'{processes} Prozesse: {len(errors)} Fehler, z.B. {errors[0]}')
+        results.append((processes, warmup, statistics.median(timings), size))
+
+    documents = args.exams * len(parts)
+    print(f"\n{documents} Dokumente ({args.exams} Prüfungen à {args.items} Fragen), {os.cpu_count()} Kerne")
+    print(f"{'Prozesse':>8}{'Anlauf s':>10}{'Sekunden':>10}{'Dok./s':>8}{'Speedup':>9}{'ZIP KB':>9}")
+    baseline = results[0][2]
+    for processes, warmup, elapsed, size in results:
+        print(f"{processes:>8}{warmup:>10.2f}{elapsed:>10.2f}{documents / elapsed:>8.1f}{baseline / elapsed:>8.1f}x{size // 1024:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,640 @@
+"""
+Word-Export von Prüfungen.
+
+Das Snapshot-HTML der Fragen wird in echte Word-Formatierung übersetzt
+(fett/kursiv/unterstrichen, hoch-/tiefgestellt, Listen, Tabellen, Zeilen-
+umbrüche) statt die Tags zu entfernen. Grundlage ist eine Vorlage (.docx):
+Formatvorlagen, Seitenlayout und Kopf-/Fußzeile kommen von dort, der Inhalt
+der Vorlage wird ignoriert.
+
+Fertige Dokumente landen im ExportCache - Schlüssel ist die Revision der
+Prüfung (Exam.revision), die bei jeder Änderung an Titel oder Items
+hochgezählt wird. Unveränderte Prüfungen werden so nicht neu erzeugt.
+Erzeugt wird komplett im Speicher (BytesIO), die Antwort geht direkt aus
+den Bytes raus - mit Content-Length und ETag aus derselben Revision.
+
+Für den Sammel-Export vieler Prüfungen erzeugt der RenderPool die Dokumente
+parallel in eigenen Prozessen (python-docx ist reine Python-CPU-Arbeit, Threads
+bringen wegen des GIL nichts); stream_zip schreibt sie als ZIP-Datenstrom,
+sobald sie fertig sind.
+"""
+import os
+import re
+import html
+import glob
+import hashlib
+import tempfile
+import zipfile
+import threading
+import multiprocessing
+import importlib.util
+from copy import deepcopy
+from io import BytesIO, RawIOBase
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from html.parser import HTMLParser
+
+# python-docx wird erst beim ersten Export importiert (Startzeit der .exe) -
+# ExportCache, ETags und ZIP-Streaming kommen ohne aus
+
+
+EXPORT_FORMAT = 1  # Hochzählen, wenn sich das erzeugte Dokument ändert - macht den Cache ungültig
+# 'full' = Fragen und Lösungen in einem Dokument, sonst nur Fragen bzw. nur Lösungen
+EXPORT_PARTS = ('full', 'questions', 'solutions')
+_PART_SUFFIX = {'full': '', 'questions': '_Fragen', 'solutions': '_Loesungen'}
+
+_VOID_TAGS = {'br', 'hr', 'img', 'input', 'meta', 'link', 'col', 'wbr', 'area', 'source'}
+_SKIP_TAGS = {'script', 'style', 'head', 'title', 'img'}
+_BLOCK_TAGS = {'p', 'div', 'blockquote', 'pre', 'section', 'article', 'header', 'footer',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_INLINE_FORMATS = {
+    'b': 'bold', 'strong': 'bold', 'th': 'bold',
+    'i': 'italic', 'em': 'italic', 'cite': 'italic',
+    'u': 'underline', 'ins': 'underline',
+    's': 'strike', 'strike': 'strike', 'del': 'strike',
+    'sup': 'superscript', 'sub': 'subscript',
+    'code': 'code', 'kbd': 'code', 'tt': 'code',
+}
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _TreeBuilder(HTMLParser):
+    """Kleiner HTML-Baum aus (tag, children)-Tupeln - tolerant gegenüber nicht geschlossenen Tags"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = ('root', [])
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = (tag, [])
+        self.stack[-1][1].append(node)
+        if tag not in _VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1][1].append((tag, []))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index][0] == tag:
+                del self.stack[index:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1][1].append(data)
+
+
+def _freeze(node):
+    if isinstance(node, str):
+        return node
+    return node[0], tuple(_freeze(child) for child in node[1])
+
+
+@lru_cache(maxsize=4096)
+def parse_html(value):
+    """
+    Snapshot-HTML einmal in einen unveränderlichen Baum übersetzen - gecacht,
+    da dieselben Fragen in vielen Prüfungen (und Exporten) vorkommen.
+    Reiner Text ohne Tags: Zeilenumbrüche bleiben erhalten.
+    """
+    value = value or ''
+    if '<' not in value:
+        lines = value.split('\n')
+        nodes = []
+        for index, line in enumerate(lines):
+            if index:
+                nodes.append(('br', ()))
+            nodes.append(line.replace('&nbsp;', ' '))
+        return tuple(nodes)
+    builder = _TreeBuilder()
+    builder.feed(value)
+    builder.close()
+    return _freeze(builder.root)[1]
+
+
+class _Target:
+    """Erzeugt Absätze in einem Dokument oder einer Tabellenzelle nach Bedarf"""
+
+    def __init__(self, container, reuse_first=False):
+        self.container = container
+        self.paragraph = None
+        self.fresh = True  # Noch kein Text im aktuellen Absatz (führende Leerzeichen weglassen)
+        self._unused = container.paragraphs[0] if reuse_first and container.paragraphs else None
+
+    def current(self, style=None):
+        if self.paragraph is None:
+            return self.new(style)
+        return self.paragraph
+
+    def new(self, style=None):
+        if self._unused is not None:
+            self.paragraph, self._unused = self._unused, None
+        else:
+            self.paragraph = self.container.add_paragraph()
+        if style:
+            self.paragraph._p.style = style  # Formatvorlagen-ID (siehe _style_ids)
+        self.fresh = True
+        return self.paragraph
+
+    def close(self):
+        self.paragraph = None
+
+
+def _style_ids(document):
+    """
+    Name -> ID aller Formatvorlagen. python-docx durchsucht bei jedem style=...
+    alle Vorlagen - bei vielen Überschriften und Listen war das der größte
+    Teil der Exportzeit.
+    """
+    return {style.name: style.style_id for style in document.styles}
+
+
+@lru_cache(maxsize=4)
+def _template_style_ids(template):
+    """_style_ids() einmal pro Vorlage (nur lesen, nicht verändern)"""
+    from docx import Document
+    return _style_ids(Document(BytesIO(template)))
+
+
+class HtmlRenderer:
+    """Schreibt geparstes Snapshot-HTML als formatierte Absätze, Listen und Tabellen"""
+
+    def __init__(self, document, style_ids=None):
+        self.document = document
+        self.style_ids = style_ids if style_ids is not None else _style_ids(document)
+
+    def _style(self, *names):
+        """ID der ersten vorhandenen Formatvorlage"""
+        return next((self.style_ids[name] for name in names if name in self.style_ids), None)
+
+    def render(self, container, html, reuse_first=False):
+        target = _Target(container, reuse_first)
+        self._blocks(target, parse_html(html), frozenset(), None, 0)
+
+    def _text(self, target, text, fmt, style):
+        text = _WHITESPACE_RE.sub(' ', text)
+        if target.fresh:
+            text = text.lstrip()
+        if not text:
+            return
+        paragraph = target.current(style)
+        run = paragraph.add_run(text)
+        target.fresh = False
+        if 'bold' in fmt:
+            run.bold = True
+        if 'italic' in fmt:
+            run.italic = True
+        if 'underline' in fmt:
+            run.underline = True
+        if 'strike' in fmt:
+            run.font.strike = True
+        if 'superscript' in fmt:
+            run.font.superscript = True
+        elif 'subscript' in fmt:
+            run.font.subscript = True
+        if 'code' in fmt:
+            run.font.name = 'Consolas'
+
+    def _blocks(self, target, nodes, fmt, style, depth):
+        for node in nodes:
+            if isinstance(node, str):
+                self._text(target, node, fmt, style)
+                continue
+            tag, children = node
+            if tag == 'br':
+                target.current(style).add_run().add_break()
+                target.fresh = True
+            elif tag in _SKIP_TAGS:
+                continue
+            elif tag in _BLOCK_TAGS:
+                target.close()
+                heading = tag[0] == 'h' and tag[1:].isdigit()
+                self._blocks(target, children, fmt | {'bold'} if heading else fmt, style, depth)
+                target.close()
+            elif tag in ('ul', 'ol'):
+                target.close()
+                self._list(target, tag, children, fmt, depth + 1)
+                target.close()
+            elif tag == 'table':
+                target.close()
+                self._table(target.container, children, fmt)
+                target.close()
+            elif tag == 'hr':
+                target.close()
+            else:
+                extra = _INLINE_FORMATS.get(tag)
+                self._blocks(target, children, fmt | {extra} if extra else fmt, style, depth)
+
+    def _list(self, target, tag, children, fmt, depth):
+        # Nummerierung als Text: Word-Listen würden sonst über alle Fragen hinweg weiterzählen
+        suffix = f' {depth}' if depth > 1 else ''
+        if tag == 'ul':
+            style = self._style(f'List Bullet{suffix}', 'List Bullet', 'List Paragraph')
+        else:
+            style = self._style(f'List Continue{suffix}', 'List Continue', 'List Paragraph')
+        number = 0
+        for child in children:
+            if isinstance(child, str) or child[0] != 'li':
+                if not isinstance(child, str):
+                    self._blocks(target, (child,), fmt, style, depth)
+                continue
+            number += 1
+            target.close()
+            target.new(style)
+            if tag == 'ol':
+                target.paragraph.add_run(f'{number}. ')
+            self._blocks(target, child[1], fmt, style, depth)
+            target.close()
+
+    def _table(self, container, children, fmt):
+        rows = []
+
+        def collect(nodes):
+            for node in nodes:
+                if isinstance(node, str):
+                    continue
+                if node[0] == 'tr':
+                    rows.append([cell for cell in node[1] if not isinstance(cell, str) and cell[0] in ('td', 'th')])
+                elif node[0] in ('thead', 'tbody', 'tfoot'):
+                    collect(node[1])
+
+        collect(children)
+        columns = max((len(row) for row in rows), default=0)
+        if not columns:
+            return
+        table = container.add_table(rows=len(rows), cols=columns)
+        style = self._style('Table Grid')
+        if style:
+            table._tbl.tblPr.style = style
+        for row, cells in zip(table.rows, rows):
+            for cell, (tag, cell_children) in zip(row.cells, cells):
+                cell_fmt = fmt | {'bold'} if tag == 'th' else fmt
+                self._blocks(_Target(cell, reuse_first=True), cell_children, cell_fmt, None, 0)
+
+
+def _default_template_path():
+    """
+    Pfad der Standardvorlage von python-docx. find_spec findet das Paket, ohne es
+    zu importieren; origin fehlt z.B. in der .exe (Module aus dem PyInstaller-Archiv),
+    dann über docx.__file__. None, wenn sich kein Pfad ermitteln lässt.
+    """
+    spec = importlib.util.find_spec('docx')
+    origin = spec.origin if spec is not None else None
+    if origin is None:
+        import docx
+        origin = getattr(docx, '__file__', None)
+        if origin is None:
+            return None
+    return os.path.join(os.path.dirname(origin), 'templates', 'default.docx')
+
+
+def load_template(path=None):
+    """Vorlage als Bytes (eigene .docx oder die Standardvorlage von python-docx)"""
+    if not path or not os.path.exists(path):
+        # Die mitgelieferte Datei direkt lesen - Document().save() wäre bei jedem Start anders (Zeitstempel)
+        path = _default_template_path()
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    from docx import Document
+    buffer = BytesIO()
+    Document().save(buffer)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=4)
+def cache_tag(template):
+    """Teil des Cache-Schlüssels: Exportformat und Vorlage"""
+    return f'f{EXPORT_FORMAT}{hashlib.sha1(template).hexdigest()[:10]}'
+
+
+def _document_from_template(template):
+    from docx import Document
+    document = Document(BytesIO(template))
+    # Inhalt der Vorlage entfernen, nur Abschnittseinstellungen (sectPr) behalten
+    body = document.element.body
+    for child in list(body):
+        if not child.tag.endswith('}sectPr'):
+            body.remove(child)
+    return document
+
+
+def _add_heading(document, style_ids, text, level):
+    # Wie document.add_heading(), aber ohne die Suche nach der Formatvorlage
+    paragraph = document.add_paragraph(text)
+    style = style_ids.get('Title' if level == 0 else f'Heading {level}')
+    if style:
+        paragraph._p.style = style
+    return paragraph
+
+
+def _write_exam(document, style_ids, title, date_created, items, part, write):
+    """Gemeinsamer Aufbau von Prüfung und Varianten - write(html) schreibt einen Frage-/Lösungstext"""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    # Kopfzeile (eine Kopfzeile aus der Vorlage bleibt erhalten)
+    header_para = document.sections[0].header.paragraphs[0]
+    if not header_para.text.strip():
+        header_para.text = title
+        header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    heading = _add_heading(document, style_ids, title if part != 'solutions' else f'{title} - Lösungen', 0)
+    heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if date_created:
+        date_para = document.add_paragraph(f'Erstellt am: {date_created.strftime("%d.%m.%Y")}')
+        date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    document.add_paragraph()  # Leerzeile
+
+    # Fragen
+    if part != 'solutions':
+        for idx, (points, content, _) in enumerate(items, 1):
+            _add_heading(document, style_ids, f'Frage {idx} ({points} Punkte)', 1)
+            write(content)
+            document.add_paragraph()
+
+    # Lösungen (neue Seite)
+    if part == 'full':
+        document.add_page_break()
+        solutions_heading = _add_heading(document, style_ids, 'Lösungen', 0)
+        solutions_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        document.add_paragraph()
+
+    if part != 'questions':
+        for idx, (_, _, answer) in enumerate(items, 1):
+            _add_heading(document, style_ids, f'Lösung {idx}', 1)
+            write(answer)
+            document.add_paragraph()
+
+
+def render_exam(title, date_created, items, template, part='full'):
+    """
+    Prüfung als .docx (Bytes) erzeugen.
+    items: Liste von (points, snapshot_content, snapshot_answer) in Reihenfolge.
+    part: 'full', 'questions' (nur Fragen) oder 'solutions' (nur Lösungen).
+    Alle Argumente sind einfache Werte - die Funktion läuft auch im RenderPool.
+    """
+    document = _document_from_template(template)
+    style_ids = _template_style_ids(template)
+    renderer = HtmlRenderer(document, style_ids)
+    _write_exam(document, style_ids, title, date_created, items, part, lambda html: renderer.render(document, html))
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class _FragmentCache:
+    """
+    Jeder Frage-/Lösungstext wird einmal in ein Hilfsdokument gerendert; die
+    fertigen Absätze/Tabellen (XML) werden danach nur noch kopiert. Varianten
+    enthalten dieselben Texte in anderer Reihenfolge.
+    """
+
+    def __init__(self, template):
+        self.document = _document_from_template(template)
+        self.renderer = HtmlRenderer(self.document, _template_style_ids(template))
+        self.fragments = {}
+
+    def get(self, html):
+        fragment = self.fragments.get(html)
+        if fragment is None:
+            body = self.document.element.body
+            self.renderer.render(self.document, html)
+            fragment = tuple(child for child in body if not child.tag.endswith('}sectPr'))
+            for child in fragment:
+                body.remove(child)
+            self.fragments[html] = fragment
+        return fragment
+
+
+def render_variants(title, date_created, variants, template, part='full'):
+    """
+    Mehrere Varianten einer Prüfung in einem Durchgang erzeugen.
+    variants: Liste von (label, items) mit items wie bei render_exam().
+    Liefert [(label, bytes)].
+    """
+    fragments = _FragmentCache(template)
+    style_ids = _template_style_ids(template)
+    results = []
+    for label, items in variants:
+        document = _document_from_template(template)
+        body = document.element.body
+        anchor = body.sectPr
+
+        def write(html):
+            for element in fragments.get(html):
+                copy = deepcopy(element)
+                if anchor is not None:
+                    anchor.addprevious(copy)
+                else:
+                    body.append(copy)
+
+        _write_exam(document, style_ids, f'{title} - Gruppe {label}', date_created, items, part, write)
+        buffer = BytesIO()
+        document.save(buffer)
+        results.append((label, buffer.getvalue()))
+    return results
+
+
+def export_etag(exam_id, revision, tag):
+    return f'exam-{int(exam_id)}-r{int(revision)}-{tag}'
+
+
+def export_filename(exam_id, title, part='full'):
+    safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
+    return f'exam_{exam_id}_{safe_title}{_PART_SUFFIX[part]}.docx'
+
+
+class ExportCache:
+    """
+    Fertige Exporte auf der Platte: exam_<id>_r<revision>_<tag>[_<part>].docx.
+    Beim Schreiben werden ältere Revisionen derselben Prüfung gelöscht und die
+    Gesamtgröße begrenzt (am längsten nicht genutzte Dateien zuerst).
+    """
+
+    _NAME_RE = re.compile(r'exam_(\d+)_r(\d+)_([a-z0-9]+)(?:_(questions|solutions))?\.docx$')
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._locks = [threading.Lock() for _ in range(16)]  # Pro Prüfung wird nur einmal gleichzeitig erzeugt
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, exam_id, revision, tag, part='full'):
+        suffix = f'_{part}' if part != 'full' else ''
+        return os.path.join(self.directory, f'exam_{int(exam_id)}_r{int(revision)}_{tag}{suffix}.docx')
+
+    def read(self, exam_id, revision, tag, part='full'):
+        """Inhalt der gecachten Datei oder None"""
+        path = self.path(exam_id, revision, tag, part)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Zuletzt genutzt - für die Verdrängung
+            return data
+        except OSError:
+            return None
+
+    def get_or_render(self, exam_id, revision, tag, render, part='full'):
+        """
+        Export aus dem Cache oder render() aufrufen und speichern. Exportieren
+        zwei Nutzer dieselbe Prüfung gleichzeitig, wird sie nur einmal erzeugt.
+        """
+        data = self.read(exam_id, revision, tag, part)
+        if data is not None:
+            return data
+        with self._locks[hash((exam_id, revision, tag, part)) % len(self._locks)]:
+            data = self.read(exam_id, revision, tag, part)
+            if data is None:
+                data = render()
+                self.put(exam_id, revision, tag, data, part)
+        return data
+
+    def put(self, exam_id, revision, tag, data, part='full'):
+        path = self.path(exam_id, revision, tag, part)
+        # Erst in eine temporäre Datei, dann umbenennen - parallele Exporte sehen nie halbe Dateien
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        # Andere Revisionen/Vorlagen derselben Prüfung löschen - die anderen Teile der Revision bleiben
+        current = f'exam_{int(exam_id)}_r{int(revision)}_{tag}'
+        for other in glob.glob(os.path.join(self.directory, f'exam_{int(exam_id)}_r*.docx')):
+            match = self._NAME_RE.search(os.path.basename(other))
+            if match is None or f'exam_{match.group(1)}_r{match.group(2)}_{match.group(3)}' != current:
+                self._remove(other)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Älteste Dateien löschen, bis der Cache unter max_bytes liegt"""
+        files = []
+        for path in glob.glob(os.path.join(self.directory, 'exam_*.docx')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def evict_stale(self, revisions, tag):
+        """Dateien zu gelöschten Prüfungen, alten Revisionen oder alter Vorlage entfernen"""
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            match = self._NAME_RE.search(os.path.basename(path))
+            if match is None or revisions.get(int(match.group(1))) != int(match.group(2)) or match.group(3) != tag:
+                self._remove(path)
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class RenderPool:
+    """
+    Prozess-Pool für render_exam/render_variants. Die Prozesse starten erst beim ersten
+    Sammel-Export und bleiben danach bestehen. Mit max_workers <= 1 wird
+    ohne Zusatzprozesse direkt im aufrufenden Thread erzeugt.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self.executor is None:
+                # spawn auf allen Plattformen: fork aus einem Prozess mit laufenden
+                # waitress-/Import-Threads kann gehaltene Locks in den Worker kopieren
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            return self.executor
+
+    def render_unordered(self, tasks, render=render_exam):
+        """
+        tasks: Liste von (key, Argumente für render), z.B. (title, date_created, items, template, part).
+        Liefert (key, Ergebnis, None) oder (key, None, Fehler) in der Reihenfolge der Fertigstellung.
+        """
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            for key, args in tasks:
+                try:
+                    yield key, render(*args), None
+                except Exception as e:
+                    yield key, None, e
+            return
+
+        executor = self._get_executor()
+        futures = {executor.submit(render, *args): key for key, args in tasks}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            # Abgebrochener Download: noch nicht gestartete Dokumente verwerfen
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+class _ChunkWriter(RawIOBase):
+    """Nicht-seekbares Ziel für ZipFile - sammelt die geschriebenen Bytes bis zum nächsten drain()"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """
+    (Dateiname, Bytes)-Paare als ZIP-Datenstrom (Generator von Bytes-Blöcken).
+    Jede Datei geht raus, sobald sie vorliegt. .docx ist bereits komprimiert,
+    daher ohne erneute Kompression (ZIP_STORED).
+    """
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+    chunk = writer.drain()
+    if chunk:
+        yield chunk
+
+
+def remove_legacy_exports(upload_folder):
+    """Exporte, die frühere Versionen in den Upload-Ordner geschrieben haben, aufräumen"""
+    for path in glob.glob(os.path.join(upload_folder, 'exam_*.docx')):
+        ExportCache._remove(path)
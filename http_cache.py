@@ -0,0 +1,186 @@
+"""
+Zwischenspeicher für häufig abgefragte JSON-Antworten (/questions, /exam/<id>/items, ...).
+
+Jede Ressource ("questions", ("exam", 3), ...) hat einen Versionszähler im
+Speicher, der nach jedem Commit, der sie ändert, hochgezählt wird. Die
+Version steckt im Cache-Schlüssel und im ETag - veraltete Einträge werden
+nie ausgeliefert und fallen über die LRU-Grenze von selbst heraus.
+
+- ETag/If-None-Match: Antwort 304, ohne die Datenbank zu fragen
+- Antworten ab COMPRESS_MIN_BYTES werden einmal gzip- (und, falls das Paket
+  brotli installiert ist, brotli-)komprimiert abgelegt
+- Größe des Caches in Bytes begrenzt (LRU)
+
+Die Zähler gelten pro Prozess - die App läuft unter waitress in einem
+Prozess mit mehreren Threads.
+"""
+import gzip
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESS_MIN_BYTES = 1024
+# Header der ursprünglichen Antwort, die mit dem Eintrag gespeichert werden
+CACHED_HEADERS = ('Content-Type', 'X-Total-Count', 'X-Next-Cursor')
+
+
+class _Entry:
+    __slots__ = ('headers', 'bodies', 'size')
+
+    def __init__(self, headers, body):
+        self.headers = headers
+        self.bodies = {'identity': body}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            self.bodies['gzip'] = gzip.compress(body, compresslevel=5)
+            if brotli is not None:
+                self.bodies['br'] = brotli.compress(body, quality=5)
+        self.size = sum(len(data) for data in self.bodies.values())
+
+
+class ResponseCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._boot = uuid.uuid4().hex[:8]  # ETags eines früheren Serverlaufs passen nie
+        self._versions = {}
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = 0
+
+    def version(self, resource):
+        return self._versions.get(resource, 0)
+
+    def invalidate(self, *resources):
+        """Versionen hochzählen - erst nach dem Commit aufrufen, sonst landen alte Daten unter der neuen Version"""
+        with self._lock:
+            for resource in resources:
+                self._versions[resource] = self._versions.get(resource, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits,
+                'misses': self.misses, 'not_modified': self.not_modified,
+            }
+
+    def cached(self, *resources):
+        """
+        Decorator für GET-Routen mit JSON-Antwort. resources: Namen oder
+        Funktionen der URL-Parameter, z.B. lambda exam_id: ('exam', exam_id).
+        Gespeichert werden nur Antworten mit Status 200.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                # Versionen vor der Abfrage lesen: ein paralleler Commit kann den
+                # Eintrag höchstens zu neu machen, nie zu alt
+                versions = tuple(
+                    self.version(resource(**kwargs) if callable(resource) else resource)
+                    for resource in resources
+                )
+                key = (request.path, tuple(sorted(request.args.items(multi=True))), versions)
+                etag = hashlib.sha1(repr((self._boot, key)).encode('utf-8')).hexdigest()[:20]
+
+                if request.if_none_match.contains_weak(etag):
+                    self.not_modified += 1
+                    response = current_app.response_class(status=304)
+                    return self._finish(response, etag)
+
+                entry = self._get(key)
+                if entry is None:
+                    self.misses += 1
+                    response = current_app.make_response(view(**kwargs))
+                    if response.status_code != 200 or not response.is_json:
+                        return response
+                    headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                    entry = _Entry(headers, response.get_data())
+                    self._put(key, entry)
+                else:
+                    self.hits += 1
+                return self._respond(entry, etag)
+            return wrapper
+        return decorator
+
+    def _respond(self, entry, etag):
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in entry.bodies and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        body = entry.bodies[encoding]
+        response = current_app.response_class(body, headers=entry.headers)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.content_length = len(body)
+        return self._finish(response, etag)
+
+    def _finish(self, response, etag):
+        response.set_etag(etag, weak=True)  # schwach: gleiche Daten, je nach Kompression andere Bytes
+        response.cache_control.private = True
+        response.cache_control.no_cache = True  # Browser fragt mit If-None-Match nach
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def invalidate_on_commit(cache, resources_of):
+    """
+    Versionen nach jedem erfolgreichen Commit hochzählen. resources_of(obj)
+    liefert die Ressourcen, die ein neues, geändertes oder gelöschtes Objekt
+    betrifft. Core-INSERTs (BulkImporter) laufen an der Session vorbei und
+    müssen cache.invalidate() selbst aufrufen.
+    """
+    @event.listens_for(Session, 'after_flush')
+    def _collect(session, flush_context):
+        changed = session.info.setdefault('cache_resources', set())
+        for obj in list(session.new) + list(session.deleted):
+            changed.update(resources_of(obj))
+        for obj in session.dirty:
+            if session.is_modified(obj):
+                changed.update(resources_of(obj))
+
+    @event.listens_for(Session, 'after_commit')
+    def _invalidate(session):
+        changed = session.info.pop('cache_resources', None)
+        if changed:
+            cache.invalidate(*changed)
+
+    @event.listens_for(Session, 'after_soft_rollback')
+    def _discard(session, previous_transaction):
+        session.info.pop('cache_resources', None)
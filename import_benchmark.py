@@ -0,0 +1,228 @@
+"""
+Import-Durchsatz (Fragen pro Sekunde) für Word- und LLM-Import.
+
+Erzeugt ein .docx mit N Fragen ("Frage: ..." / "Lösung: ...") und importiert
+es in eine leere Datenbank in einem temporären Datenordner - instance/
+bleibt unberührt.
+
+- classic: import_from_word() (BulkImporter) mit verschiedenen Batch-Größen,
+  zum Vergleich der frühere Weg mit einem ORM-Objekt pro Frage
+- llm:     import_from_word_with_llm() gegen einen lokalen Stub-Server im
+  OpenAI-Format (mit/ohne Streaming, einstellbare Antwortzeit) - misst
+  Abschnitte, Parallelität und Schreiben ohne echte API
+
+    python import_benchmark.py
+    python import_benchmark.py --questions 10000 --batch-sizes 100 500 2000
+    python import_benchmark.py --method llm --llm-latency 0.5 --concurrency 1 4 8
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from startup_benchmark import free_port
+
+
+TOPICS = ['Bodenart', 'Pflanzenschutz', 'Bewässerung', 'Düngung', 'Rasenpflege', 'Gehölzschnitt', 'Substrat', 'Vermehrung']
+
+
+def generate_docx(path, count, near_duplicates=0.0, seed=1):
+    """Word-Dokument mit count Fragen; near_duplicates: Anteil leicht abgewandelter Wiederholungen"""
+    import random
+    from docx import Document
+
+    rng = random.Random(seed)
+    document = Document()
+    written = []
+    for number in range(1, count + 1):
+        if written and rng.random() < near_duplicates:
+            content = rng.choice(written).replace('?', ' genau?')
+        else:
+            topic = rng.choice(TOPICS)
+            content = (f'Frage {number}: Beschreiben Sie für {topic} im Betrieb {rng.randrange(10**6)} '
+                       f'die Arbeitsschritte {rng.randrange(100)} und {rng.randrange(100)}?')
+            written.append(content)
+        document.add_paragraph(f'Frage: {content}')
+        document.add_paragraph(f'Lösung: Antwort {number} - {rng.choice(TOPICS)} mit {rng.randrange(10**6)} Schritten.')
+    document.save(path)
+
+
+def reset_pool(app_module):
+    """Alle Fragen samt Tags, Volltext, LSH und Facetten entfernen"""
+    from sqlalchemy import text
+
+    with app_module.db.engine.begin() as connection:
+        for table in ('exam_items', 'question_tags', 'question_lsh', 'question_facets', 'questions',
+                      app_module.QUESTIONS_FTS_TABLE, 'llm_cache'):
+            connection.execute(text(f'DELETE FROM {table}'))
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def orm_import(app_module, path):
+    """Früherer Weg: pro Frage ein Question-Objekt, ein Commit am Ende"""
+    parser = app_module.QuestionParser()
+    lines = (paragraph.full_text for paragraph in app_module.iter_word_paragraphs(path))
+    count = 0
+    for question in parser.parse(lines, 'Benchmark'):
+        app_module.db.session.add(app_module.Question(
+            content=question.content, answer=question.answer, category=question.category,
+            tags=app_module.format_tags(question.tags), difficulty=question.difficulty or 3,
+        ))
+        count += 1
+    app_module.db.session.commit()
+    return count
+
+
+def run_classic(app_module, path, args):
+    results = []
+    for batch_size in args.batch_sizes:
+        reset_pool(app_module)
+        app_module.app.config['IMPORT_BATCH_SIZE'] = batch_size
+        count, elapsed = timed(lambda: app_module.import_from_word(path, 'Benchmark', duplicate_mode=args.duplicate_mode))
+        results.append((f'BulkImporter, Batch {batch_size}', count, elapsed))
+    if not args.no_orm:
+        reset_pool(app_module)
+        count, elapsed = timed(lambda: orm_import(app_module, path))
+        results.append(('ORM, ein Commit', count, elapsed))
+    return results
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Beantwortet Chat-Completions im OpenAI-Format mit den Frage/Lösung-Paaren aus dem Prompt"""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    requests = 0
+    lock = threading.Lock()
+    pair_re = re.compile(r'Frage:\s*(.+?)\s*Lösung:\s*(.+?)(?=\s*Frage:|\s*$)', re.S)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][0]['content']
+        text = prompt.split('Text:\n', 1)[-1].split('\n\nBitte gib', 1)[0]
+        questions = [
+            {'content': content.strip(), 'answer': answer.strip(), 'tags': 'Stub', 'difficulty': 3}
+            for content, answer in self.pair_re.findall(text)
+        ]
+        with StubLLMHandler.lock:
+            StubLLMHandler.requests += 1
+        time.sleep(self.latency)  # Antwortzeit des Modells
+        content = json.dumps({'questions': questions}, ensure_ascii=False)
+        # Bricht der Client den Stream nach der letzten Frage ab, übergeht StubLLMServer den Fehler
+        self._respond(content, body.get('stream'))
+
+    def _respond(self, content, stream):
+        if stream:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(content), 200):
+                delta = {'choices': [{'delta': {'content': content[start:start + 200]}}]}
+                self._chunk(f'data: {json.dumps(delta)}\n\n')
+            self._chunk('data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            data = json.dumps({'choices': [{'message': {'content': content}}]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def _chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        """Vom Client abgebrochene Verbindungen still übergehen, alles andere wie gehabt ausgeben"""
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def run_llm(app_module, path, args):
+    StubLLMHandler.latency = args.llm_latency
+    server = StubLLMServer(('127.0.0.1', free_port()), StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = []
+    try:
+        for stream in (True, False):
+            for concurrency in args.concurrency:
+                reset_pool(app_module)
+                config = app_module.LLMConfig(
+                    name=f'Stub {concurrency}', api_url=f'http://127.0.0.1:{server.server_port}/v1/chat/completions',
+                    model='stub', provider='openai', chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+                    max_concurrency=concurrency, stream=stream,
+                )
+                app_module.db.session.add(config)
+                app_module.db.session.commit()
+                StubLLMHandler.requests = 0
+                count, elapsed = timed(lambda: app_module.import_from_word_with_llm(
+                    path, config.id, 'Benchmark', duplicate_mode=args.duplicate_mode))
+                label = f"LLM {'Stream' if stream else 'blockierend'}, {concurrency} parallel, {StubLLMHandler.requests} Abschnitte"
+                results.append((label, count, elapsed))
+    finally:
+        server.shutdown()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Import-Durchsatz für Word- und LLM-Import')
+    parser.add_argument('--method', choices=['classic', 'llm', 'all'], default='classic')
+    parser.add_argument('--questions', type=int, default=10000, help='Fragen im erzeugten Dokument (Standard 10000)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--duplicate-mode', choices=['skip', 'flag', 'import'], default='skip')
+    parser.add_argument('--no-orm', action='store_true', help='ORM-Vergleich weglassen')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help='LLM: parallele Anfragen')
+    parser.add_argument('--chunk-size', type=int, default=12000, help='LLM: Zeichen pro Abschnitt')
+    parser.add_argument('--chunk-overlap', type=int, default=500, help='LLM: Überlappung in Zeichen')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='LLM: Antwortzeit des Stubs in Sekunden')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='hortiexam-bench-')
+    # Vor dem Import von app setzen - eigene, leere Datenbank
+    os.environ['HORTIEXAM_INSTANCE_DIR'] = os.path.join(workdir, 'instance')
+    try:
+        import app as app_module
+
+        path = os.path.join(workdir, 'fragen.docx')
+        _, elapsed = timed(lambda: generate_docx(path, args.questions))
+        print(f"{args.questions} Fragen erzeugt ({os.path.getsize(path) // 1024} KB, {elapsed:.1f} s)")
+
+        results = []
+        with app_module.app.app_context():
+            if args.method in ('classic', 'all'):
+                results += run_classic(app_module, path, args)
+            if args.method in ('llm', 'all'):
+                results += run_llm(app_module, path, args)
+
+        print(f"\n{'Variante':<52}{'Fragen':>8}{'Sekunden':>10}{'Fragen/s':>10}")
+        for label, count, elapsed in results:
+            print(f"{label:<52}{count:>8}{elapsed:>10.2f}{count / elapsed:>10.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
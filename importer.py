@@ -0,0 +1,149 @@
+"""
+Bulk-Import von Fragen.
+
+Statt pro Frage ein ORM-Objekt anzulegen, sammelt BulkImporter die Zeilen
+und schreibt sie per Core-INSERT (executemany) in Batches. Jeder Batch ist
+eine eigene Transaktion - der Schreib-Lock wird nur kurz gehalten und andere
+Nutzer können zwischendurch schreiben.
+
+Vor jedem Batch wird gegen den vorhandenen Pool und die bisher importierten
+Fragen auf Duplikate geprüft (dedup.py) - je nach Modus werden sie
+übersprungen, markiert (duplicate_of_id) oder trotzdem importiert.
+"""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert, update, bindparam
+
+from models import db, Question, format_tags, index_new_questions, question_fingerprint, pack_signature
+from dedup import DuplicateIndex, find_existing_duplicates
+
+
+DEFAULT_BATCH_SIZE = 500
+DUPLICATE_MODES = ('skip', 'flag', 'import')
+
+
+def _clean_difficulty(value):
+    try:
+        return min(5, max(1, int(value)))
+    except (TypeError, ValueError):
+        return 3
+
+
+class BulkImporter:
+    """Sammelt Fragen und schreibt sie batchweise, inkl. Tags und Volltextindex"""
+
+    def __init__(self, batch_size=None, on_batch=None, duplicate_mode='skip'):
+        self.batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.on_batch = on_batch  # on_batch(importer) nach jedem Commit, z.B. für Fortschritt
+        self.duplicate_mode = duplicate_mode if duplicate_mode in DUPLICATE_MODES else 'skip'
+        self.inserted = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self._rows = []
+        self._fingerprints = []
+        self._seen = DuplicateIndex()  # Fragen dieses Imports (auch aus früheren Batches)
+
+    def add(self, content, answer, category='Allgemein', tags='', difficulty=3, active=True):
+        """Frage vormerken - leere Fragen/Lösungen werden gezählt, aber übersprungen"""
+        content = str(content or '').strip()
+        answer = str(answer or '').strip()
+        if not content or not answer:
+            self.skipped += 1
+            return False
+        
+        self._rows.append({
+            'content': content,
+            'answer': answer,
+            'category': str(category or 'Allgemein').strip()[:100],
+            'tags': format_tags(tags)[:500],
+            'difficulty': _clean_difficulty(difficulty),
+            'active': active,
+            'date_created': datetime.utcnow(),
+        })
+        self._fingerprints.append(question_fingerprint(content))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Gesammelte Zeilen in einer Transaktion schreiben"""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        fingerprints, self._fingerprints = self._fingerprints, []
+        try:
+            rows, fingerprints, duplicate_refs = self._check_duplicates(rows, fingerprints)
+            if rows:
+                result = db.session.execute(
+                    insert(Question.__table__).returning(Question.__table__.c.id, sort_by_parameter_order=True),
+                    rows
+                )
+                for row, (question_id,) in zip(rows, result.all()):
+                    row['id'] = question_id
+                index_new_questions(db.session.connection(), rows)
+                self._link_batch_duplicates(rows, duplicate_refs)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for index, (row, fp) in enumerate(zip(rows, fingerprints)):
+            if fp and row['duplicate_of_id'] is None and index not in duplicate_refs:
+                self._seen.add(fp, row['id'])
+        self.inserted += len(rows)
+        if self.on_batch:
+            self.on_batch(self)
+
+    def _check_duplicates(self, rows, fingerprints):
+        """
+        Duplikate gegen Pool und bisherigen Import suchen. Liefert die zu
+        schreibenden Zeilen, ihre Fingerabdrücke und
+        {Position: Position des Originals im selben Batch}.
+        """
+        for row, fp in zip(rows, fingerprints):
+            row['content_hash'] = fp.content_hash if fp else None
+            row['minhash'] = pack_signature(fp.minhash) if fp else None
+            row['duplicate_of_id'] = None
+        if self.duplicate_mode == 'import':
+            return rows, fingerprints, {}
+        
+        existing = find_existing_duplicates(db.session.connection(), fingerprints)
+        batch = DuplicateIndex()
+        kept = []
+        kept_fingerprints = []
+        duplicate_refs = {}
+        for index, (row, fp) in enumerate(zip(rows, fingerprints)):
+            match = existing.get(index)
+            if match is None and fp:
+                match = self._seen.find(fp)
+            batch_match = batch.find(fp) if match is None and fp else None
+            if match is None and batch_match is None:
+                if fp:
+                    batch.add(fp, len(kept))
+                kept.append(row)
+                kept_fingerprints.append(fp)
+                continue
+            
+            self.duplicates += 1
+            if self.duplicate_mode == 'flag':
+                if match is not None:
+                    row['duplicate_of_id'] = match[0]
+                else:
+                    duplicate_refs[len(kept)] = batch_match[0]  # ID steht erst nach dem INSERT fest
+                kept.append(row)
+                kept_fingerprints.append(fp)
+        return kept, kept_fingerprints, duplicate_refs
+
+    def _link_batch_duplicates(self, rows, duplicate_refs):
+        """duplicate_of_id für Duplikate innerhalb desselben Batches nachtragen"""
+        if not duplicate_refs:
+            return
+        table = Question.__table__
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(duplicate_of_id=bindparam('b_of')),
+            [{'b_id': rows[index]['id'], 'b_of': rows[original]['id']} for index, original in duplicate_refs.items()]
+        )
+
+    def close(self):
+        self.flush()
+        return self.inserted
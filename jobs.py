@@ -0,0 +1,93 @@
+"""
+In-Process-Jobqueue für langlaufende Importe.
+
+Die Request-Handler legen einen ImportJob an und übergeben ihn hier an einen
+Thread-Pool. Der Fortschritt steht in der Datenbank, damit die Import-Seite
+ihn abfragen kann - auch aus einem anderen Worker-Thread des Servers.
+"""
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from models import db, ImportJob
+
+
+class JobQueue:
+    """Thread-Pool, der Import-Jobs im App-Kontext ausführt"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('IMPORT_WORKERS', 2)
+        app.extensions['job_queue'] = self
+
+    def _get_executor(self):
+        # Erst beim ersten Job starten - der Reloader-Elternprozess braucht keine Threads
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.app.config['IMPORT_WORKERS'],
+                thread_name_prefix='import-job'
+            )
+        return self.executor
+
+    def submit(self, job_id, handler):
+        """Job im Hintergrund ausführen: handler(job, progress) liefert die Anzahl importierter Fragen"""
+        return self._get_executor().submit(self._run, job_id, handler)
+
+    def _run(self, job_id, handler):
+        with self.app.app_context():
+            job = db.session.get(ImportJob, job_id)
+            if job is None:
+                return
+            try:
+                job.status = 'running'
+                job.date_started = datetime.utcnow()
+                db.session.commit()
+
+                def progress(**fields):
+                    for name, value in fields.items():
+                        setattr(job, name, value)
+                    db.session.commit()
+
+                imported = handler(job, progress)
+
+                job.questions_imported = imported
+                job.status = 'done'
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(ImportJob, job_id)
+                job.status = 'failed'
+                job.error = str(e)
+                self.app.logger.error(f"Import-Job {job_id} fehlgeschlagen:\n{traceback.format_exc()}")
+            finally:
+                job.date_finished = datetime.utcnow()
+                remove_upload(job.filepath)
+                db.session.commit()
+                db.session.remove()
+
+
+def remove_upload(filepath):
+    """Hochgeladene Datei nach dem Import löschen"""
+    try:
+        if filepath and os.path.exists(filepath):
+            os.remove(filepath)
+    except OSError:
+        pass
+
+
+def fail_interrupted_jobs():
+    """Jobs, die beim letzten Beenden des Servers noch liefen, als abgebrochen markieren"""
+    interrupted = ImportJob.query.filter(ImportJob.status.in_(['queued', 'running'])).all()
+    for job in interrupted:
+        job.status = 'failed'
+        job.error = 'Import wurde durch einen Neustart des Servers abgebrochen'
+        job.date_finished = datetime.utcnow()
+        remove_upload(job.filepath)
+    db.session.commit()
+    return len(interrupted)
@@ -0,0 +1,812 @@
+"""
+LLM-Anbindung für den Word-Import.
+
+Lange Dokumente werden an Absatz- und Überschriftsgrenzen in Abschnitte
+zerlegt, die parallel (begrenzt pro LLMConfig) an die API gehen. Die
+Ergebnisse werden zusammengeführt und doppelte Fragen entfernt. Jede
+Antwort landet in einem inhaltsadressierten Cache (Tabelle llm_cache), so
+dass ein erneuter Import nur geänderte Abschnitte bezahlt. OpenAI und
+Anthropic werden gestreamt; fertige Fragen werden gemeldet, sobald ihr
+JSON-Objekt vollständig ist.
+"""
+import re
+import json
+import zlib
+import hashlib
+import time
+import random
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from types import SimpleNamespace
+
+from flask import current_app
+
+from models import db, strip_html, LLMCacheEntry
+from dedup import normalize_text
+
+
+# Standardwerte, falls in der LLMConfig nichts hinterlegt ist
+DEFAULT_CHUNK_SIZE = 12000  # Zeichen pro Abschnitt
+DEFAULT_CHUNK_OVERLAP = 500  # Zeichen, die am Anfang des nächsten Abschnitts wiederholt werden
+DEFAULT_MAX_CONCURRENCY = 4  # Gleichzeitige Anfragen pro Konfiguration
+MAX_CONCURRENCY_LIMIT = 32
+
+LLM_CONFIG_FIELDS = (
+    'id', 'name', 'api_url', 'api_key', 'model', 'provider', 'headers', 'prompt_template',
+    'chunk_size', 'chunk_overlap', 'max_concurrency', 'requests_per_minute', 'tokens_per_minute', 'stream'
+)
+
+# Wiederholungen bei 429/5xx und Verbindungsfehlern
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0  # Sekunden, verdoppelt sich pro Versuch
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 120
+
+# Eintreffende Fragen werden in kleinen Gruppen gespeichert
+STREAM_BATCH_SIZE = 10
+STREAM_FLUSH_INTERVAL = 0.5  # Sekunden
+
+
+class CacheStats:
+    """Treffer/Fehlschläge des LLM-Caches seit dem Serverstart (thread-sicher)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+
+cache_stats = CacheStats()
+
+
+def cache_key(config, category, chunk):
+    """Inhaltsadresse eines Abschnitts: gleiche Eingaben = gleiche LLM-Antwort"""
+    raw = json.dumps([
+        config.provider or 'custom', config.model or '', config.prompt_template or '', category or '', chunk
+    ], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cache_get_many(keys):
+    """Gecachte Fragenlisten für mehrere Schlüssel mit einer Abfrage laden"""
+    if not keys:
+        return {}
+    max_age = timedelta(days=current_app.config.get('LLM_CACHE_MAX_AGE_DAYS', 90))
+    now = datetime.utcnow()
+    entries = LLMCacheEntry.query.filter(
+        LLMCacheEntry.key.in_(set(keys)),
+        LLMCacheEntry.date_created >= now - max_age
+    ).all()
+    found = {}
+    for entry in entries:
+        try:
+            found[entry.key] = json.loads(entry.questions)
+        except ValueError:
+            continue
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used = now
+    db.session.commit()
+    return found
+
+
+def cache_put(key, questions):
+    payload = json.dumps(questions, ensure_ascii=False)
+    entry = db.session.get(LLMCacheEntry, key) or LLMCacheEntry(key=key)
+    entry.questions = payload
+    entry.size_bytes = len(payload.encode('utf-8'))
+    entry.date_created = entry.last_used = datetime.utcnow()
+    db.session.add(entry)
+    db.session.commit()
+
+
+def evict_cache():
+    """Zu alte Einträge löschen und den Cache auf LLM_CACHE_MAX_BYTES begrenzen (am längsten unbenutzte zuerst)"""
+    max_age = timedelta(days=current_app.config.get('LLM_CACHE_MAX_AGE_DAYS', 90))
+    max_bytes = current_app.config.get('LLM_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+    
+    removed = LLMCacheEntry.query.filter(LLMCacheEntry.date_created < datetime.utcnow() - max_age) \
+        .delete(synchronize_session=False)
+    
+    total = db.session.query(db.func.coalesce(db.func.sum(LLMCacheEntry.size_bytes), 0)).scalar()
+    if total > max_bytes:
+        stale_keys = []
+        for key, size in db.session.query(LLMCacheEntry.key, LLMCacheEntry.size_bytes) \
+                .order_by(LLMCacheEntry.last_used).yield_per(500):
+            if total <= max_bytes:
+                break
+            stale_keys.append(key)
+            total -= size or 0
+        for start in range(0, len(stale_keys), 500):
+            removed += LLMCacheEntry.query.filter(LLMCacheEntry.key.in_(stale_keys[start:start + 500])) \
+                .delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+def get_cache_summary():
+    """Kennzahlen für die Einstellungsseite"""
+    entries, size = db.session.query(
+        db.func.count(LLMCacheEntry.key),
+        db.func.coalesce(db.func.sum(LLMCacheEntry.size_bytes), 0)
+    ).one()
+    lookups = cache_stats.hits + cache_stats.misses
+    return {
+        'entries': entries,
+        'size_bytes': size,
+        'hits': cache_stats.hits,
+        'misses': cache_stats.misses,
+        'hit_rate': round(100 * cache_stats.hits / lookups) if lookups else 0,
+    }
+
+
+def clear_cache():
+    removed = LLMCacheEntry.query.delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+def estimate_tokens(text):
+    """Grobe Schätzung (~4 Zeichen pro Token) für das Token-Limit"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Token-Bucket: rate_per_minute Einheiten pro Minute, Burst bis zur vollen Minute"""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Blockiert, bis amount Einheiten verfügbar sind"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(min(wait, 5.0))
+
+
+class CallStats:
+    """Latenzen und Fehler der letzten API-Aufrufe einer Konfiguration"""
+
+    def __init__(self, window=200):
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=window)  # Sekunden, nur erfolgreiche Aufrufe
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def record(self, latency=None, error=False, retries=0):
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            if error:
+                self.errors += 1
+            elif latency is not None:
+                self.latencies.append(latency)
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            calls, errors, retries = self.calls, self.errors, self.retries
+        if latencies:
+            avg = sum(latencies) / len(latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        else:
+            avg = p95 = None
+        return {'calls': calls, 'errors': errors, 'retries': retries, 'avg_latency': avg, 'p95_latency': p95}
+
+
+def parse_retry_after(value):
+    """Retry-After als Sekunden (Zahl oder HTTP-Datum)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class LLMClient:
+    """Gepoolte HTTP-Session einer LLMConfig mit Rate-Limit, Retries und Latenzmessung"""
+
+    def __init__(self, config):
+        import requests  # erst beim ersten LLM-Import laden - requests/certifi kosten beim Start der .exe Zeit
+        pool_size = max(1, min(config.max_concurrency or DEFAULT_MAX_CONCURRENCY, MAX_CONCURRENCY_LIMIT))
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.request_bucket = TokenBucket(config.requests_per_minute) if config.requests_per_minute else None
+        self.token_bucket = TokenBucket(config.tokens_per_minute) if config.tokens_per_minute else None
+        self.stats = CallStats()
+
+    def send(self, url, headers, body, estimated_tokens=0, stream=False):
+        """
+        POST mit exponentiellem Backoff; Retry-After des Servers hat Vorrang.
+        Liefert (response, retries). Bei stream=True misst der Aufrufer die Latenz selbst.
+        """
+        import requests
+        attempt = 0
+        while True:
+            if self.request_bucket:
+                self.request_bucket.acquire(1)
+            if self.token_bucket and estimated_tokens:
+                self.token_bucket.acquire(estimated_tokens)
+            
+            retry_after = None
+            try:
+                response = self.session.post(url, headers=headers, json=body, timeout=REQUEST_TIMEOUT, stream=stream)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response, attempt
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                response.close()
+                error = requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.HTTPError:
+                self.stats.record(error=True, retries=attempt)
+                raise
+            
+            if attempt >= MAX_RETRIES:
+                self.stats.record(error=True, retries=attempt)
+                raise error
+            delay = retry_after if retry_after is not None else min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            time.sleep(min(BACKOFF_MAX, delay) + random.uniform(0, 0.25 * BACKOFF_BASE))
+            attempt += 1
+
+    def post(self, url, headers, body, estimated_tokens=0):
+        """Normale (nicht gestreamte) Anfrage inkl. Latenzmessung"""
+        started = time.monotonic()
+        response, retries = self.send(url, headers, body, estimated_tokens)
+        self.stats.record(latency=time.monotonic() - started, retries=retries)
+        return response
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(config):
+    """Client pro Konfiguration wiederverwenden - neu anlegen, wenn sich URL oder Limits ändern"""
+    fingerprint = (config.api_url, config.max_concurrency, config.requests_per_minute, config.tokens_per_minute)
+    with _clients_lock:
+        entry = _clients.get(config.id)
+        if entry is None or entry[0] != fingerprint:
+            client = LLMClient(config)
+            if entry is not None:
+                client.stats = entry[1].stats  # Statistik bleibt über Änderungen erhalten
+                entry[1].session.close()
+            entry = _clients[config.id] = (fingerprint, client)
+        return entry[1]
+
+
+def get_call_stats():
+    """Aufrufstatistik pro LLMConfig-ID (seit Serverstart)"""
+    with _clients_lock:
+        clients = {config_id: client for config_id, (_, client) in _clients.items()}
+    return {config_id: client.stats.summary() for config_id, client in clients.items()}
+
+
+def snapshot_llm_config(llm_config):
+    """Konfiguration als einfaches Objekt kopieren - ORM-Objekte gehören nicht in fremde Threads"""
+    return SimpleNamespace(**{field: getattr(llm_config, field, None) for field in LLM_CONFIG_FIELDS})
+
+
+class IncompleteResponse(Exception):
+    """Antwort brach ab - die bis dahin vollständigen Fragen stehen in .questions"""
+
+    def __init__(self, message, questions):
+        super().__init__(message)
+        self.questions = questions
+
+
+class QuestionStreamParser:
+    """
+    Inkrementeller Parser für {"questions": [{...}, {...}, ...]}.
+
+    feed() nimmt beliebige Textstücke entgegen; jedes Frage-Objekt wird gemeldet,
+    sobald seine schließende Klammer da ist. Markdown-Fences und Text vor dem JSON
+    werden übersprungen, ein abgeschnittenes Ende kostet nur die letzte Frage.
+    """
+
+    _START_RE = re.compile(r'"questions"\s*:\s*\[|^\s*(?:```(?:json)?\s*)?\[')
+
+    def __init__(self, on_question=None):
+        self.on_question = on_question
+        self.questions = []
+        self.finished = False  # Array vollständig geschlossen
+        self._buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = None
+
+    def feed(self, text):
+        if self.finished or not text:
+            return
+        self._buffer += text
+        if not self._in_array:
+            match = self._START_RE.search(self._buffer)
+            if not match:
+                return
+            self._in_array = True
+            self._pos = match.end()
+        self._scan()
+
+    def _scan(self):
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf) and not self.finished:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{' or ch == '[':
+                if self._depth == 0 and ch == '{':
+                    self._obj_start = i
+                self._depth += 1
+            elif ch == '}' or ch == ']':
+                if self._depth == 0:
+                    self.finished = ch == ']'
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and self._obj_start is not None:
+                        self._emit(buf[self._obj_start:i + 1])
+                        self._obj_start = None
+            i += 1
+        # Verarbeiteten Text verwerfen - der Puffer wächst nicht mit der Antwort
+        keep_from = self._obj_start if self._obj_start is not None else i
+        self._buffer = buf[keep_from:]
+        self._pos = i - keep_from
+        if self._obj_start is not None:
+            self._obj_start = 0
+
+    def _emit(self, raw):
+        try:
+            q_data = json.loads(raw)
+        except ValueError:
+            return
+        if isinstance(q_data, dict):
+            self.questions.append(q_data)
+            if self.on_question:
+                self.on_question(q_data)
+
+
+def build_llm_request(llm_config, text_content, category):
+    """Headers, Body und Prompt für den Provider der Konfiguration"""
+    headers = {
+        'Content-Type': 'application/json'
+    }
+    
+    # API-Key hinzufügen falls vorhanden
+    if llm_config.api_key:
+        if llm_config.provider == 'openai':
+            headers['Authorization'] = f'Bearer {llm_config.api_key}'
+        elif llm_config.provider == 'anthropic':
+            headers['x-api-key'] = llm_config.api_key
+            headers['anthropic-version'] = '2023-06-01'
+        else:
+            headers['Authorization'] = f'Bearer {llm_config.api_key}'
+    
+    # Zusätzliche Headers aus JSON parsen
+    if llm_config.headers:
+        try:
+            extra_headers = json.loads(llm_config.headers)
+            headers.update(extra_headers)
+        except:
+            pass
+    
+    # Prompt erstellen
+    if llm_config.prompt_template:
+        prompt = llm_config.prompt_template.replace('{text}', text_content).replace('{category}', category)
+    else:
+        prompt = f"""Analysiere folgenden Text und extrahiere alle Prüfungsfragen mit ihren Lösungen.
+
+Text:
+{text_content}
+
+Bitte gib die Fragen und Lösungen im folgenden JSON-Format zurück:
+{{
+  "questions": [
+    {{
+      "content": "Die Frage hier",
+      "answer": "Die Lösung hier",
+      "category": "{category}",
+      "tags": "Tag1, Tag2",
+      "difficulty": 3
+    }}
+  ]
+}}
+
+Nur JSON zurückgeben, keine zusätzlichen Erklärungen."""
+
+    # Request-Body je nach Provider
+    if llm_config.provider == 'openai':
+        body = {
+            "model": llm_config.model or "gpt-4",
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3
+        }
+    elif llm_config.provider == 'anthropic':
+        body = {
+            "model": llm_config.model or "claude-3-opus-20240229",
+            "max_tokens": 4000,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+    else:
+        # Custom API - erwartet Standard-Format
+        body = {
+            "model": llm_config.model,
+            "prompt": prompt,
+            "temperature": 0.3,
+            "max_tokens": 4000
+        }
+    return headers, body, prompt
+
+
+def supports_streaming(llm_config):
+    return bool(llm_config.stream) and llm_config.provider in ('openai', 'anthropic')
+
+
+def iter_stream_text(response, provider):
+    """Textstücke aus einem SSE-Stream (OpenAI: choices[].delta.content, Anthropic: content_block_delta)"""
+    # SSE ist immer UTF-8, requests würde ohne charset Latin-1 annehmen
+    response.encoding = 'utf-8'
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if provider == 'openai':
+            for choice in event.get('choices') or []:
+                text = (choice.get('delta') or {}).get('content')
+                if text:
+                    yield text
+        elif event.get('type') == 'content_block_delta':
+            text = (event.get('delta') or {}).get('text')
+            if text:
+                yield text
+        elif event.get('type') == 'error':
+            raise Exception((event.get('error') or {}).get('message', 'Fehler im Stream'))
+
+
+def _call_streaming(llm_config, headers, body, prompt, on_question):
+    """Antwort als Stream lesen und Fragen melden, sobald sie vollständig sind"""
+    client = get_llm_client(llm_config)
+    started = time.monotonic()
+    response, retries = client.send(
+        llm_config.api_url,
+        headers=headers,
+        body=dict(body, stream=True),
+        estimated_tokens=estimate_tokens(prompt) + 4000,
+        stream=True
+    )
+    parser = QuestionStreamParser(on_question)
+    try:
+        with response:
+            for text in iter_stream_text(response, llm_config.provider):
+                parser.feed(text)
+                if parser.finished:
+                    break
+    except Exception as e:
+        client.stats.record(error=True, retries=retries)
+        if parser.questions:
+            raise IncompleteResponse(f"Stream abgebrochen: {str(e)}", parser.questions)
+        raise
+    client.stats.record(latency=time.monotonic() - started, retries=retries)
+    
+    if not parser.finished:
+        if parser.questions:
+            raise IncompleteResponse("Antwort unvollständig (abgeschnitten)", parser.questions)
+        raise Exception("Keine Fragen im Stream gefunden")
+    return parser.questions
+
+
+def _call_blocking(llm_config, headers, body, prompt):
+    """Komplette Antwort abwarten und parsen"""
+    # API-Call über die gepoolte Session (Rate-Limit, Retries, Latenzmessung)
+    response = get_llm_client(llm_config).post(
+        llm_config.api_url,
+        headers=headers,
+        body=body,
+        estimated_tokens=estimate_tokens(prompt) + 4000
+    )
+    
+    # Response parsen
+    data = response.json()
+    
+    # Response je nach Provider extrahieren
+    if llm_config.provider == 'openai':
+        content = data['choices'][0]['message']['content']
+    elif llm_config.provider == 'anthropic':
+        content = data['content'][0]['text']
+    else:
+        # Custom API - versuche verschiedene Formate
+        content = data.get('response') or data.get('text') or data.get('content') or str(data)
+    
+    # JSON aus Response extrahieren (falls es in Markdown-Code-Blöcken ist)
+    content = content.strip()
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0].strip()
+    elif '```' in content:
+        content = content.split('```')[1].split('```')[0].strip()
+    
+    try:
+        result = json.loads(content)
+    except json.JSONDecodeError:
+        # Kaputtes oder abgeschnittenes JSON: alle vollständigen Frage-Objekte retten
+        parser = QuestionStreamParser()
+        parser.feed(content)
+        if parser.questions and parser.finished:
+            return parser.questions
+        if parser.questions:
+            raise IncompleteResponse("Antwort unvollständig (abgeschnitten)", parser.questions)
+        raise Exception(f"Konnte JSON nicht parsen. Response: {content[:200]}")
+    
+    questions = result.get('questions', []) if isinstance(result, dict) else result
+    if not isinstance(questions, list):
+        raise Exception("'questions' ist keine Liste")
+    return questions
+
+
+def call_llm_api(llm_config, text_content, category="Allgemein", on_question=None):
+    """
+    Ruft die konfigurierte LLM-API auf und extrahiert Fragen.
+
+    on_question(q_data) wird für jede Frage aufgerufen - beim Streaming sobald sie
+    vollständig empfangen ist. Bricht die Antwort ab, enthält IncompleteResponse
+    die bis dahin gemeldeten Fragen.
+    """
+    try:
+        headers, body, prompt = build_llm_request(llm_config, text_content, category)
+        
+        if supports_streaming(llm_config):
+            return _call_streaming(llm_config, headers, body, prompt, on_question)
+        
+        questions = _call_blocking(llm_config, headers, body, prompt)
+        if on_question:
+            for q_data in questions:
+                on_question(q_data)
+        return questions
+    except IncompleteResponse as e:
+        if on_question and not supports_streaming(llm_config):
+            for q_data in e.questions:
+                on_question(q_data)
+        raise
+    except Exception as e:
+        raise Exception(f"LLM-API Fehler: {str(e)}")
+
+
+def _split_long_paragraph(text, chunk_size):
+    """Absatz, der allein größer als ein Abschnitt ist, an Satz- bzw. Wortgrenzen teilen"""
+    pieces = []
+    while len(text) > chunk_size:
+        cut = max(text.rfind('. ', 0, chunk_size), text.rfind('\n', 0, chunk_size))
+        if cut < chunk_size // 2:
+            cut = text.rfind(' ', 0, chunk_size)
+        if cut <= 0:
+            cut = chunk_size
+        pieces.append(text[:cut + 1].strip())
+        text = text[cut + 1:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _is_anchor(text):
+    """Etwa jeder vierte Absatz ist ein möglicher Schnittpunkt - abhängig nur vom Inhalt"""
+    return zlib.crc32(text.encode('utf-8')) % 4 == 0
+
+
+def chunk_paragraphs(paragraphs, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_CHUNK_OVERLAP):
+    """
+    Absätze [(text, is_heading), ...] zu Textabschnitten von höchstens chunk_size Zeichen bündeln.
+
+    Geschnitten wird nur zwischen Absätzen - sobald der Abschnitt halb voll ist, bevorzugt vor
+    einer Überschrift oder einem inhaltlich bestimmten Ankerabsatz. Dadurch hängen die Grenzen
+    vom Text ab statt von der Position: Nach einer Änderung am Dokument bleiben die übrigen
+    Abschnitte gleich und kommen aus dem Cache. Die letzten Absätze (bis overlap Zeichen) werden am Anfang des
+    nächsten Abschnitts wiederholt, damit Frage und Lösung an der Grenze nicht verloren gehen.
+    """
+    chunk_size = max(500, chunk_size or DEFAULT_CHUNK_SIZE)
+    overlap = max(0, min(overlap or 0, chunk_size // 2))
+    
+    chunks = []
+    current = []  # Absätze des aktuellen Abschnitts (inkl. Überlappung)
+    current_len = 0
+    has_new = False  # Enthält der Abschnitt mehr als nur die Überlappung?
+    
+    def flush():
+        nonlocal current, current_len, has_new
+        chunks.append('\n\n'.join(current))
+        # Überlappung: Absätze vom Ende übernehmen, solange sie in overlap passen
+        carry = []
+        carry_len = 0
+        for text in reversed(current):
+            if carry_len + len(text) > overlap:
+                break
+            carry.insert(0, text)
+            carry_len += len(text) + 2
+        current, current_len, has_new = carry, carry_len, False
+    
+    for text, is_heading in paragraphs:
+        text = text.strip()
+        if not text:
+            continue
+        for piece in _split_long_paragraph(text, chunk_size):
+            starts_section = current_len > chunk_size // 2 and (is_heading or _is_anchor(piece))
+            if has_new and (current_len + len(piece) + 2 > chunk_size or starts_section):
+                flush()
+            # Eine neue Überschrift braucht keinen Kontext aus dem alten Abschnitt
+            if not has_new and (is_heading or current_len + len(piece) + 2 > chunk_size):
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 2
+            has_new = True
+    
+    if has_new:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def question_key(content):
+    """Vergleichsschlüssel für doppelte Fragen: ohne HTML, Satzzeichen und Groß-/Kleinschreibung"""
+    return normalize_text(strip_html(content))
+
+
+def extract_questions_chunked(llm_config, paragraphs, category="Allgemein", progress=None, on_questions=None):
+    """
+    Dokument in Abschnitte teilen, parallel ans LLM schicken und die Fragen zusammenführen.
+
+    progress(chunks_total=..., chunks_done=..., questions_found=...) und on_questions(batch)
+    werden im aufrufenden Thread aufgerufen. on_questions erhält neue (noch nicht gesehene)
+    Fragen in kleinen Gruppen, sobald sie eintreffen - beim Streaming also schon während
+    der Antwort des LLMs.
+    """
+    config = snapshot_llm_config(llm_config)
+    chunks = chunk_paragraphs(
+        paragraphs,
+        config.chunk_size or DEFAULT_CHUNK_SIZE,
+        config.chunk_overlap if config.chunk_overlap is not None else DEFAULT_CHUNK_OVERLAP
+    )
+    if not chunks:
+        return []
+    
+    merged = []
+    seen = set()
+    
+    def deliver(batch):
+        new = []
+        for q_data in batch:
+            if not isinstance(q_data, dict):
+                continue
+            key = question_key(str(q_data.get('content', '')))
+            if key and key not in seen:
+                seen.add(key)
+                new.append(q_data)
+        merged.extend(new)
+        if new and on_questions:
+            on_questions(new)
+    
+    # Bereits bekannte Abschnitte aus dem Cache - nur geänderte gehen ans LLM
+    keys = [cache_key(config, category, chunk) for chunk in chunks]
+    cached = cache_get_many(keys)
+    pending = [index for index, key in enumerate(keys) if key not in cached]
+    cache_stats.record(hits=len(chunks) - len(pending), misses=len(pending))
+    
+    done = len(chunks) - len(pending)
+    found = 0
+    for key in keys:
+        if key in cached:
+            found += len(cached[key])
+            for start in range(0, len(cached[key]), STREAM_BATCH_SIZE):
+                deliver(cached[key][start:start + STREAM_BATCH_SIZE])
+    if progress:
+        progress(chunks_total=len(chunks), chunks_done=done, questions_found=found)
+    
+    if not pending:
+        return merged
+    
+    # Worker-Threads legen fertige Fragen in die Queue, dieser Thread speichert sie
+    arrived = queue.Queue()
+    incomplete = []
+    max_workers = max(1, min(config.max_concurrency or DEFAULT_MAX_CONCURRENCY, MAX_CONCURRENCY_LIMIT, len(pending)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-chunk') as executor:
+        futures = {
+            executor.submit(call_llm_api, config, chunks[index], category, arrived.put): index
+            for index in pending
+        }
+        remaining = set(futures)
+        try:
+            while remaining:
+                finished, remaining = wait(remaining, timeout=STREAM_FLUSH_INTERVAL, return_when=FIRST_COMPLETED)
+                
+                batch = _drain(arrived)
+                found += len(batch)
+                for start in range(0, len(batch), STREAM_BATCH_SIZE):
+                    deliver(batch[start:start + STREAM_BATCH_SIZE])
+                
+                for future in finished:
+                    index = futures[future]
+                    try:
+                        questions = future.result()
+                        # Sofort speichern - bricht ein späterer Abschnitt ab, bleibt die Arbeit erhalten
+                        cache_put(keys[index], questions)
+                    except IncompleteResponse as e:
+                        # Teilergebnis behalten (ist schon gespeichert), aber nicht cachen
+                        incomplete.append(f"Abschnitt {index + 1}: {str(e)}")
+                    except Exception as e:
+                        raise Exception(f"Abschnitt {index + 1} von {len(chunks)}: {str(e)}")
+                    done += 1
+                if progress and (finished or batch):
+                    progress(chunks_done=done, questions_found=found)
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    
+    # Nachzügler aus der Queue
+    deliver(_drain(arrived))
+    evict_cache()
+    
+    if incomplete:
+        current_app.logger.warning("LLM-Import mit unvollständigen Abschnitten: " + '; '.join(incomplete))
+        if progress:
+            progress(error=f"{len(incomplete)} Abschnitt(e) unvollständig übertragen - Teilergebnisse wurden übernommen")
+    return merged
+
+
+def _drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
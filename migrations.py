@@ -0,0 +1,282 @@
+"""
+Einfache Schema-Migrationen für die SQLite-Datenbank.
+
+db.create_all() legt nur fehlende Tabellen an - Indizes, Spalten und
+Daten-Backfills für bestehende Datenbanken kommen hierher. Die aktuelle
+Version steht in PRAGMA user_version, jede Migration läuft genau einmal.
+
+Ist die Datenbank auf dem aktuellen Stand (schema_is_current), überspringt
+der Start db.create_all() ganz. Neue Tabellen brauchen deshalb immer auch
+eine Migration (create(checkfirst=True)), sonst fehlen sie in bestehenden
+Datenbanken.
+"""
+from sqlalchemy import text
+
+
+def _backfill_question_tags(connection):
+    """question_tags aus der kommagetrennten Spalte Question.tags befüllen"""
+    from models import parse_tags
+
+    rows = connection.execute(text(
+        "SELECT id, tags FROM questions WHERE tags IS NOT NULL AND tags != ''"
+    )).fetchall()
+    links = [
+        {'question_id': question_id, 'tag': tag}
+        for question_id, tags in rows
+        for tag in parse_tags(tags)
+    ]
+    if links:
+        connection.execute(text(
+            "INSERT OR IGNORE INTO question_tags (question_id, tag) VALUES (:question_id, :tag)"
+        ), links)
+
+
+def _create_questions_fts(connection):
+    """FTS5-Volltextindex über Frage und Lösung (HTML entfernt) anlegen und befüllen"""
+    from models import QUESTIONS_FTS_TABLE, strip_html
+
+    # remove_diacritics 2: Akzente und Umlaute werden bei der Suche ignoriert (ö = o)
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {QUESTIONS_FTS_TABLE} "
+        "USING fts5(content, answer, tokenize = 'unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(f"DELETE FROM {QUESTIONS_FTS_TABLE}"))
+    rows = connection.execute(text("SELECT id, content, answer FROM questions")).fetchall()
+    if rows:
+        connection.execute(text(
+            f"INSERT INTO {QUESTIONS_FTS_TABLE} (rowid, content, answer) VALUES (:id, :content, :answer)"
+        ), [
+            {'id': question_id, 'content': strip_html(content), 'answer': strip_html(answer)}
+            for question_id, content, answer in rows
+        ])
+
+
+def _create_indexes(connection, statements):
+    """
+    CREATE INDEX IF NOT EXISTS ... - Migrationen nennen ihre Indizes selbst,
+    statt über Model.__table__.indexes zu laufen: die Liste wächst mit späteren
+    Versionen und enthielte dann Indizes auf noch fehlenden Spalten.
+    """
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _create_hot_query_indexes(connection):
+    """Zusammengesetzte Indizes für /questions, Prüfungs-Items und Export"""
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_questions_date_created ON questions (date_created, id)",
+        "CREATE INDEX IF NOT EXISTS ix_questions_active_date_created ON questions (active, date_created, id)",
+        "CREATE INDEX IF NOT EXISTS ix_questions_active_category_date_created "
+        "ON questions (active, category, date_created, id)",
+        "CREATE INDEX IF NOT EXISTS ix_questions_active_difficulty_date_created "
+        "ON questions (active, difficulty, date_created, id)",
+        "CREATE INDEX IF NOT EXISTS ix_exams_date_created ON exams (date_created)",
+        "CREATE INDEX IF NOT EXISTS ix_exam_items_exam_position ON exam_items (exam_id, position)",
+        "CREATE INDEX IF NOT EXISTS ix_exam_items_exam_question ON exam_items (exam_id, original_question_id)",
+    ])
+    connection.execute(text('ANALYZE'))
+
+
+def _add_columns(connection, table, columns):
+    """Spalten per ALTER TABLE ergänzen, falls create_all() sie nicht schon angelegt hat"""
+    existing = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+    for name, definition in columns:
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+
+
+def _add_llm_chunk_settings(connection):
+    """Abschnittsgröße, Überlappung und Parallelität pro LLM-Konfiguration"""
+    _add_columns(connection, 'llm_configs', [
+        ('chunk_size', 'INTEGER DEFAULT 12000'),
+        ('chunk_overlap', 'INTEGER DEFAULT 500'),
+        ('max_concurrency', 'INTEGER DEFAULT 4'),
+    ])
+
+
+def _add_llm_rate_limits(connection):
+    """Rate-Limits (Anfragen und Tokens pro Minute) pro LLM-Konfiguration"""
+    _add_columns(connection, 'llm_configs', [
+        ('requests_per_minute', 'INTEGER'),
+        ('tokens_per_minute', 'INTEGER'),
+    ])
+
+
+def _add_llm_stream_flag(connection):
+    """Streaming-Schalter pro LLM-Konfiguration"""
+    _add_columns(connection, 'llm_configs', [
+        ('stream', 'BOOLEAN DEFAULT 1'),
+    ])
+
+
+def _add_import_job_skipped(connection):
+    """Zähler für übersprungene Fragen beim Import"""
+    _add_columns(connection, 'import_jobs', [
+        ('questions_skipped', 'INTEGER DEFAULT 0'),
+    ])
+
+
+def _add_duplicate_index(connection):
+    """Fingerabdrücke für die Duplikaterkennung anlegen und für alle Fragen berechnen"""
+    from models import QuestionLSH, question_fingerprint, pack_signature
+
+    _add_columns(connection, 'questions', [
+        ('content_hash', 'VARCHAR(40)'),
+        ('minhash', 'BLOB'),
+        ('duplicate_of_id', 'INTEGER REFERENCES questions(id)'),
+    ])
+    _add_columns(connection, 'import_jobs', [
+        ('duplicate_mode', "VARCHAR(10) DEFAULT 'skip'"),
+        ('questions_duplicate', 'INTEGER DEFAULT 0'),
+    ])
+    QuestionLSH.__table__.create(connection, checkfirst=True)
+    # Erst nach dem ALTER TABLE - auf bestehenden Datenbanken gibt es content_hash vorher nicht
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_questions_content_hash ON questions (content_hash)",
+        "CREATE INDEX IF NOT EXISTS ix_question_lsh_question ON question_lsh (question_id)",
+    ])
+    
+    connection.execute(text("DELETE FROM question_lsh"))
+    updates = []
+    links = []
+    for question_id, content in connection.execute(text("SELECT id, content FROM questions")).fetchall():
+        fp = question_fingerprint(content)
+        updates.append({
+            'id': question_id,
+            'content_hash': fp.content_hash if fp else None,
+            'minhash': pack_signature(fp.minhash) if fp else None,
+        })
+        if fp:
+            links.extend({'bucket': bucket, 'question_id': question_id} for bucket in set(fp.buckets))
+    if updates:
+        connection.execute(text(
+            "UPDATE questions SET content_hash = :content_hash, minhash = :minhash WHERE id = :id"
+        ), updates)
+    if links:
+        connection.execute(text(
+            "INSERT OR IGNORE INTO question_lsh (bucket, question_id) VALUES (:bucket, :question_id)"
+        ), links)
+    connection.execute(text('ANALYZE'))
+
+
+def _add_import_job_markers(connection):
+    """Eigene Frage-/Lösungs-Marker pro Import-Job"""
+    _add_columns(connection, 'import_jobs', [
+        ('markers', 'TEXT'),
+    ])
+
+
+def _add_exam_revision(connection):
+    """Revisionszähler pro Prüfung (Schlüssel für den Export-Cache)"""
+    _add_columns(connection, 'exams', [
+        ('revision', 'INTEGER NOT NULL DEFAULT 0'),
+    ])
+
+
+def _create_exam_variants(connection):
+    """Tabelle für Prüfungsvarianten (Gruppen A, B, ...)"""
+    from models import ExamVariant
+
+    ExamVariant.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_exam_variants_exam_label ON exam_variants (exam_id, label)",
+    ])
+
+
+def _create_question_facets(connection):
+    """Zählertabelle für /questions/facets anlegen und einmalig aus dem Bestand befüllen"""
+    from models import QuestionFacet, rebuild_question_facets
+
+    QuestionFacet.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_exam_items_question ON exam_items (original_question_id)",
+    ])
+    rebuild_question_facets(connection)
+
+
+def _add_question_tag_dates(connection):
+    """Erstelldatum der Frage in question_tags - Tag-Filter sortieren über den Index statt per Temp-B-Tree"""
+    _add_columns(connection, 'question_tags', [
+        ('date_created', 'DATETIME'),
+    ])
+    connection.execute(text(
+        "UPDATE question_tags SET date_created = "
+        "(SELECT date_created FROM questions WHERE questions.id = question_tags.question_id)"
+    ))
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_question_tags_tag_date_created "
+        "ON question_tags (tag, date_created, question_id)",
+    ])
+    connection.execute(text('ANALYZE'))
+
+
+def _create_import_jobs_and_llm_cache(connection):
+    """
+    Tabellen für Hintergrund-Importe und den LLM-Antwort-Cache. Bisher legte sie nur
+    create_all() an - das läuft bei aktueller Schemaversion nicht mehr.
+    """
+    from models import ImportJob, LLMCacheEntry
+
+    ImportJob.__table__.create(connection, checkfirst=True)
+    LLMCacheEntry.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_import_jobs_date_created ON import_jobs (date_created)",
+        "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)",
+    ])
+
+
+def _create_assembly_indexes(connection):
+    """Indizes für die Zusammenstellung: Fragen pro (Kategorie, Schwierigkeit) und markierte Duplikate"""
+    _create_indexes(connection, [
+        "CREATE INDEX IF NOT EXISTS ix_questions_active_category_difficulty "
+        "ON questions (active, category, difficulty, duplicate_of_id)",
+        "CREATE INDEX IF NOT EXISTS ix_questions_duplicate_of ON questions (duplicate_of_id)",
+    ])
+    connection.execute(text('ANALYZE'))
+
+
+# (Version, Beschreibung, Funktion) - nur anhängen, nie umsortieren!
+MIGRATIONS = [
+    (1, 'question_tags aus Question.tags befüllen', _backfill_question_tags),
+    (2, 'FTS5-Volltextindex questions_fts', _create_questions_fts),
+    (3, 'Indizes für häufige Abfragen', _create_hot_query_indexes),
+    (4, 'LLM-Abschnitts-Einstellungen', _add_llm_chunk_settings),
+    (5, 'LLM-Rate-Limits', _add_llm_rate_limits),
+    (6, 'LLM-Streaming', _add_llm_stream_flag),
+    (7, 'Import-Jobs: übersprungene Fragen', _add_import_job_skipped),
+    (8, 'Duplikaterkennung (Hash, MinHash, LSH)', _add_duplicate_index),
+    (9, 'Import-Jobs: eigene Marker', _add_import_job_markers),
+    (10, 'Revision pro Prüfung', _add_exam_revision),
+    (11, 'Prüfungsvarianten', _create_exam_variants),
+    (12, 'Facetten-Zähler', _create_question_facets),
+    (13, 'Erstelldatum in question_tags', _add_question_tag_dates),
+    (14, 'Import-Jobs und LLM-Cache', _create_import_jobs_and_llm_cache),
+    (15, 'Indizes für die Zusammenstellung', _create_assembly_indexes),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection):
+    return connection.execute(text('PRAGMA user_version')).scalar() or 0
+
+
+def schema_is_current(engine):
+    """Alle Migrationen angewendet? Dann sind auch alle Tabellen da (eine Abfrage statt create_all)"""
+    with engine.connect() as connection:
+        return get_schema_version(connection) >= SCHEMA_VERSION
+
+
+def run_migrations(engine):
+    """Alle noch nicht angewendeten Migrationen ausführen"""
+    applied = []
+    with engine.begin() as connection:
+        current = get_schema_version(connection)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(connection)
+            # PRAGMA erlaubt keine Parameter - version ist eine Konstante aus MIGRATIONS
+            connection.execute(text(f'PRAGMA user_version = {int(version)}'))
+            applied.append(description)
+    return applied
@@ -1,11 +1,48 @@
+import re
+import html
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, LargeBinary, ForeignKey, Index, event, insert, update, delete, inspect, text
+from sqlalchemy.orm import relationship, Session
 from flask_sqlalchemy import SQLAlchemy
 
+from dedup import fingerprint, pack_signature, unpack_signature, lsh_buckets
+
 db = SQLAlchemy()
 
 
+# Pragma-Profile für SQLite - 'wal' erlaubt parallele Leser neben einem Schreiber (LAN-Betrieb)
+SQLITE_PRAGMA_PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # in WAL sicher gegen Korruption, nur der letzte Commit kann bei Stromausfall fehlen
+        'busy_timeout': 10000,  # ms warten statt sofort "database is locked"
+        'cache_size': -32000,  # negativ = KiB, also ~32 MB pro Verbindung
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+    },
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 10000,
+    },
+}
+
+
+def configure_sqlite(engine, pragmas):
+    """Pragmas bei jeder neuen Verbindung aus dem Pool setzen"""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+
 class Question(db.Model):
     """Der Pool aller Prüfungsfragen"""
     __tablename__ = 'questions'
@@ -19,8 +56,76 @@ class Question(db.Model):
     active = Column(Boolean, default=True)  # Nur aktive Fragen werden vorgeschlagen
     date_created = Column(DateTime, default=datetime.utcnow)
     
+    # Duplikaterkennung (siehe dedup.py) - wird automatisch aus content berechnet
+    content_hash = Column(String(40))  # SHA-1 des normalisierten Texts
+    minhash = Column(LargeBinary)  # MinHash-Signatur
+    duplicate_of_id = Column(Integer, ForeignKey('questions.id'), nullable=True)  # Beim Import als Duplikat markiert
+    
+    # Indizes für /questions: Filter auf active/category/difficulty, sortiert nach date_created, id
+    __table_args__ = (
+        Index('ix_questions_date_created', 'date_created', 'id'),
+        Index('ix_questions_active_date_created', 'active', 'date_created', 'id'),
+        Index('ix_questions_active_category_date_created', 'active', 'category', 'date_created', 'id'),
+        Index('ix_questions_active_difficulty_date_created', 'active', 'difficulty', 'date_created', 'id'),
+        Index('ix_questions_content_hash', 'content_hash'),
+        # Zusammenstellung: IDs eines Buckets (Kategorie, Schwierigkeit) und markierte Duplikate
+        Index('ix_questions_active_category_difficulty', 'active', 'category', 'difficulty', 'duplicate_of_id'),
+        Index('ix_questions_duplicate_of', 'duplicate_of_id'),
+    )
+    
     # Relationship zu ExamItems (nur für Rückverfolgung)
     exam_items = relationship("ExamItem", back_populates="original_question")
+    
+    @property
+    def tag_list(self):
+        return parse_tags(self.tags)
+
+
+class QuestionTag(db.Model):
+    """
+    Normalisierte Tag-Zuordnung - ermöglicht indizierte Tag-Filter statt
+    LIKE '%tag%' auf Question.tags. Wird automatisch synchron gehalten.
+    """
+    __tablename__ = 'question_tags'
+    
+    question_id = Column(Integer, ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String(100, collation='NOCASE'), primary_key=True)  # Groß-/Kleinschreibung egal
+    date_created = Column(DateTime)  # Kopie von Question.date_created - Tag-Filter sortiert direkt im Index
+    
+    __table_args__ = (
+        Index('ix_question_tags_tag', 'tag', 'question_id'),
+        Index('ix_question_tags_tag_date_created', 'tag', 'date_created', 'question_id'),
+    )
+
+
+class QuestionLSH(db.Model):
+    """LSH-Buckets der MinHash-Signatur - fast gleiche Fragen teilen mindestens einen Bucket"""
+    __tablename__ = 'question_lsh'
+    
+    bucket = Column(Integer, primary_key=True)  # 64-Bit-Hash aus Bandnummer und Bandwerten
+    question_id = Column(Integer, ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    
+    __table_args__ = (
+        Index('ix_question_lsh_question', 'question_id'),
+    )
+
+
+class QuestionFacet(db.Model):
+    """
+    Vorberechnete Zählerstände für /questions/facets - pro Kombination aus
+    Kategorie, Schwierigkeit und aktiv eine Zeile, zusätzlich je Tag. Wird bei
+    jeder Änderung an Fragen und Prüfungs-Items inkrementell nachgeführt
+    (siehe update_question_facets), nie per GROUP BY über alle Fragen.
+    """
+    __tablename__ = 'question_facets'
+    
+    tag = Column(String(100, collation='NOCASE'), primary_key=True)  # '' = alle Fragen, sonst nur Fragen mit diesem Tag
+    category = Column(String(100), primary_key=True)  # '' = ohne Kategorie
+    difficulty = Column(Integer, primary_key=True)  # 0 = ohne Schwierigkeit
+    active = Column(Boolean, primary_key=True)
+    questions = Column(Integer, nullable=False, default=0)  # Anzahl Fragen
+    uses = Column(Integer, nullable=False, default=0)  # ExamItems, die auf diese Fragen verweisen
+    used = Column(Integer, nullable=False, default=0)  # Fragen, die in mindestens einer Prüfung stehen
 
 
 class Exam(db.Model):
@@ -31,9 +136,15 @@ class Exam(db.Model):
     title = Column(String(200), nullable=False)  # z.B. "Abschlussprüfung Sommer 2025"
     date_created = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), default="Draft")  # "Draft" oder "Final"
+    revision = Column(Integer, default=0, nullable=False)  # Wird bei jeder Änderung an Titel oder Items hochgezählt
+    
+    __table_args__ = (
+        Index('ix_exams_date_created', 'date_created'),
+    )
     
     # Relationship zu ExamItems
     items = relationship("ExamItem", back_populates="exam", cascade="all, delete-orphan", order_by="ExamItem.position")
+    variants = relationship("ExamVariant", cascade="all, delete-orphan", order_by="ExamVariant.id")
 
 
 class ExamItem(db.Model):
@@ -52,11 +163,40 @@ class ExamItem(db.Model):
     points = Column(Integer, default=1)  # Punkte für diese spezifische Prüfung
     position = Column(Integer, default=0)  # Reihenfolge in der Prüfung
     
+    # Items einer Prüfung in Reihenfolge / "Frage schon in Prüfung?"
+    __table_args__ = (
+        Index('ix_exam_items_exam_position', 'exam_id', 'position'),
+        Index('ix_exam_items_exam_question', 'exam_id', 'original_question_id'),
+        Index('ix_exam_items_question', 'original_question_id'),  # Verwendungszähler in question_facets
+    )
+    
     # Relationships
     exam = relationship("Exam", back_populates="items")
     original_question = relationship("Question", back_populates="exam_items")
 
 
+class ExamVariant(db.Model):
+    """
+    Eine Variante (Gruppe A, B, ...) einer Prüfung gegen Abschreiben. Gespeichert
+    wird nur die Reihenfolge der Items und welche Fragen ausgetauscht wurden -
+    keine Snapshot-Kopien (siehe variants.py).
+    """
+    __tablename__ = 'exam_variants'
+    
+    id = Column(Integer, primary_key=True)
+    exam_id = Column(Integer, ForeignKey('exams.id', ondelete='CASCADE'), nullable=False)
+    label = Column(String(10), nullable=False)  # "A", "B", ...
+    seed = Column(Integer, nullable=False)  # Gleicher Seed + gleiche Prüfung = gleiche Varianten
+    exam_revision = Column(Integer, nullable=False)  # Exam.revision bei der Erzeugung - weicht sie ab, ist die Variante veraltet
+    item_order = Column(Text, nullable=False)  # ExamItem-IDs in Variantenreihenfolge, z.B. "12,9,10"
+    substitutions = Column(Text)  # JSON: {"<ExamItem-ID>": <Ersatz-Fragen-ID>}
+    date_created = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_exam_variants_exam_label', 'exam_id', 'label', unique=True),
+    )
+
+
 class LLMConfig(db.Model):
     """Konfiguration für LLM-APIs"""
     __tablename__ = 'llm_configs'
@@ -69,5 +209,386 @@ class LLMConfig(db.Model):
     provider = Column(String(50), default="custom")  # "openai", "anthropic", "custom"
     headers = Column(Text)  # JSON-String für zusätzliche Headers
     prompt_template = Column(Text)  # Template für den Prompt
+    chunk_size = Column(Integer, default=12000)  # Zeichen pro Abschnitt beim LLM-Import
+    chunk_overlap = Column(Integer, default=500)  # Überlappung zwischen Abschnitten (Zeichen)
+    max_concurrency = Column(Integer, default=4)  # Gleichzeitige API-Anfragen
+    requests_per_minute = Column(Integer)  # Client-seitiges Rate-Limit (leer = unbegrenzt)
+    tokens_per_minute = Column(Integer)  # Geschätzte Tokens pro Minute (leer = unbegrenzt)
+    stream = Column(Boolean, default=True)  # Antworten streamen (nur OpenAI/Anthropic)
     active = Column(Boolean, default=True)  # Aktive Konfiguration
     date_created = Column(DateTime, default=datetime.utcnow)
+
+
+class ImportJob(db.Model):
+    """Ein Word-Import, der im Hintergrund läuft (Fortschritt wird von der Import-Seite abgefragt)"""
+    __tablename__ = 'import_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    filename = Column(String(255), nullable=False)  # Originaler Dateiname (Anzeige)
+    filepath = Column(String(1000))  # Hochgeladene Datei im Upload-Ordner, wird nach dem Import gelöscht
+    method = Column(String(20), default="classic")  # "classic" oder "llm"
+    llm_config_id = Column(Integer, ForeignKey('llm_configs.id'), nullable=True)
+    category = Column(String(100), default="Allgemein")
+    status = Column(String(20), default="queued")  # "queued", "running", "done", "failed"
+    chunks_total = Column(Integer, default=0)  # Abschnitte, die ans LLM gehen (klassisch: 1)
+    chunks_done = Column(Integer, default=0)
+    questions_found = Column(Integer, default=0)
+    questions_imported = Column(Integer, default=0)
+    questions_skipped = Column(Integer, default=0)  # Leere/ungültige Fragen
+    duplicate_mode = Column(String(10), default="skip")  # "skip", "flag" oder "import"
+    questions_duplicate = Column(Integer, default=0)  # Als Duplikat erkannt (übersprungen oder markiert)
+    markers = Column(Text)  # JSON: eigene Marker für den klassischen Import, z.B. {"question": ["Aufgabe"]}
+    error = Column(Text)
+    date_created = Column(DateTime, default=datetime.utcnow)
+    date_started = Column(DateTime)
+    date_finished = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_import_jobs_date_created', 'date_created'),
+    )
+    
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+
+class LLMCacheEntry(db.Model):
+    """Zwischengespeicherte LLM-Antwort (geparste Fragen) für einen Textabschnitt"""
+    __tablename__ = 'llm_cache'
+    
+    key = Column(String(64), primary_key=True)  # sha256 über Provider, Modell, Prompt-Template, Kategorie, Text
+    questions = Column(Text, nullable=False)  # JSON-Liste der extrahierten Fragen
+    size_bytes = Column(Integer, default=0)
+    hits = Column(Integer, default=0)
+    date_created = Column(DateTime, default=datetime.utcnow)
+    last_used = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_llm_cache_last_used', 'last_used'),
+    )
+
+
+def parse_tags(value):
+    """Tags aus Komma-String oder Liste - getrimmt, ohne Duplikate (case-insensitive)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    tags = []
+    seen = set()
+    for tag in value:
+        tag = str(tag).strip()[:100]
+        if tag and tag.lower() not in seen:
+            seen.add(tag.lower())
+            tags.append(tag)
+    return tags
+
+
+def format_tags(value):
+    """Tags als Komma-String für Question.tags"""
+    return ', '.join(parse_tags(value))
+
+
+def sync_question_tags(connection, question_id, tags, date_created):
+    """question_tags für eine Frage neu schreiben"""
+    connection.execute(delete(QuestionTag.__table__).where(QuestionTag.question_id == question_id))
+    tag_list = parse_tags(tags)
+    if tag_list:
+        connection.execute(
+            insert(QuestionTag.__table__),
+            [{'question_id': question_id, 'tag': tag, 'date_created': date_created} for tag in tag_list]
+        )
+
+
+_BLOCK_TAG_RE = re.compile(r'<\s*(br|/p|/div|/li|/h[1-6]|/tr|/td)\b[^>]*>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def strip_html(value):
+    """HTML zu reinem Text (für Volltextsuche und Vergleiche)"""
+    if not value:
+        return ''
+    value = _BLOCK_TAG_RE.sub(' ', value)
+    value = _TAG_RE.sub('', value)
+    return _WHITESPACE_RE.sub(' ', html.unescape(value)).strip()
+
+
+# FTS5-Tabelle (rowid = questions.id) - wird in migrations.py angelegt,
+# nicht über db.create_all(), da SQLAlchemy keine virtuellen Tabellen kennt
+QUESTIONS_FTS_TABLE = 'questions_fts'
+
+
+def sync_question_fts(connection, question_id, content, answer):
+    """Volltext-Eintrag einer Frage neu schreiben"""
+    connection.execute(text(f"DELETE FROM {QUESTIONS_FTS_TABLE} WHERE rowid = :id"), {'id': question_id})
+    connection.execute(
+        text(f"INSERT INTO {QUESTIONS_FTS_TABLE} (rowid, content, answer) VALUES (:id, :content, :answer)"),
+        {'id': question_id, 'content': strip_html(content), 'answer': strip_html(answer)}
+    )
+
+
+def question_fingerprint(content):
+    """Fingerabdruck (content_hash, minhash, buckets) einer Frage aus ihrem HTML"""
+    return fingerprint(strip_html(content))
+
+
+def sync_question_lsh(connection, question_id, buckets):
+    """LSH-Buckets einer Frage neu schreiben"""
+    connection.execute(delete(QuestionLSH.__table__).where(QuestionLSH.question_id == question_id))
+    if buckets:
+        connection.execute(
+            insert(QuestionLSH.__table__),
+            [{'bucket': bucket, 'question_id': question_id} for bucket in set(buckets)]
+        )
+
+
+def index_new_questions(connection, rows):
+    """
+    Tags, Volltextindex, LSH-Buckets und Facetten-Zähler für per Core-INSERT
+    angelegte Fragen nachziehen (Core umgeht die Mapper-Events). rows: Dicts mit id, content,
+    answer, tags, date_created und optional minhash.
+    """
+    tag_links = [
+        {'question_id': row['id'], 'tag': tag, 'date_created': row.get('date_created')}
+        for row in rows
+        for tag in parse_tags(row.get('tags'))
+    ]
+    if tag_links:
+        connection.execute(insert(QuestionTag.__table__), tag_links)
+    if rows:
+        connection.execute(
+            text(f"INSERT INTO {QUESTIONS_FTS_TABLE} (rowid, content, answer) VALUES (:id, :content, :answer)"),
+            [{'id': row['id'], 'content': strip_html(row['content']), 'answer': strip_html(row['answer'])} for row in rows]
+        )
+    lsh_links = [
+        {'bucket': bucket, 'question_id': row['id']}
+        for row in rows if row.get('minhash')
+        for bucket in set(lsh_buckets(unpack_signature(row['minhash'])))
+    ]
+    if lsh_links:
+        connection.execute(insert(QuestionLSH.__table__), lsh_links)
+    deltas = {}
+    for row in rows:
+        _add_facet_delta(deltas, _facet_keys(row.get('category'), row.get('difficulty'), row.get('active', True), row.get('tags')), questions=1)
+    update_question_facets(connection, deltas)
+
+
+def _facet_keys(category, difficulty, active, tags):
+    """Zeilen von question_facets, in denen eine Frage mitzählt"""
+    base = (category or '', difficulty or 0, bool(active))
+    return [('',) + base] + [(tag,) + base for tag in parse_tags(tags)]
+
+
+def _add_facet_delta(deltas, keys, questions=0, uses=0, used=0):
+    for key in keys:
+        counts = deltas.setdefault(key, [0, 0, 0])
+        counts[0] += questions
+        counts[1] += uses
+        counts[2] += used
+
+
+def update_question_facets(connection, deltas):
+    """
+    Zähler in question_facets verschieben (Upsert, eine Anweisung für alle Zeilen).
+    deltas: {(tag, category, difficulty, active): [questions, uses, used]}
+    """
+    params = [
+        {'tag': tag, 'category': category, 'difficulty': difficulty, 'active': active,
+         'questions': questions, 'uses': uses, 'used': used}
+        for (tag, category, difficulty, active), (questions, uses, used) in deltas.items()
+        if questions or uses or used
+    ]
+    if not params:
+        return
+    connection.execute(text(
+        "INSERT INTO question_facets (tag, category, difficulty, active, questions, uses, used) "
+        "VALUES (:tag, :category, :difficulty, :active, :questions, :uses, :used) "
+        "ON CONFLICT (tag, category, difficulty, active) DO UPDATE SET "
+        "questions = questions + excluded.questions, uses = uses + excluded.uses, used = used + excluded.used"
+    ), params)
+    if any(row['questions'] < 0 for row in params):
+        connection.execute(text("DELETE FROM question_facets WHERE questions <= 0"))
+
+
+def _question_facet_state(connection, question_id):
+    """(Facetten-Zeilen, Anzahl ExamItems) einer Frage, wie sie gerade in der Datenbank steht"""
+    row = connection.execute(
+        text("SELECT category, difficulty, active, tags FROM questions WHERE id = :id"), {'id': question_id}
+    ).first()
+    if row is None:
+        return [], 0
+    uses = connection.execute(
+        text("SELECT count(*) FROM exam_items WHERE original_question_id = :id"), {'id': question_id}
+    ).scalar()
+    return _facet_keys(*row), uses
+
+
+def rebuild_question_facets(connection):
+    """question_facets komplett aus questions, question_tags und exam_items neu berechnen"""
+    connection.execute(text("DELETE FROM question_facets"))
+    usage = (
+        "LEFT JOIN (SELECT original_question_id AS question_id, count(*) AS uses FROM exam_items "
+        "GROUP BY original_question_id) AS usage ON usage.question_id = q.id"
+    )
+    columns = (
+        "coalesce(q.category, ''), coalesce(q.difficulty, 0), coalesce(q.active, 0), "
+        "count(*), coalesce(sum(usage.uses), 0), count(usage.uses)"
+    )
+    connection.execute(text(
+        "INSERT INTO question_facets (tag, category, difficulty, active, questions, uses, used) "
+        f"SELECT '', {columns} FROM questions AS q {usage} GROUP BY 2, 3, 4"
+    ))
+    connection.execute(text(
+        "INSERT INTO question_facets (tag, category, difficulty, active, questions, uses, used) "
+        f"SELECT t.tag, {columns} FROM question_tags AS t JOIN questions AS q ON q.id = t.question_id {usage} "
+        "GROUP BY t.tag, 2, 3, 4"
+    ))
+
+
+def _set_fingerprint(target):
+    fp = question_fingerprint(target.content)
+    target.content_hash = fp.content_hash if fp else None
+    target.minhash = pack_signature(fp.minhash) if fp else None
+
+
+@event.listens_for(Question, 'before_insert')
+def _question_before_insert(mapper, connection, target):
+    _set_fingerprint(target)
+
+
+@event.listens_for(Question, 'before_update')
+def _question_before_update(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.content.history.has_changes():
+        _set_fingerprint(target)
+    if any(state.attrs[name].history.has_changes() for name in ('category', 'difficulty', 'active', 'tags')):
+        # Alter Stand aus der Datenbank - die History kennt ihn nicht immer (abgelaufene Attribute)
+        old_keys, uses = _question_facet_state(connection, target.id)
+        deltas = {}
+        _add_facet_delta(deltas, old_keys, -1, -uses, -(uses > 0))
+        _add_facet_delta(deltas, _facet_keys(target.category, target.difficulty, target.active, target.tags), 1, uses, uses > 0)
+        update_question_facets(connection, deltas)
+
+
+@event.listens_for(Question, 'before_delete')
+def _question_before_delete(mapper, connection, target):
+    keys, uses = _question_facet_state(connection, target.id)
+    deltas = {}
+    _add_facet_delta(deltas, keys, -1, -uses, -(uses > 0))
+    update_question_facets(connection, deltas)
+
+
+def _buckets_of(target):
+    signature = unpack_signature(target.minhash)
+    return lsh_buckets(signature) if signature else []
+
+
+@event.listens_for(Question, 'after_insert')
+def _question_after_insert(mapper, connection, target):
+    sync_question_tags(connection, target.id, target.tags, target.date_created)
+    sync_question_fts(connection, target.id, target.content, target.answer)
+    sync_question_lsh(connection, target.id, _buckets_of(target))
+    deltas = {}
+    _add_facet_delta(deltas, _facet_keys(target.category, target.difficulty, target.active, target.tags), questions=1)
+    update_question_facets(connection, deltas)
+
+
+@event.listens_for(Question, 'after_update')
+def _question_after_update(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.tags.history.has_changes():
+        sync_question_tags(connection, target.id, target.tags, target.date_created)
+    if state.attrs.content.history.has_changes() or state.attrs.answer.history.has_changes():
+        sync_question_fts(connection, target.id, target.content, target.answer)
+    if state.attrs.content.history.has_changes():
+        sync_question_lsh(connection, target.id, _buckets_of(target))
+
+
+@event.listens_for(Question, 'after_delete')
+def _question_after_delete(mapper, connection, target):
+    # SQLite erzwingt ON DELETE CASCADE nur mit PRAGMA foreign_keys
+    connection.execute(delete(QuestionTag.__table__).where(QuestionTag.question_id == target.id))
+    connection.execute(text(f"DELETE FROM {QUESTIONS_FTS_TABLE} WHERE rowid = :id"), {'id': target.id})
+    connection.execute(delete(QuestionLSH.__table__).where(QuestionLSH.question_id == target.id))
+    connection.execute(
+        update(Question.__table__).where(Question.duplicate_of_id == target.id).values(duplicate_of_id=None)
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _bump_exam_revisions(session, flush_context, instances):
+    """Exam.revision einmal pro Flush erhöhen, wenn sich die Prüfung oder eines ihrer Items ändert"""
+    exam_ids = set()
+    for obj in session.new:
+        if isinstance(obj, ExamItem) and obj.exam_id is not None:
+            exam_ids.add(obj.exam_id)
+        elif isinstance(obj, ExamItem) and obj.exam is not None and obj.exam.id is not None:
+            exam_ids.add(obj.exam.id)
+    for obj in session.deleted:
+        if isinstance(obj, ExamItem):
+            exam_ids.add(obj.exam_id)
+    for obj in session.dirty:
+        if isinstance(obj, ExamItem) and session.is_modified(obj):
+            exam_ids.add(obj.exam_id)
+            history = inspect(obj).attrs.exam_id.history
+            exam_ids.update(value for value in history.deleted if value is not None)
+        elif isinstance(obj, Exam) and session.is_modified(obj) and not inspect(obj).attrs.revision.history.has_changes():
+            exam_ids.add(obj.id)
+    
+    with session.no_autoflush:
+        for exam_id in exam_ids:
+            exam = session.get(Exam, exam_id)
+            if exam is not None and exam not in session.deleted:
+                exam.revision = Exam.revision + 1  # Als SQL-Ausdruck - sicher bei parallelen Änderungen
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_usage_changes(session, flush_context, instances):
+    """ExamItems merken, deren Fragen-Verweis sich ändert (ausgewertet in _update_usage_facets)"""
+    removed = []
+    changed = []
+    for obj in session.deleted:
+        if isinstance(obj, ExamItem) and obj.original_question_id is not None:
+            removed.append(obj.original_question_id)
+    for obj in session.dirty:
+        if isinstance(obj, ExamItem):
+            history = inspect(obj).attrs.original_question_id.history
+            if history.has_changes():
+                removed.extend(value for value in history.deleted if value is not None)
+                changed.append(obj)
+    session.info['usage_changes'] = (removed, changed + [obj for obj in session.new if isinstance(obj, ExamItem)])
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_usage_facets(session, flush_context):
+    """Verwendungszähler in question_facets für neue, gelöschte und umgehängte ExamItems nachführen"""
+    removed, added = session.info.pop('usage_changes', ((), ()))
+    changes = {}
+    for question_id in removed:
+        changes[question_id] = changes.get(question_id, 0) - 1
+    for obj in added:
+        if obj.original_question_id is not None:
+            changes[obj.original_question_id] = changes.get(obj.original_question_id, 0) + 1
+    changes = {question_id: change for question_id, change in changes.items() if change}
+    if not changes:
+        return
+    
+    # Stand nach dem Flush: eine Abfrage für Facetten-Werte und Verwendungen aller betroffenen Fragen
+    question_ids = list(changes)
+    uses_after = dict(session.execute(
+        db.select(ExamItem.original_question_id, db.func.count())
+        .where(ExamItem.original_question_id.in_(question_ids))
+        .group_by(ExamItem.original_question_id)
+    ).all())
+    rows = session.execute(
+        db.select(Question.id, Question.category, Question.difficulty, Question.active, Question.tags)
+        .where(Question.id.in_(question_ids))
+    ).all()
+    deltas = {}
+    for question_id, category, difficulty, active, tags in rows:
+        after = uses_after.get(question_id, 0)
+        before = after - changes[question_id]
+        _add_facet_delta(deltas, _facet_keys(category, difficulty, active, tags),
+                         uses=after - before, used=(after > 0) - (before > 0))
+    update_question_facets(session.connection(), deltas)
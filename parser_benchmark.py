@@ -0,0 +1,143 @@
+"""
+Klassischer Word-Import: Parser und Duplikaterkennung.
+
+- parser: QuestionParser (vorkompilierter Regex, Zustandsmaschine) gegen die
+  frühere Schleife mit lower().startswith/replace und '+= <br>' auf einem
+  synthetischen Dokument mit 20000 Absätzen (lange Lösungen über viele Absätze)
+- dedup:  import_from_word() eines .docx mit einem Anteil leicht abgewandelter
+  Wiederholungen je duplicate_mode (skip/flag/import), dazu die Duplikat-Gruppen
+  (content_hash + LSH-Buckets) über den importierten Bestand
+
+Läuft in einem temporären Datenordner - instance/ bleibt unberührt.
+
+    python parser_benchmark.py
+    python parser_benchmark.py --paragraphs 50000 --answer-lines 40
+    python parser_benchmark.py --method dedup --questions 10000 --near-duplicates 0.3
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+from import_benchmark import TOPICS, generate_docx, reset_pool, timed
+
+
+def generate_lines(paragraphs, answer_lines, seed=1):
+    """Absätze im Frage/Lösung-Format; jede Lösung über 1..answer_lines Absätze"""
+    rng = random.Random(seed)
+    lines = []
+    number = 0
+    while len(lines) < paragraphs:
+        number += 1
+        topic = rng.choice(TOPICS)
+        lines.append(f'Frage: Beschreiben Sie für {topic} die Arbeitsschritte {number}?')
+        lines.append(f'Lösung: Zuerst {topic} prüfen.')
+        for step in range(rng.randint(1, answer_lines)):
+            lines.append(f'Schritt {step}: {rng.choice(TOPICS)} mit {rng.randrange(10**6)} Einheiten bearbeiten.')
+        if number % 10 == 0:
+            lines.append('')
+    return lines[:paragraphs]
+
+
+def legacy_parse(lines, category='Allgemein'):
+    """Frühere Schleife aus import_from_word() - nur zum Vergleich"""
+    questions = []
+    current_question = None
+    current_answer = None
+    for text in lines:
+        text = text.strip()
+        if not text:
+            continue
+        if text.lower().startswith('frage:') or text.startswith('FRAGE:'):
+            if current_question and current_answer:
+                questions.append((current_question.strip(), current_answer.strip(), category))
+            current_question = text.replace('Frage:', '').replace('FRAGE:', '').replace('frage:', '').strip()
+            current_answer = None
+        elif text.lower().startswith('lösung:') or text.startswith('LÖSUNG:') or text.lower().startswith('loesung:'):
+            if current_question:
+                current_answer = text.replace('Lösung:', '').replace('LÖSUNG:', '').replace('lösung:', '').replace('Loesung:', '').strip()
+        elif current_question and not current_answer:
+            current_question += '<br>' + text
+        elif current_answer:
+            current_answer += '<br>' + text
+    if current_question and current_answer:
+        questions.append((current_question.strip(), current_answer.strip(), category))
+    return questions
+
+
+def run_parser(args):
+    from question_parser import QuestionParser
+
+    lines = generate_lines(args.paragraphs, args.answer_lines)
+    parser = QuestionParser()
+    results = []
+    for label, function in (('frühere Schleife', lambda: legacy_parse(lines)),
+                            ('QuestionParser', lambda: list(parser.parse(lines)))):
+        best = None
+        for _ in range(args.repeat):
+            questions, elapsed = timed(function)
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((label, len(questions), best))
+    legacy, current = results
+    if legacy[1] != current[1]:
+        print(f'Achtung: unterschiedlich viele Fragen ({legacy[1]} / {current[1]})')
+    return results
+
+
+def run_dedup(app_module, path, args):
+    from dedup import duplicate_clusters
+
+    results = []
+    for mode in args.duplicate_modes:
+        reset_pool(app_module)
+        stats = {}
+        count, elapsed = timed(lambda: app_module.import_from_word(
+            path, 'Benchmark', progress=lambda **values: stats.update(values), duplicate_mode=mode))
+        results.append((f'Import, duplicate_mode {mode} ({stats.get("questions_duplicate", 0)} Duplikate)', count, elapsed))
+    clusters, elapsed = timed(lambda: duplicate_clusters(app_module.db.session.connection(), limit=10**6))
+    questions = app_module.db.session.query(app_module.Question).count()
+    results.append((f'Duplikat-Gruppen ({len(clusters)} Gruppen)', questions, elapsed))
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Parser und Duplikaterkennung beim Word-Import')
+    parser.add_argument('--method', choices=['parser', 'dedup', 'all'], default='all')
+    parser.add_argument('--paragraphs', type=int, default=20000, help='Parser: Absätze im Dokument (Standard 20000)')
+    parser.add_argument('--answer-lines', type=int, default=20, help='Parser: höchstens so viele Absätze pro Lösung')
+    parser.add_argument('--repeat', type=int, default=3, help='Parser: Wiederholungen, gewertet wird die schnellste')
+    parser.add_argument('--questions', type=int, default=5000, help='Dedup: Fragen im erzeugten Dokument (Standard 5000)')
+    parser.add_argument('--near-duplicates', type=float, default=0.2, help='Dedup: Anteil abgewandelter Wiederholungen')
+    parser.add_argument('--duplicate-modes', nargs='+', choices=['skip', 'flag', 'import'], default=['skip', 'flag', 'import'])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    if args.method in ('parser', 'all'):
+        results += run_parser(args)
+    if args.method in ('dedup', 'all'):
+        workdir = tempfile.mkdtemp(prefix='hortiexam-bench-')
+        # Vor dem Import von app setzen - eigene, leere Datenbank
+        os.environ['HORTIEXAM_INSTANCE_DIR'] = os.path.join(workdir, 'instance')
+        try:
+            import app as app_module
+
+            path = os.path.join(workdir, 'fragen.docx')
+            generate_docx(path, args.questions, near_duplicates=args.near_duplicates)
+            with app_module.app.app_context():
+                results += run_dedup(app_module, path, args)
+                app_module.db.session.remove()
+                app_module.db.engine.dispose()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'Variante':<52}{'Fragen':>8}{'Sekunden':>10}{'Fragen/s':>10}")
+    for label, count, elapsed in results:
+        print(f"{label:<52}{count:>8}{elapsed:>10.3f}{count / elapsed if elapsed else 0:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
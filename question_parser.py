@@ -0,0 +1,180 @@
+"""
+Parser für den klassischen Word-Import (Frage/Lösung-Format).
+
+Jeder Absatz wird mit einem einzigen vorkompilierten Regex klassifiziert
+(Frage, Lösung, Kategorie, Tags, Schwierigkeit oder Fließtext) und von einer
+kleinen Zustandsmaschine verarbeitet. Die Zeilen einer Frage/Lösung werden in
+Listen gesammelt und erst am Ende mit '<br>' verbunden.
+
+Die Marker sind konfigurierbar. Ein Eintrag ist entweder ein Wort ("Frage",
+"Antwort"), das mit Doppelpunkt oder Nummer folgt ("Frage:", "Aufgabe 3:",
+"1. Frage:"), oder ein Nummerierungsmuster: "1." / "1)" steht für beliebige
+Zahlen, "a)" / "A." für Buchstaben - z.B. Fragen "1.", Lösungen "a)".
+
+Standard sind nur "Frage" und "Lösung"/"Loesung" wie beim bisherigen Import.
+Marker für Kategorie, Tags und Schwierigkeit gibt es nur, wenn sie beim Import
+angegeben werden (ImportJob.markers), und sie gelten nur im Frageteil - in
+einer Lösung bleibt z.B. "Bereich: Obstbau" normaler Text.
+"""
+import re
+from collections import namedtuple
+
+
+DEFAULT_MARKERS = {
+    'question': ['Frage'],
+    'answer': ['Lösung', 'Loesung'],
+    'category': [],
+    'tags': [],
+    'difficulty': [],
+}
+MARKER_KINDS = tuple(DEFAULT_MARKERS)
+
+DIFFICULTY_WORDS = {
+    'sehr leicht': 1, 'sehr einfach': 1,
+    'leicht': 2, 'einfach': 2,
+    'mittel': 3, 'normal': 3,
+    'schwer': 4, 'schwierig': 4,
+    'sehr schwer': 5, 'sehr schwierig': 5,
+}
+
+# Aufzählungszeichen/Nummer vor einem Marker-Wort: "1. Frage:", "• Lösung:"
+_PREFIX = r'(?:(?:\d+[a-z]?|[a-z])[.)]\s*|[•\-–*]\s*)?'
+# Nach dem Marker-Wort: Doppelpunkt oder Nummer mit Trennzeichen ("Aufgabe 3:", "Frage 2a)")
+_SUFFIX = r'(?:\s*:|\s+\d+[a-z]?\s*[:.)])'
+_NUMBERING_RE = re.compile(r'^(?:\d+|[a-zA-Z])[.)]$')
+
+ParsedQuestion = namedtuple('ParsedQuestion', 'content answer category tags difficulty')
+
+
+def parse_marker_list(value):
+    """Marker aus Komma-String oder Liste - getrimmt, ohne leere Einträge"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(marker).strip() for marker in value if str(marker).strip()]
+
+
+def _numbering_pattern(marker):
+    """"1." -> beliebige Zahl mit Punkt, "a)" -> Kleinbuchstabe mit Klammer"""
+    token, separator = marker[:-1], re.escape(marker[-1])
+    if token.isdigit():
+        return r'\d+' + separator
+    if token.islower():
+        return r'[a-z]' + separator
+    return r'[A-Z]' + separator
+
+
+def parse_difficulty(value):
+    """Schwierigkeit 1-5 aus Zahl ("4", "4/5") oder Wort ("schwer") - None, wenn unbekannt"""
+    value = value.strip().lower()
+    match = re.match(r'\d+', value)
+    if match:
+        return min(5, max(1, int(match.group())))
+    if value and set(value) <= {'★', '*', ' '}:
+        return min(5, max(1, value.count('★') + value.count('*')))
+    return DIFFICULTY_WORDS.get(value.rstrip('.'))
+
+
+class QuestionParser:
+    """Zustandsmaschine: außerhalb einer Frage -> in der Frage -> in der Lösung"""
+
+    def __init__(self, markers=None):
+        self.markers = {kind: list(words) for kind, words in DEFAULT_MARKERS.items()}
+        for kind, words in (markers or {}).items():
+            if kind in self.markers and parse_marker_list(words):
+                self.markers[kind] = parse_marker_list(words)
+        self._pattern = self._compile()
+
+    def _compile(self):
+        # Ein Regex für alle Marker: Wort-Marker teilen sich Präfix und Suffix, die
+        # Markerart steht im Gruppennamen (match.lastgroup)
+        words = []
+        numbering = []
+        for kind in MARKER_KINDS:
+            kind_words = [re.escape(m) for m in self.markers[kind] if not _NUMBERING_RE.match(m)]
+            kind_numbering = [_numbering_pattern(m) for m in self.markers[kind] if _NUMBERING_RE.match(m)]
+            if kind_words:
+                words.append(f'(?P<{kind}>' + '|'.join(kind_words) + ')')
+            if kind_numbering:
+                numbering.append(f'(?P<{kind}_nr>' + '|'.join(kind_numbering) + ')')
+        alternatives = []
+        if words:
+            alternatives.append(_PREFIX + '(?:' + '|'.join(words) + ')' + _SUFFIX)
+        if numbering:
+            alternatives.append('(?:' + '|'.join(numbering) + r')(?=\s)')
+        return re.compile(r'\s*(?:' + '|'.join(alternatives) + ')', re.IGNORECASE)
+
+    def classify(self, line):
+        """(Markerart oder None, Text ohne Marker)"""
+        match = self._pattern.match(line)
+        if match is None:
+            return None, line.strip()
+        kind = match.lastgroup
+        return kind[:-3] if kind.endswith('_nr') else kind, line[match.end():].strip()
+
+    def parse(self, lines, category='Allgemein'):
+        """Fragen aus Absätzen (Strings) als Generator von ParsedQuestion"""
+        match_marker = self._pattern.match
+        current_category = category or 'Allgemein'
+        question = answer = None  # Zeilen der offenen Frage/Lösung; question None = außerhalb
+        target = None  # Liste, an die Folgezeilen angehängt werden
+        meta = {}  # Kategorie/Tags/Schwierigkeit der offenen Frage
+
+        for line in lines:
+            match = match_marker(line)
+            if match is None:
+                if target is not None:
+                    line = line.strip()
+                    if line:
+                        target.append(line)
+                continue
+
+            kind = match.lastgroup
+            rest = line[match.end():].strip()
+            if kind.endswith('_nr'):
+                kind = kind[:-3]
+
+            if kind not in ('question', 'answer') and answer is not None:
+                # Metadaten nur im Frageteil - in der Lösung ist das normaler Text
+                line = line.strip()
+                if line:
+                    target.append(line)
+                continue
+
+            if kind == 'question':
+                if question is not None:
+                    yield self._finish(question, answer, meta)
+                question, answer = ([rest] if rest else []), None
+                meta = {'category': current_category}
+                target = question
+            elif kind == 'answer':
+                if question is None:
+                    continue  # Lösung ohne vorherige Frage
+                if answer is None:
+                    answer = target = []
+                if rest:
+                    answer.append(rest)
+            elif kind == 'category':
+                # Gilt für die offene und alle folgenden Fragen
+                current_category = rest[:100] or category or 'Allgemein'
+                if question is not None:
+                    meta['category'] = current_category
+            elif question is not None:
+                # Tags/Schwierigkeit gehören zur offenen Frage (direkt nach dem Frage-Marker)
+                value = rest if kind == 'tags' else parse_difficulty(rest)
+                if value:
+                    meta[kind] = value
+
+        if question is not None:
+            yield self._finish(question, answer, meta)
+
+    @staticmethod
+    def _finish(question, answer, meta):
+        return ParsedQuestion(
+            '<br>'.join(question),
+            '<br>'.join(answer or ()),
+            meta['category'],
+            meta.get('tags', ''),
+            meta.get('difficulty', 3)
+        )
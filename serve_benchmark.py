@@ -0,0 +1,210 @@
+"""
+Anfragen pro Sekunde: Entwicklungsserver (Werkzeug) gegen Produktivmodus (waitress).
+
+Startet app.py nacheinander mit --mode dev und --mode production und lässt
+mehrere Clients parallel (je eine Keep-Alive-Verbindung) die Routen abfragen:
+
+- questions: erste Seite von /questions
+- pages:     /questions seitenweise über X-Next-Cursor (Keyset-Pagination)
+- items:     /exam/<id>/items
+
+    python serve_benchmark.py
+    python serve_benchmark.py --clients 16 --seconds 10 --no-cache
+    python serve_benchmark.py --modes production --exam 3
+
+Die App läuft dabei gegen die normale Datenbank unter instance/ (bzw.
+HORTIEXAM_INSTANCE_DIR). --no-cache schaltet den JSON-Cache der App ab
+(HORTIEXAM_RESPONSE_CACHE_MB=0), dann liest jede Anfrage die Datenbank.
+"""
+import argparse
+import http.client
+import os
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from startup_benchmark import APP_DIR, free_port
+
+
+ROUTES = ('questions', 'pages', 'items')
+
+
+def instance_dir():
+    return os.environ.get('HORTIEXAM_INSTANCE_DIR') or os.path.join(APP_DIR, 'instance')
+
+
+def default_exam_id():
+    """Prüfung mit den meisten Items aus der Datenbank"""
+    path = os.path.join(instance_dir(), 'hortiexam.db')
+    if not os.path.exists(path):
+        return None
+    with sqlite3.connect(f'file:{path}?mode=ro', uri=True) as connection:
+        row = connection.execute(
+            "SELECT exam_id FROM exam_items GROUP BY exam_id ORDER BY count(*) DESC LIMIT 1"
+        ).fetchone()
+    return row[0] if row else None
+
+
+def start_server(mode, port, threads, no_cache):
+    env = dict(os.environ)
+    if no_cache:
+        env['HORTIEXAM_RESPONSE_CACHE_MB'] = '0'
+    command = [sys.executable, os.path.join(APP_DIR, 'app.py'), '--mode', mode,
+               '--host', '127.0.0.1', '--port', str(port), '--threads', str(threads)]
+    # Eigene Prozessgruppe: der Reloader im Entwicklungsmodus startet einen Kindprozess
+    if os.name == 'nt':
+        return subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+    return subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+
+
+def stop_server(process):
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+    else:
+        os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        if os.name != 'nt':
+            os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def wait_until_ready(port, timeout=60):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/questions?limit=1')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f'Server auf Port {port} antwortet nicht')
+
+
+class RouteClient:
+    """Eine Keep-Alive-Verbindung, liefert pro Aufruf von request() eine Anfrage der Route"""
+
+    def __init__(self, port, route, exam_id, page_size):
+        self.port = port
+        self.route = route
+        self.exam_id = exam_id
+        self.page_size = page_size
+        self.cursor = None
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def next_url(self):
+        if self.route == 'items':
+            return f'/exam/{self.exam_id}/items'
+        url = f'/questions?limit={self.page_size}&fields=id,content,category'
+        if self.route == 'pages' and self.cursor:
+            url += f'&cursor={self.cursor}'
+        return url
+
+    def request(self):
+        url = self.next_url()
+        try:
+            self.connection.request('GET', url, headers={'Accept-Encoding': 'gzip'})
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Werkzeug schließt Verbindungen teils - neu verbinden und als Fehler zählen
+            self.connection.close()
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            return False
+        if self.route == 'pages':
+            self.cursor = response.getheader('X-Next-Cursor')  # nach der letzten Seite von vorn
+        return response.status == 200
+
+
+def run_load(port, route, exam_id, clients, seconds, page_size):
+    """(Anfragen pro Sekunde, Median-Latenz ms, p95-Latenz ms, Fehler)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        client = RouteClient(port, route, exam_id, page_size)
+        own = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if client.request():
+                own.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        client.connection.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors[0]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000, errors[0]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Anfragen pro Sekunde: Entwicklungsserver gegen waitress')
+    parser.add_argument('--modes', nargs='+', choices=['dev', 'production'], default=['dev', 'production'])
+    parser.add_argument('--routes', nargs='+', choices=ROUTES, default=list(ROUTES))
+    parser.add_argument('--clients', type=int, default=8, help='Parallele Clients (Standard 8)')
+    parser.add_argument('--seconds', type=float, default=5, help='Dauer pro Route (Standard 5)')
+    parser.add_argument('--threads', type=int, default=16, help='waitress-Threads (Standard 16)')
+    parser.add_argument('--page-size', type=int, default=50, help='limit für /questions (Standard 50)')
+    parser.add_argument('--exam', type=int, help='Prüfung für /exam/<id>/items (Standard: die mit den meisten Items)')
+    parser.add_argument('--no-cache', action='store_true', help='JSON-Cache der App abschalten')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    exam_id = args.exam or default_exam_id()
+    routes = [route for route in args.routes if route != 'items' or exam_id]
+    if len(routes) < len(args.routes):
+        print('Keine Prüfung mit Items gefunden - /exam/<id>/items wird übersprungen')
+
+    results = {}
+    for mode in args.modes:
+        port = free_port()
+        process = start_server(mode, port, args.threads, args.no_cache)
+        try:
+            wait_until_ready(port)
+            for route in routes:
+                results[mode, route] = run_load(port, route, exam_id, args.clients, args.seconds, args.page_size)
+        finally:
+            stop_server(process)
+
+    print(f"\n{args.clients} Clients, {args.seconds:g} s pro Route, Cache {'aus' if args.no_cache else 'an'}"
+          + (f", Prüfung {exam_id}" if 'items' in routes else ''))
+    print(f"{'Modus':<12}{'Route':<12}{'Anfr./s':>10}{'Median ms':>12}{'p95 ms':>10}{'Fehler':>8}")
+    for (mode, route), (rate, median, p95, errors) in results.items():
+        print(f"{mode:<12}{route:<12}{rate:>10.0f}{median:>12.1f}{p95:>10.1f}{errors:>8}")
+    if len(args.modes) == 2:
+        for route in routes:
+            dev, production = results['dev', route][0], results['production', route][0]
+            if dev:
+                print(f"{route}: waitress {production / dev:.1f}x so viele Anfragen pro Sekunde")
+
+
+if __name__ == '__main__':
+    main()
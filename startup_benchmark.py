@@ -0,0 +1,131 @@
+"""
+Startzeit von HortiExam messen.
+
+- Zeit vom Prozessstart bis zur ersten erfolgreichen HTTP-Antwort (Median aus
+  mehreren Läufen), für app.py oder eine gebaute .exe
+- Import-Zeiten aus python -X importtime: direkte Importe von app.py und die
+  Module mit der meisten eigenen Importzeit
+
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 10 --path /questions/facets
+    python startup_benchmark.py --exe dist/HortiExam/HortiExam.exe --no-importtime
+
+Die App läuft dabei gegen die normale Datenbank unter instance/.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.error import URLError
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(command, path, timeout):
+    """Sekunden vom Start des Prozesses bis zur ersten Antwort mit Status 200"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command + ['--mode', 'production', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f'http://127.0.0.1:{port}{path}'
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'Prozess beendet mit Code {process.returncode}')
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f'Keine Antwort nach {timeout} s')
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def parse_importtime(stderr):
+    """Zeilen von -X importtime als [(Tiefe, Modul, eigene µs, kumuliert µs)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_breakdown(top):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import app fehlgeschlagen')
+    rows = parse_importtime(result.stderr)
+    app_row = next((row for row in rows if row[1] == 'app'), None)
+    if app_row is None:
+        raise RuntimeError('app nicht in der importtime-Ausgabe')
+
+    # Direkte Importe von app.py: Tiefe 1 zwischen dem vorigen Top-Level-Modul und app
+    app_index = rows.index(app_row)
+    start = max((i for i, row in enumerate(rows[:app_index]) if row[0] == 0), default=-1) + 1
+    direct = [row for row in rows[start:app_index] if row[0] == 1]
+
+    print(f"\nimport app: {app_row[3] / 1000:.1f} ms gesamt, davon {app_row[2] / 1000:.1f} ms in app.py selbst "
+          f"(Modulcode inkl. Datenbank-Start)")
+    print(f"\nDirekte Importe von app.py (kumuliert, Top {top}):")
+    for _, name, _, cumulative in sorted(direct, key=lambda row: -row[3])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"\nEigene Importzeit je Modul (Top {top}):")
+    for _, name, self_us, _ in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Startzeit von HortiExam messen')
+    parser.add_argument('--exe', help='Gebaute .exe statt app.py starten')
+    parser.add_argument('--runs', type=int, default=5, help='Anzahl Starts (Standard 5)')
+    parser.add_argument('--path', default='/', help='Abgefragte URL (Standard /)')
+    parser.add_argument('--timeout', type=float, default=120, help='Sekunden bis zum Abbruch eines Starts')
+    parser.add_argument('--top', type=int, default=15, help='Anzahl Module in der Import-Übersicht')
+    parser.add_argument('--no-importtime', action='store_true', help='Import-Zeiten nicht messen')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(APP_DIR, 'app.py')]
+
+    print(f"Start bis zur ersten Antwort auf {args.path} ({args.runs} Läufe): {' '.join(command)}")
+    times = []
+    for run in range(1, args.runs + 1):
+        elapsed = time_to_first_response(command, args.path, args.timeout)
+        times.append(elapsed)
+        print(f"  Lauf {run}: {elapsed * 1000:.0f} ms")
+    print(f"  Median {statistics.median(times) * 1000:.0f} ms, Minimum {min(times) * 1000:.0f} ms, Maximum {max(times) * 1000:.0f} ms")
+
+    if not args.no_importtime:
+        import_breakdown(args.top)
+
+
+if __name__ == '__main__':
+    main()
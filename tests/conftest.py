@@ -0,0 +1,38 @@
+"""
+Gemeinsame Fixtures. Die App läuft gegen einen temporären Datenordner
+(HORTIEXAM_INSTANCE_DIR) - nie gegen instance/.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Vor dem ersten "import app" setzen - app.py liest die Umgebung beim Import
+INSTANCE_DIR = tempfile.mkdtemp(prefix='hortiexam-test-')
+os.environ['HORTIEXAM_INSTANCE_DIR'] = INSTANCE_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(INSTANCE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app as app_module
+    return app_module
+
+
+@pytest.fixture(scope='session')
+def flask_app(app_module):
+    return app_module.app
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
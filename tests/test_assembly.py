@@ -0,0 +1,82 @@
+"""Automatische Zusammenstellung (assembly): Buckets und Vorgaben"""
+import random
+from collections import Counter
+
+from assembly import BucketPool, difficulty_level, parse_spec, solve, unmet_constraints
+
+
+def add_questions(app_module, rows):
+    """rows: (Kategorie, Schwierigkeit, Tags) - liefert die IDs"""
+    questions = [
+        app_module.Question(content=f'Zusammenstellung {number} {category}', answer='A',
+                            category=category, difficulty=difficulty, tags=tags)
+        for number, (category, difficulty, tags) in enumerate(rows)
+    ]
+    app_module.db.session.add_all(questions)
+    app_module.db.session.commit()
+    return [question.id for question in questions]
+
+
+def expected_buckets(app_module, spec, exclude_ids):
+    """Buckets wie früher per Durchlauf über alle Fragen - zum Vergleich mit BucketPool"""
+    Question, QuestionTag = app_module.Question, app_module.QuestionTag
+    session = app_module.db.session
+    tagged = {}
+    for question_id, tag in session.query(QuestionTag.question_id, QuestionTag.tag).filter(QuestionTag.tag.in_(list(spec.tags))):
+        tagged.setdefault(question_id, set()).add(tag.lower())
+    buckets = {}
+    for question_id, category, difficulty in (
+        session.query(Question.id, Question.category, Question.difficulty)
+        .filter(Question.active == True, Question.duplicate_of_id.is_(None))
+    ):
+        if question_id not in exclude_ids:
+            key = (category or '', difficulty_level(difficulty), tuple(sorted(tagged.get(question_id, ()))))
+            buckets.setdefault(key, set()).add(question_id)
+    return buckets
+
+
+def test_bucket_pool_matches_full_scan(app_module):
+    with app_module.app.app_context():
+        ids = add_questions(app_module, [
+            (None, 2, ''), ('', 2, 'Boden'), ('Obstbau', None, 'Boden, Schnitt'), ('Obstbau', 7, ''),
+            ('Obstbau', 3, 'schnitt'), ('GaLaBau', 1, ''), ('GaLaBau', 0, 'Rasen'),
+        ])
+        session = app_module.db.session
+        session.get(app_module.Question, ids[5]).duplicate_of_id = ids[6]
+        session.get(app_module.Question, ids[0]).active = False
+        session.commit()
+
+        spec = parse_spec({'count': 5, 'tags': {'Boden': 1, 'schnitt': 1}})
+        exclude_ids = {ids[3], ids[4]}
+        pool = BucketPool(spec, exclude_ids)
+        expected = expected_buckets(app_module, spec, exclude_ids)
+        assert pool.counts == Counter({key: len(members) for key, members in expected.items()})
+
+        rng = random.Random(1)
+        for key, members in expected.items():
+            drawn = pool.draw(key, len(members) + 1, rng)
+            assert sorted(drawn) == sorted(members), key
+
+
+def test_category_quota_for_questions_without_category(app_module):
+    with app_module.app.app_context():
+        without_category = set(add_questions(app_module, [(None, 4, '')] * 3))
+        spec = parse_spec({'count': 3, 'categories': {'': 3}, 'difficulty': {'4': 1}, 'seed': 1})
+        pool = BucketPool(spec, ())
+        assert pool.counts[('', 4, ())] >= 3
+        selected, state = solve(pool.counts, spec)
+        assert selected[('', 4, ())] == 3
+        assert unmet_constraints(spec, state, 3) == []
+
+
+def test_assemble_endpoint_dry_run(app_module, client):
+    with app_module.app.app_context():
+        ids = set(add_questions(app_module, [('Friedhofsgärtnerei', 5, 'Grabpflege')] * 4))
+    exam_id = client.post('/exam/new', json={'title': 'Zusammenstellung'}).get_json()['id']
+    response = client.post(f'/exam/{exam_id}/assemble', json={
+        'count': 4, 'categories': {'Friedhofsgärtnerei': 4}, 'tags': {'Grabpflege': 4}, 'seed': 2, 'dry_run': True,
+    })
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert set(data['question_ids']) == ids and data['unmet'] == []
+    assert data['report']['categories'] == {'Friedhofsgärtnerei': 4}
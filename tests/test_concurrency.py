@@ -0,0 +1,146 @@
+"""
+Parallele Leser und Schreiber gegen eine SQLite-Datei, WAL- gegen safe-Profil.
+
+Leser fragen /questions, /questions/facets und /exam/<id>/items ab, während
+ein Import-Thread Fragen batchweise schreibt und ein zweiter Schreiber Fragen
+zu Prüfungen hinzufügt. Dieselbe Last läuft je Profil in einem eigenen Prozess
+mit eigener Datenbank (HORTIEXAM_SQLITE_PROFILE wird beim Import von app
+gelesen). Gezählt werden Fehler mit "database is locked" - im WAL-Profil
+keine und nicht mehr als im safe-Profil.
+
+Einzeln: python tests/test_concurrency.py (Profil über HORTIEXAM_SQLITE_PROFILE)
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+
+
+READERS = 6
+DURATION_SECONDS = 3
+READ_URLS = ['/questions', '/questions?difficulty=3', '/questions/facets', '/exam/{exam_id}/items']
+LOCKED = 'database is locked'
+
+
+def test_wal_profile_active(app_module):
+    with app_module.app.app_context():
+        assert app_module.db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert app_module.db.session.execute(text('PRAGMA busy_timeout')).scalar() == 10000
+
+
+def run_load(app_module, duration=DURATION_SECONDS):
+    """Lesen und Schreiben parallel - Zähler und Fehlermeldungen als dict"""
+    app = app_module.app
+    client = app.test_client()
+    exam_id = client.post('/exam/new', json={'title': 'Lasttest'}).get_json()['id']
+
+    stop = threading.Event()
+    errors = []
+    counts = {'reads': 0, 'writes': 0, 'imported': 0}
+    counts_lock = threading.Lock()
+
+    def record(kind, response):
+        body = response.get_data(as_text=True)
+        if response.status_code >= 400 or LOCKED in body:
+            errors.append(f'{kind} {response.status_code}: {body[:200]}')
+        with counts_lock:
+            counts[kind] += 1
+
+    def reader(offset):
+        reader_client = app.test_client()
+        index = offset
+        while not stop.is_set():
+            url = READ_URLS[index % len(READ_URLS)].format(exam_id=exam_id)
+            # Cache umgehen: jede Anfrage soll die Datenbank lesen
+            app_module.response_cache.clear()
+            record('reads', reader_client.get(url))
+            index += 1
+
+    def importer():
+        with app.app_context():
+            bulk = app_module.BulkImporter(batch_size=50, duplicate_mode='import')
+            number = 0
+            while not stop.is_set():
+                try:
+                    for _ in range(50):
+                        number += 1
+                        bulk.add(f'Lasttest-Frage {number}: Welche Bodenart liegt vor?', f'Antwort {number}',
+                                 category='Lasttest', tags='Boden, Last', difficulty=number % 5 + 1)
+                    with counts_lock:
+                        counts['imported'] = bulk.inserted
+                except Exception as e:
+                    errors.append(f'import: {e}')
+                    app_module.db.session.rollback()
+            try:
+                bulk.flush()
+            except Exception as e:
+                errors.append(f'import: {e}')
+
+    def item_writer():
+        writer_client = app.test_client()
+        added = set()
+        while not stop.is_set():
+            with app.app_context():
+                row = app_module.db.session.execute(text(
+                    "SELECT id FROM questions WHERE category = 'Lasttest' ORDER BY id DESC LIMIT 1"
+                )).first()
+                app_module.db.session.remove()
+            if row is None or row[0] in added:
+                time.sleep(0.01)
+                continue
+            added.add(row[0])
+            record('writes', writer_client.post(f'/exam/{exam_id}/add_question', json={'question_id': row[0]}))
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    threads += [threading.Thread(target=importer), threading.Thread(target=item_writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(60)
+
+    counts['locked'] = sum(LOCKED in error for error in errors)
+    counts['errors'] = errors
+    return counts
+
+
+def run_profile(profile):
+    """run_load() in einem eigenen Prozess mit frischer Datenbank und Pragma-Profil"""
+    with tempfile.TemporaryDirectory(prefix=f'hortiexam-{profile}-') as directory:
+        env = dict(os.environ, HORTIEXAM_SQLITE_PROFILE=profile, HORTIEXAM_INSTANCE_DIR=directory)
+        result = subprocess.run([sys.executable, os.path.abspath(__file__)], env=env,
+                                capture_output=True, text=True, timeout=180)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_wal_has_no_more_lock_errors_than_safe():
+    results = {profile: run_profile(profile) for profile in ('safe', 'wal')}
+    summary = ', '.join(
+        f"{profile}: {counts['locked']} gesperrt, {counts['reads']} Lesezugriffe, "
+        f"{counts['writes']} Items, {counts['imported']} importiert"
+        for profile, counts in results.items()
+    )
+    print(f'\n"{LOCKED}" - {summary}')
+
+    wal, safe = results['wal'], results['safe']
+    assert wal['locked'] <= safe['locked'], summary
+    assert not wal['errors'], '\n'.join(wal['errors'][:10])
+    for profile, counts in results.items():
+        # Andere Fehler als Sperren gibt es in keinem Profil
+        other = [error for error in counts['errors'] if LOCKED not in error]
+        assert not other, f'{profile}:\n' + '\n'.join(other[:10])
+        assert counts['reads'] > READERS and counts['imported'] > 0 and counts['writes'] > 0, summary
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import app as app_module
+
+    print(json.dumps(run_load(app_module), ensure_ascii=False))
@@ -0,0 +1,47 @@
+"""Duplikat-Gruppen über content_hash und LSH-Buckets (dedup.duplicate_clusters)"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from dedup import duplicate_clusters
+from migrations import run_migrations
+from models import db, Question
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    return Session(engine)
+
+
+def add_questions(session, contents):
+    questions = [Question(content=content, answer='Antwort') for content in contents]
+    session.add_all(questions)
+    session.commit()
+    return [question.id for question in questions]
+
+
+def test_exact_and_near_duplicates_are_grouped(tmp_path):
+    session = make_session(tmp_path)
+    base = 'Nennen Sie die wichtigsten Maßnahmen zur Pflege eines Zierrasens im Frühjahr nach dem Winter'
+    ids = add_questions(session, [
+        base,
+        '  ' + base.replace(' ', '  ') + '?',  # exakt gleich nach Normalisierung
+        base + ' im Hausgarten',  # fast gleich
+        'Erklären Sie den Unterschied zwischen Sand-, Schluff- und Tonböden anhand der Korngröße',
+    ])
+    clusters = duplicate_clusters(session.connection())
+    assert clusters == [ids[:3]]
+
+
+def test_large_bucket_forms_one_group(tmp_path):
+    session = make_session(tmp_path)
+    base = ('Beschreiben Sie ausführlich die Vermehrung von Gehölzen durch Steckhölzer im Winter, '
+            'nennen Sie geeignete Arten, den richtigen Zeitpunkt für den Schnitt, die Lagerung bis zum '
+            'Frühjahr und die Vorteile gegenüber der Vermehrung durch Aussaat')
+    ids = add_questions(session, [f'{base} Variante {number}' for number in range(150)])
+    unrelated = add_questions(session, ['Welche Nährstoffe braucht Tomate im Gewächshaus während der Fruchtbildung'])
+    clusters = duplicate_clusters(session.connection())
+    assert len(clusters) == 1
+    assert set(clusters[0]) == set(ids)
+    assert unrelated[0] not in clusters[0]
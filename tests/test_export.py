@@ -0,0 +1,36 @@
+"""Sammel-Export über den Prozess-Pool (exporter.RenderPool)"""
+from datetime import datetime
+from io import BytesIO
+
+from exporter import RenderPool, load_template
+
+
+def test_render_pool_uses_spawn_workers():
+    template = load_template()
+    items = [(2, '<p>Was ist <b>Humus</b>?</p>', '<p>Organische Substanz</p>')]
+    tasks = [(part, ('Abschlussprüfung', datetime(2026, 6, 1), items, template, part)) for part in ('questions', 'solutions')]
+    pool = RenderPool(2)
+    try:
+        results = {key: (data, error) for key, data, error in pool.render_unordered(tasks)}
+        assert pool.executor._mp_context.get_start_method() == 'spawn'
+    finally:
+        pool.shutdown()
+
+    from docx import Document
+    assert set(results) == {'questions', 'solutions'}
+    assert all(error is None for _, error in results.values())
+    texts = {key: '\n'.join(paragraph.text for paragraph in Document(BytesIO(data)).paragraphs)
+             for key, (data, _) in results.items()}
+    assert 'Humus' in texts['questions'] and 'Organische Substanz' not in texts['questions']
+    assert 'Organische Substanz' in texts['solutions']
+
+
+def test_load_template_without_spec_origin(monkeypatch):
+    """In der .exe liefert find_spec('docx') kein origin - dann über docx.__file__"""
+    import importlib.machinery
+    import exporter
+
+    expected = load_template()
+    monkeypatch.setattr(exporter.importlib.util, 'find_spec',
+                        lambda name: importlib.machinery.ModuleSpec(name, None, origin=None))
+    assert exporter.load_template() == expected
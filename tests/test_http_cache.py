@@ -0,0 +1,23 @@
+"""JSON-Cache der Lese-Routen (http_cache.ResponseCache)"""
+
+
+def test_missing_exam_items_is_not_found(app_module, client):
+    with app_module.app.app_context():
+        missing = (app_module.db.session.query(app_module.db.func.max(app_module.Exam.id)).scalar() or 0) + 1000
+    for _ in range(2):
+        response = client.get(f'/exam/{missing}/items')
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'Prüfung nicht gefunden'}
+        assert 'ETag' not in response.headers  # Fehler werden nicht gecacht
+
+
+def test_exam_items_revalidate_with_etag(app_module, client):
+    with app_module.app.app_context():
+        exam = app_module.Exam(title='Cache-Test')
+        app_module.db.session.add(exam)
+        app_module.db.session.commit()
+        exam_id = exam.id
+    first = client.get(f'/exam/{exam_id}/items')
+    assert first.status_code == 200 and first.get_json() == []
+    second = client.get(f'/exam/{exam_id}/items', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
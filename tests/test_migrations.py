@@ -0,0 +1,123 @@
+"""
+Migrationen auf einer Datenbank im Stand der ersten Version (user_version 0).
+
+Wie beim Start der App: erst db.create_all() (legt nur fehlende Tabellen an),
+dann run_migrations() bis zur aktuellen Version.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from migrations import SCHEMA_VERSION, run_migrations, schema_is_current
+from models import db, QUESTIONS_FTS_TABLE
+
+
+# Schema der ersten Version, wie db.create_all() es damals angelegt hat
+BASELINE_SCHEMA = """
+CREATE TABLE exams (
+    id INTEGER NOT NULL, title VARCHAR(200) NOT NULL, date_created DATETIME, status VARCHAR(50),
+    PRIMARY KEY (id)
+);
+CREATE TABLE llm_configs (
+    id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, api_url VARCHAR(500) NOT NULL, api_key VARCHAR(500),
+    model VARCHAR(100), provider VARCHAR(50), headers TEXT, prompt_template TEXT, active BOOLEAN,
+    date_created DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE questions (
+    id INTEGER NOT NULL, content TEXT NOT NULL, answer TEXT NOT NULL, category VARCHAR(100),
+    tags VARCHAR(500), difficulty INTEGER, active BOOLEAN, date_created DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE exam_items (
+    id INTEGER NOT NULL, exam_id INTEGER NOT NULL, original_question_id INTEGER,
+    snapshot_content TEXT NOT NULL, snapshot_answer TEXT NOT NULL, points INTEGER, position INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(exam_id) REFERENCES exams (id),
+    FOREIGN KEY(original_question_id) REFERENCES questions (id)
+);
+INSERT INTO questions VALUES
+    (1, '<p>Was ist Humus?</p>', 'Organische Substanz', 'Bodenkunde', 'Boden, Botanik', 2, 1, '2024-01-01 10:00:00'),
+    (2, 'Nennen Sie drei Rasengräser.', 'Weidelgras, Rotschwingel, Rispe', 'GaLaBau', 'Rasen', 3, 1, '2024-01-02 10:00:00'),
+    (3, 'Nennen Sie drei Rasengräser!', 'Weidelgras, Rotschwingel, Rispe', 'GaLaBau', '', 3, 0, '2024-01-03 10:00:00');
+INSERT INTO exams VALUES (1, 'Abschlussprüfung', '2024-02-01 08:00:00', 'Draft');
+INSERT INTO exam_items VALUES (1, 1, 1, 'Was ist Humus?', 'Organische Substanz', 2, 0);
+INSERT INTO llm_configs VALUES (1, 'Lokal', 'http://localhost:1234', NULL, 'm', 'openai', NULL, NULL, 1, '2024-01-01 00:00:00');
+"""
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    path = tmp_path / 'baseline.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(BASELINE_SCHEMA)
+    engine = create_engine(f'sqlite:///{path}')
+    yield engine
+    engine.dispose()
+
+
+def upgrade(engine):
+    """Ablauf beim Start der App (app.py)"""
+    if not schema_is_current(engine):
+        db.metadata.create_all(engine)
+        run_migrations(engine)
+
+
+def test_baseline_database_upgrades_to_current_version(baseline_engine):
+    upgrade(baseline_engine)
+
+    assert schema_is_current(baseline_engine)
+    inspector = inspect(baseline_engine)
+    assert set(db.metadata.tables) <= set(inspector.get_table_names())
+    # Jede Spalte und jeder Index der Models existiert auch in der migrierten Datenbank
+    for table in db.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        assert {column.name for column in table.columns} <= columns, table.name
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text('PRAGMA user_version')).scalar() == SCHEMA_VERSION
+        tags = connection.execute(text(
+            "SELECT question_id, tag, date_created FROM question_tags ORDER BY question_id, tag"
+        )).fetchall()
+        assert [(row[0], row[1]) for row in tags] == [(1, 'Boden'), (1, 'Botanik'), (2, 'Rasen')]
+        assert all(row[2] is not None for row in tags)
+        assert connection.execute(text(
+            f"SELECT rowid FROM {QUESTIONS_FTS_TABLE} WHERE {QUESTIONS_FTS_TABLE} MATCH 'humus'"
+        )).scalars().all() == [1]
+        hashes = connection.execute(text("SELECT content_hash FROM questions ORDER BY id")).scalars().all()
+        assert all(hashes) and hashes[1] == hashes[2]  # nur Satzzeichen verschieden
+        assert connection.execute(text(
+            "SELECT sum(questions), sum(uses) FROM question_facets WHERE tag = ''"
+        )).one() == (3, 1)
+        assert connection.execute(text("SELECT revision FROM exams")).scalar() == 0
+
+
+def test_migrations_run_once(baseline_engine):
+    upgrade(baseline_engine)
+    assert run_migrations(baseline_engine) == []
+
+
+def test_missing_job_and_cache_tables_are_created(baseline_engine):
+    """Datenbank mit Schemaversion 13, in der create_all() import_jobs/llm_cache nie angelegt hat"""
+    upgrade(baseline_engine)
+    with baseline_engine.begin() as connection:
+        connection.execute(text('DROP TABLE import_jobs'))
+        connection.execute(text('DROP TABLE llm_cache'))
+        connection.execute(text('PRAGMA user_version = 13'))
+
+    assert run_migrations(baseline_engine)[0] == 'Import-Jobs und LLM-Cache'
+    inspector = inspect(baseline_engine)
+    assert {'import_jobs', 'llm_cache'} <= set(inspector.get_table_names())
+    assert 'ix_import_jobs_date_created' in {index['name'] for index in inspector.get_indexes('import_jobs')}
+    assert 'ix_llm_cache_last_used' in {index['name'] for index in inspector.get_indexes('llm_cache')}
+
+
+def test_new_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'neu.db'}")
+    upgrade(engine)
+    assert schema_is_current(engine)
+    assert set(db.metadata.tables) <= set(inspect(engine).get_table_names())
+    engine.dispose()
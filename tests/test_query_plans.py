@@ -0,0 +1,195 @@
+"""
+EXPLAIN QUERY PLAN für die häufigen Abfragen auf einer großen Datenbank.
+
+Die Routen laufen über den Test-Client, alle dabei ausgeführten SELECTs
+werden mitgeschnitten und mit ihren Parametern erklärt. Ein Test schlägt fehl,
+wenn eine Tabelle ohne Index durchsucht wird, nach dem Lesen per Temp-B-Tree
+sortiert wird oder der vorgesehene Index nicht im Plan auftaucht.
+
+Größe über HORTIEXAM_PLAN_TEST_QUESTIONS (Standard 100000).
+"""
+import os
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from models import rebuild_question_facets
+
+
+QUESTION_COUNT = int(os.environ.get('HORTIEXAM_PLAN_TEST_QUESTIONS', 100000))
+CATEGORIES = ['GaLaBau', 'Zierpflanzen', 'Gemüsebau', 'Obstbau', 'Baumschule', 'Staudengärtnerei', 'Friedhof', 'Allgemein']
+TAGS = [f'Tag{i}' for i in range(40)]
+EXAM_COUNT = 50
+ITEMS_PER_EXAM = 30
+
+FULL_SCAN_RE = re.compile(r'^SCAN (questions|question_tags|exam_items|exams)$')
+
+
+@pytest.fixture(scope='module')
+def seeded_exam_ids(app_module):
+    """Fragen, Tags, Prüfungen und Items per executemany anlegen, danach ANALYZE - liefert die Prüfungs-IDs"""
+    db = app_module.db
+    rng = random.Random(4)
+    start = datetime(2020, 1, 1)
+    # Hinter bereits vorhandenen Zeilen anderer Tests anlegen
+    with app_module.app.app_context():
+        first_question, first_exam = db.session.execute(text(
+            "SELECT (SELECT coalesce(max(id), 0) FROM questions) + 1, (SELECT coalesce(max(id), 0) FROM exams) + 1"
+        )).one()
+        db.session.remove()
+    question_ids = range(first_question, first_question + QUESTION_COUNT)
+    exam_ids = list(range(first_exam, first_exam + EXAM_COUNT))
+    questions = []
+    tag_links = []
+    for question_id in question_ids:
+        date_created = start + timedelta(minutes=question_id * 7 + rng.randrange(5))
+        tags = rng.sample(TAGS, rng.randint(1, 3))
+        questions.append({
+            'id': question_id, 'content': f'Frage {question_id}', 'answer': f'Antwort {question_id}',
+            'category': rng.choice(CATEGORIES), 'tags': ', '.join(tags), 'difficulty': rng.randint(1, 5),
+            'active': rng.random() < 0.9, 'date_created': date_created,
+        })
+        tag_links.extend({'question_id': question_id, 'tag': tag, 'date_created': date_created} for tag in tags)
+    exams = [{'id': exam_id, 'title': f'Prüfung {exam_id}', 'date_created': start} for exam_id in exam_ids]
+    items = [
+        {'exam_id': exam_id, 'original_question_id': question_id, 'snapshot_content': 'Frage',
+         'snapshot_answer': 'Antwort', 'points': 1, 'position': position}
+        for exam_id in exam_ids
+        for position, question_id in enumerate(rng.sample(question_ids, ITEMS_PER_EXAM))
+    ]
+    with app_module.app.app_context():
+        with db.engine.begin() as connection:
+            # Core-INSERTs ohne Mapper-Events - Volltext braucht hier keiner, die Facetten
+            # (Grundlage der Zusammenstellung) werden danach einmal neu berechnet
+            connection.execute(app_module.Question.__table__.insert(), questions)
+            connection.execute(app_module.QuestionTag.__table__.insert(), tag_links)
+            connection.execute(app_module.Exam.__table__.insert(), exams)
+            connection.execute(app_module.ExamItem.__table__.insert(), items)
+            rebuild_question_facets(connection)
+            connection.execute(text('ANALYZE'))
+    app_module.response_cache.invalidate('questions')
+    return exam_ids
+
+
+@contextmanager
+def captured_selects(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+
+def query_plans(app_module, method, url, **kwargs):
+    """Route aufrufen, Pläne aller SELECTs als Liste von Zeilenlisten"""
+    db = app_module.db
+    client = app_module.app.test_client()
+    with app_module.app.app_context():
+        engine = db.engine
+    with captured_selects(engine) as statements:
+        response = client.open(url, method=method, **kwargs)
+    assert response.status_code in (200, 201), response.get_data(as_text=True)
+    assert statements, f'{url}: keine SELECTs mitgeschnitten'
+    plans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, tuple(parameters)).fetchall()
+            plans.append([row[-1] for row in rows])
+    return response, plans
+
+
+def assert_indexed(plans, expected_index):
+    lines = [line for plan in plans for line in plan]
+    for line in lines:
+        assert not FULL_SCAN_RE.match(line), f'Full Scan: {line}\n' + '\n'.join(lines)
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in line, 'Sortierung per Temp-B-Tree:\n' + '\n'.join(lines)
+    assert any(expected_index in line for line in lines), f'{expected_index} nicht benutzt:\n' + '\n'.join(lines)
+
+
+@pytest.mark.parametrize('url, expected_index', [
+    ('/questions', 'ix_questions_active_date_created'),
+    ('/questions?category=Obstbau', 'ix_questions_active_category_date_created'),
+    ('/questions?difficulty=2', 'ix_questions_active_difficulty_date_created'),
+    ('/questions?tag=Tag7', 'ix_question_tags_tag_date_created'),
+    ('/questions?tag=Tag7&tag=Tag8&tag_mode=all', 'ix_question_tags_tag_date_created'),
+    ('/questions?tag=Tag7&category=Obstbau', 'ix_question_tags_tag_date_created'),
+])
+def test_question_list_uses_index(app_module, seeded_exam_ids, url, expected_index):
+    app_module.response_cache.clear()
+    response, plans = query_plans(app_module, 'GET', url)
+    assert response.headers.get('X-Next-Cursor')
+    assert_indexed(plans, expected_index)
+
+
+@pytest.mark.parametrize('url, expected_index', [
+    ('/questions?limit=20', 'ix_questions_active_date_created'),
+    ('/questions?limit=20&tag=Tag3', 'ix_question_tags_tag_date_created'),
+])
+def test_next_page_uses_index(app_module, seeded_exam_ids, url, expected_index):
+    app_module.response_cache.clear()
+    first = app_module.app.test_client().get(url)
+    cursor = first.headers['X-Next-Cursor']
+    response, plans = query_plans(app_module, 'GET', f'{url}&cursor={cursor}')
+    assert_indexed(plans, expected_index)
+    # Folgeseiten zählen nicht erneut - nur die erste Seite liefert die Gesamtzahl
+    assert first.headers.get('X-Total-Count') and 'X-Total-Count' not in response.headers
+    assert len(plans) == 1
+
+
+def test_tag_pages_match_unindexed_order(app_module, seeded_exam_ids):
+    """Sortierung über question_tags.date_created liefert dieselbe Reihenfolge wie über questions"""
+    app_module.response_cache.clear()
+    client = app_module.app.test_client()
+    ids = []
+    url = '/questions?tag=Tag5&limit=100&fields=id'
+    for _ in range(3):
+        response = client.get(url)
+        ids.extend(row['id'] for row in response.get_json())
+        url = f"/questions?tag=Tag5&limit=100&fields=id&cursor={response.headers['X-Next-Cursor']}"
+    with app_module.app.app_context():
+        expected = [row[0] for row in app_module.db.session.execute(text(
+            "SELECT q.id FROM questions AS q JOIN question_tags AS t ON t.question_id = q.id "
+            "WHERE t.tag = 'Tag5' AND q.active = 1 ORDER BY q.date_created DESC, q.id DESC LIMIT 300"
+        ))]
+    assert ids == expected
+
+
+def test_exam_items_use_position_index(app_module, seeded_exam_ids):
+    app_module.response_cache.clear()
+    _, plans = query_plans(app_module, 'GET', f'/exam/{seeded_exam_ids[2]}/items')
+    assert_indexed(plans, 'ix_exam_items_exam_position')
+
+
+def test_add_question_uses_exam_question_index(app_module, seeded_exam_ids):
+    exam_id = seeded_exam_ids[3]
+    with app_module.app.app_context():
+        question_id = app_module.db.session.execute(text(
+            "SELECT id FROM questions WHERE id NOT IN (SELECT original_question_id FROM exam_items WHERE exam_id = :exam_id) LIMIT 1"
+        ), {'exam_id': exam_id}).scalar()
+    _, plans = query_plans(app_module, 'POST', f'/exam/{exam_id}/add_question', json={'question_id': question_id})
+    assert_indexed(plans, 'ix_exam_items_exam_question')
+
+
+@pytest.mark.parametrize('spec', [
+    {'count': 30, 'difficulty': {'1': 1, '3': 2, '5': 1}, 'categories': {'Obstbau': 5}, 'exclude_recent': 10},
+    {'count': 20, 'tags': {'Tag4': 5, 'Tag9': 3}, 'total_points': 40, 'points': {'1': 1, '3': 2, '5': 3}},
+])
+def test_assemble_reads_buckets_without_scanning_pool(app_module, seeded_exam_ids, spec):
+    exam_id = seeded_exam_ids[4]
+    response, plans = query_plans(app_module, 'POST', f'/exam/{exam_id}/assemble', json=dict(spec, dry_run=True, seed=1))
+    assert len(response.get_json()['question_ids']) == spec['count']
+    assert_indexed(plans, 'ix_questions_active_category_difficulty')
+    # Nur über active gesucht wäre wieder ein Durchlauf über den ganzen Pool
+    lines = [line for plan in plans for line in plan]
+    assert not any(re.search(r'questions USING .*INDEX \w+ \(active=\?\)$', line) for line in lines), '\n'.join(lines)
+    assert any('ix_questions_duplicate_of' in line for line in lines), '\n'.join(lines)
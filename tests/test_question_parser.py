@@ -0,0 +1,50 @@
+"""Klassischer Word-Import: QuestionParser (Frage/Lösung-Zustandsmaschine)"""
+from question_parser import QuestionParser
+
+
+DOCUMENT = [
+    'Frage: Welche Obstarten zählen zum Kernobst?',
+    'Lösung: Apfel, Birne, Quitte.',
+    'Bereich: Obstbau im Erwerbsanbau',
+    'Kategorie: Baumschule',
+    'Niveau: schwer',
+    'Frage: Was ist ein Steckholz?',
+    'Lösung: Ein unbewurzeltes Triebstück.',
+]
+
+
+def test_default_markers_keep_metadata_words_in_answers():
+    questions = list(QuestionParser().parse(DOCUMENT, 'Allgemein'))
+    assert [question.answer for question in questions] == [
+        'Apfel, Birne, Quitte.<br>Bereich: Obstbau im Erwerbsanbau<br>Kategorie: Baumschule<br>Niveau: schwer',
+        'Ein unbewurzeltes Triebstück.',
+    ]
+    assert [question.category for question in questions] == ['Allgemein', 'Allgemein']
+    assert [question.difficulty for question in questions] == [3, 3]
+
+
+def test_opt_in_metadata_markers_only_apply_in_question_part():
+    parser = QuestionParser({'category': ['Kategorie', 'Bereich'], 'difficulty': ['Niveau']})
+    questions = list(parser.parse(DOCUMENT + [
+        'Frage: Nennen Sie zwei Unterlagen für Apfel.',
+        'Bereich: Obstbau',
+        'Niveau: schwer',
+        'Lösung: M9 und MM106.',
+    ], 'Allgemein'))
+    # In der Lösung bleiben die Marker Text und ändern nichts an den folgenden Fragen
+    assert questions[0].answer.endswith('<br>Bereich: Obstbau im Erwerbsanbau<br>Kategorie: Baumschule<br>Niveau: schwer')
+    assert [question.category for question in questions] == ['Allgemein', 'Allgemein', 'Obstbau']
+    assert [question.difficulty for question in questions] == [3, 3, 4]
+    assert questions[2].content == 'Nennen Sie zwei Unterlagen für Apfel.'
+
+
+def test_custom_question_and_answer_markers():
+    parser = QuestionParser({'question': 'Aufgabe, 1.', 'answer': 'Antwort, a)'})
+    questions = list(parser.parse([
+        'Aufgabe 3: Was ist Humus?', 'Antwort: Organische Substanz.',
+        '2. Wie tief wird Rasen gemäht?', 'a) Etwa 4 cm.', 'Zweite Zeile',
+    ]))
+    assert [(question.content, question.answer) for question in questions] == [
+        ('Was ist Humus?', 'Organische Substanz.'),
+        ('Wie tief wird Rasen gemäht?', 'Etwa 4 cm.<br>Zweite Zeile'),
+    ]
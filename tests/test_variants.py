@@ -0,0 +1,22 @@
+"""Prüfungsvarianten: Ersatzfragen aus gleicher Kategorie und Schwierigkeit (variants)"""
+from variants import difficulty_bucket, generate_variants, load_swap_candidates
+
+
+def test_questions_without_category_get_swap_candidates(app_module):
+    db, Question = app_module.db, app_module.Question
+    with app_module.app.app_context():
+        original = Question(content='Ohne Kategorie: Was ist Kompost?', answer='A', category=None, difficulty=2)
+        replacement = Question(content='Ohne Kategorie: Was ist Mulch?', answer='A', category=None, difficulty=2)
+        other = Question(content='GaLaBau: Was ist Splitt?', answer='A', category='GaLaBau', difficulty=2)
+        db.session.add_all([original, replacement, other])
+        db.session.commit()
+
+        buckets, candidates = load_swap_candidates([original.id])
+        bucket = ('', difficulty_bucket(2))
+        assert buckets == {original.id: bucket}
+        assert replacement.id in candidates[bucket]
+        assert original.id not in candidates[bucket] and other.id not in candidates[bucket]
+
+        [(_, _, substitutions)] = generate_variants([(1, original.id)], 1, seed=3, swap_ratio=1.0,
+                                                    buckets=buckets, candidates=candidates)
+        assert substitutions[1] in candidates[bucket]
@@ -0,0 +1,141 @@
+"""
+Varianten einer Prüfung (Gruppen A, B, C, ...) gegen Abschreiben.
+
+Eine Variante ist eine Permutation der ExamItems plus optional ausgetauschte
+Fragen: Ersatz kommt aus derselben Kategorie und Schwierigkeitsstufe
+(leicht 1-2, mittel 3, schwer 4-5). Gespeichert werden nur die Item-IDs in
+neuer Reihenfolge und die Zuordnung Item -> Ersatzfrage, die Texte kommen
+beim Export aus den Snapshots bzw. aus dem Fragen-Pool.
+
+Die Erzeugung ist deterministisch: gleicher Seed, gleiche Items und gleicher
+Pool ergeben dieselben Varianten.
+"""
+import json
+import random
+
+from models import db, Question
+
+
+MAX_VARIANTS = 52
+DIFFICULTY_BUCKETS = {1: 'leicht', 2: 'leicht', 3: 'mittel', 4: 'schwer', 5: 'schwer'}
+
+
+def variant_label(index):
+    """0 -> "A", 25 -> "Z", 26 -> "AA", ..."""
+    label = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        label = chr(ord('A') + rest) + label
+    return label
+
+
+def difficulty_bucket(difficulty):
+    return DIFFICULTY_BUCKETS.get(difficulty or 3, 'mittel')
+
+
+def encode_order(item_ids):
+    return ','.join(str(int(item_id)) for item_id in item_ids)
+
+
+def decode_order(value):
+    return [int(item_id) for item_id in (value or '').split(',') if item_id]
+
+
+def encode_substitutions(substitutions):
+    return json.dumps({str(item_id): question_id for item_id, question_id in substitutions.items()}) if substitutions else None
+
+
+def decode_substitutions(value):
+    return {int(item_id): int(question_id) for item_id, question_id in json.loads(value).items()} if value else {}
+
+
+def load_swap_candidates(question_ids):
+    """
+    Mögliche Ersatzfragen für die Fragen einer Prüfung.
+    Liefert ({Fragen-ID: Bucket}, {Bucket: [Fragen-IDs]}) mit Bucket = (Kategorie, Schwierigkeitsstufe).
+    Inaktive Fragen und als Duplikat markierte Fragen werden nicht vorgeschlagen.
+    """
+    question_ids = {question_id for question_id in question_ids if question_id}
+    if not question_ids:
+        return {}, {}
+    # Ohne Kategorie (NULL) zählt wie '' - wie in assembly.BucketPool
+    category_key = db.func.coalesce(Question.category, '')
+    originals = {
+        question_id: (category, difficulty_bucket(difficulty))
+        for question_id, category, difficulty in db.session.query(Question.id, category_key, Question.difficulty)
+        .filter(Question.id.in_(question_ids))
+    }
+    categories = {category for category, _ in originals.values()}
+    candidates = {}
+    rows = (
+        db.session.query(Question.id, category_key, Question.difficulty)
+        .filter(Question.active == True, Question.duplicate_of_id.is_(None), category_key.in_(categories))
+        .order_by(Question.id)
+    )
+    for question_id, category, difficulty in rows:
+        if question_id not in question_ids:
+            candidates.setdefault((category, difficulty_bucket(difficulty)), []).append(question_id)
+    return originals, candidates
+
+
+def _pick(rng, options, used):
+    """Zufällige, in dieser Variante noch nicht verwendete Frage - None, wenn keine mehr frei ist"""
+    for _ in range(8):
+        choice = rng.choice(options)
+        if choice not in used:
+            return choice
+    remaining = [option for option in options if option not in used]
+    return rng.choice(remaining) if remaining else None
+
+
+def generate_variants(items, count, seed, swap_ratio=0.0, buckets=None, candidates=None):
+    """
+    items: [(item_id, original_question_id)] in Prüfungsreihenfolge.
+    buckets/candidates: aus load_swap_candidates() (nur für swap_ratio > 0).
+    swap_ratio: Anteil der Fragen, die pro Variante ausgetauscht werden (0-1).
+    Liefert [(label, [item_id, ...], {item_id: Ersatz-Fragen-ID})].
+    """
+    rng = random.Random(seed)
+    buckets = buckets or {}
+    candidates = candidates or {}
+    item_ids = [item_id for item_id, _ in items]
+    swappable = [
+        (item_id, buckets[question_id]) for item_id, question_id in items
+        if question_id in buckets and candidates.get(buckets[question_id])
+    ]
+    swap_count = round(len(swappable) * min(max(swap_ratio, 0.0), 1.0))
+
+    variants = []
+    for index in range(count):
+        order = list(item_ids)
+        rng.shuffle(order)
+        substitutions = {}
+        used = set()
+        for item_id, bucket in rng.sample(swappable, swap_count):
+            question_id = _pick(rng, candidates[bucket], used)
+            if question_id is not None:
+                used.add(question_id)
+                substitutions[item_id] = question_id
+        variants.append((variant_label(index), order, substitutions))
+    return variants
+
+
+def variant_rows(variant, items, questions):
+    """
+    Export-Zeilen (points, content, answer) einer Variante.
+    items: {item_id: ExamItem}, questions: {Fragen-ID: (content, answer)} der Ersatzfragen.
+    Gelöschte Ersatzfragen fallen auf den Snapshot des Items zurück.
+    """
+    substitutions = decode_substitutions(variant.substitutions)
+    rows = []
+    for item_id in decode_order(variant.item_order):
+        item = items.get(item_id)
+        if item is None:
+            continue
+        replacement = questions.get(substitutions.get(item_id))
+        if replacement is not None:
+            rows.append((item.points, replacement[0] or '', replacement[1] or ''))
+        else:
+            rows.append((item.points, item.snapshot_content or '', item.snapshot_answer or ''))
+    return rows